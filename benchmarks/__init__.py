@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Performance benchmarks for the University Support System agent."""
@@ -0,0 +1,144 @@
+# benchmarks/keyword_matcher.py
+"""
+Micro-benchmark: keyword fallback classification and uncertainty check.
+
+Compares the precompiled KeywordMatcher against the previous
+``any(kw in q for kw in ...)`` substring scans over the config lists,
+after checking that every configured keyword matches itself.
+
+Usage:
+    python -m benchmarks.keyword_matcher
+    python -m benchmarks.keyword_matcher --repeat 20000
+"""
+
+import argparse
+import timeit
+
+from core.config import CASUAL_KEYWORDS, TIME_SENSITIVE_KEYWORDS, INTENT_KEYWORDS, UNCERTAINTY_PHRASES
+from core.classifier import classify_with_keywords
+from core.keywords import CASUAL, TIME_SENSITIVE, UNCERTAINTY, KEYWORD_MATCHER, is_uncertain
+
+
+QUERIES = [
+    "hi",
+    "thanks a lot!",
+    "What is the fee structure for BS Computer Science?",
+    "When is the last date to apply for the MBA program?",
+    "Tell me about scholarships for undergraduate engineering students",
+    "Which courses are offered in the MS Physics degree this semester and what are the things I should know?",
+    "Are there any upcoming events on campus this week?",
+]
+
+ANSWERS = [
+    "The fee for BS Computer Science is listed in the fee schedule for the current academic year.",
+    "I don't know the exact deadline; the context does not mention it.",
+    "I’m not sure about this, the documents contain no information on hostel fees.",
+]
+
+
+# =============================================================================
+# PREVIOUS IMPLEMENTATION
+# =============================================================================
+
+def legacy_classify(query: str):
+    q = query.lower().strip()
+    if len(q.split()) <= 5:
+        is_casual = any(kw in q for kw in CASUAL_KEYWORDS)
+    else:
+        is_casual = q in CASUAL_KEYWORDS or q.rstrip('!?.') in CASUAL_KEYWORDS
+    if is_casual:
+        return "casual", True, False
+    needs_web = any(kw in q for kw in TIME_SENSITIVE_KEYWORDS)
+    if any(x in q for x in ["admission", "apply", "enroll", "entrance", "scholarship"]):
+        return "admissions", False, needs_web
+    elif any(x in q for x in ["program", "course", "degree", "curriculum", "major"]):
+        return "academic", False, needs_web
+    return "general", False, needs_web
+
+
+def legacy_uncertain(answer: str) -> bool:
+    return any(phrase in answer.lower() for phrase in UNCERTAINTY_PHRASES)
+
+
+LEGACY_CATEGORIES = {
+    CASUAL: CASUAL_KEYWORDS,
+    TIME_SENSITIVE: TIME_SENSITIVE_KEYWORDS,
+    UNCERTAINTY: UNCERTAINTY_PHRASES,
+    **INTENT_KEYWORDS,
+}
+
+
+def legacy_categories(text: str) -> set:
+    t = text.lower()
+    return {name for name, keywords in LEGACY_CATEGORIES.items() if any(kw.lower() in t for kw in keywords)}
+
+
+# =============================================================================
+# CURRENT IMPLEMENTATION
+# =============================================================================
+
+def matcher_classify(query: str):
+    return classify_with_keywords(query)
+
+
+def matcher_uncertain(answer: str) -> bool:
+    return is_uncertain(answer)
+
+
+def matcher_categories(text: str) -> set:
+    return KEYWORD_MATCHER.categories(text)
+
+
+def self_match_failures() -> list:
+    """(category, keyword) pairs whose keyword, on its own, is not matched in full for that category."""
+    failures = []
+    for category, keywords in LEGACY_CATEGORIES.items():
+        for keyword in keywords:
+            hits = KEYWORD_MATCHER.find(keyword)
+            if not any(h.start == 0 and h.end == len(keyword) and category in h.categories for h in hits):
+                failures.append((category, keyword))
+    return failures
+
+
+def _bench(fn, inputs, repeat: int) -> float:
+    """Mean microseconds per call, best of five runs (less noise from other load)."""
+    total = min(timeit.repeat(lambda: [fn(x) for x in inputs], number=repeat, repeat=5))
+    return total / (repeat * len(inputs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=5000, help="Passes over the inputs")
+    args = parser.parse_args()
+
+    failures = self_match_failures()
+    if failures:
+        print("Keywords that do not match themselves:")
+        for category, keyword in failures:
+            print(f"  {category}: {keyword!r}")
+        raise SystemExit(1)
+    print("✓ Every configured keyword matches itself\n")
+
+    print(f"{'case':<28}{'legacy µs':>12}{'matcher µs':>12}{'speedup':>10}")
+    for name, legacy, current, inputs in [
+        ("classify (keywords)", legacy_classify, matcher_classify, QUERIES),
+        ("uncertainty check", legacy_uncertain, matcher_uncertain, ANSWERS),
+        ("all categories", legacy_categories, matcher_categories, QUERIES + ANSWERS),
+    ]:
+        before = _bench(legacy, inputs, args.repeat)
+        after = _bench(current, inputs, args.repeat)
+        print(f"{name:<28}{before:>12.2f}{after:>12.2f}{before / after:>9.2f}x")
+
+    print("\nDifferences (legacy → matcher):")
+    for query in QUERIES:
+        old, new = legacy_classify(query), matcher_classify(query)
+        if old != new:
+            print(f"  {query!r}: {old} → {new}")
+    for answer in ANSWERS:
+        old, new = legacy_uncertain(answer), matcher_uncertain(answer)
+        if old != new:
+            print(f"  {answer!r}: uncertain {old} → {new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,535 @@
+# benchmarks/load.py
+"""
+Offline load and latency benchmark for the agent graph.
+
+Groq, the HF classifier, the vector store and Tavily are replaced with
+local stand-ins whose latencies are drawn from seeded log-normal
+distributions, so a run needs no API keys, costs nothing and gives the
+same workload every time:
+
+- LLM: a chat model that sleeps, then answers (and reports token usage)
+- Retriever: dataset chunks ranked by word overlap with the query
+- Classifier: a local HTTP server speaking the HF zero-shot format,
+  reached through CLASSIFIER_API_URL (the real client code is exercised)
+- Tavily: sync and async clients returning canned university pages
+
+The compiled graph is driven with a mix of casual, admissions, academic
+and time-sensitive queries at a fixed concurrency. Per-route and per-node
+p50/p95/p99, throughput and token counts are printed and written as JSON;
+pass --compare with an earlier result file to see the change per route.
+
+Usage:
+    python -m benchmarks.load
+    python -m benchmarks.load --requests 500 --concurrency 32 --out load.json
+    python -m benchmarks.load --mode threads --llm-ms 600 --compare load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+QUERIES = {
+    "casual": [
+        "hi",
+        "hello there",
+        "thanks a lot!",
+        "good morning",
+        "bye, see you",
+    ],
+    "admissions": [
+        "How do I apply for undergraduate admission?",
+        "What documents are required for the application?",
+        "Are scholarships available for new students?",
+        "What is the minimum GPA for admission?",
+        "How can I enroll as an international student?",
+    ],
+    "academic": [
+        "Which degree programs does the university offer?",
+        "Tell me about the computer science curriculum",
+        "What courses are in the business administration major?",
+        "How long is the graduate program in engineering?",
+        "What is the tuition fee for computer science?",
+    ],
+    "time_sensitive": [
+        "When is the admission deadline this semester?",
+        "Are there any upcoming events on campus this week?",
+        "What is the latest news about the fall schedule?",
+        "When does registration open for the upcoming term?",
+        "Is there an open house event today?",
+    ],
+}
+
+DEFAULT_MIX = "casual=0.2,admissions=0.3,academic=0.3,time_sensitive=0.2"
+
+WEB_PAGES = [
+    {
+        "title": "Admissions Calendar",
+        "url": "https://example.edu/admissions/calendar",
+        "content": "Applications for the fall semester close on 15 July. Late applications are "
+                   "reviewed if seats remain. Entrance tests are held in the first week of August.",
+    },
+    {
+        "title": "Campus Events",
+        "url": "https://example.edu/events",
+        "content": "This week: open house on Friday, career fair on Wednesday and a guest lecture "
+                   "series in the main auditorium. Registration for the upcoming term opens Monday.",
+    },
+    {
+        "title": "News",
+        "url": "https://example.edu/news",
+        "content": "The university has published the updated fall schedule. New scholarship "
+                   "programs for undergraduate students were announced last month.",
+    },
+]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+# =============================================================================
+# LATENCY MODEL
+# =============================================================================
+
+class Latency:
+    """Log-normal latency with the given median, seeded for repeatable runs."""
+
+    def __init__(self, median_ms: float, sigma: float, seed: int):
+        self.median = median_ms / 1000.0
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        with self._lock:
+            return self.median * math.exp(self.sigma * self._rng.gauss(0.0, 1.0))
+
+    def sleep(self) -> None:
+        time.sleep(self.sample())
+
+    async def asleep(self) -> None:
+        await asyncio.sleep(self.sample())
+
+
+# =============================================================================
+# STAND-INS
+# =============================================================================
+
+def make_fake_llm(latency: Latency, uncertain_rate: float):
+    """Chat model that sleeps for the LLM latency and returns a canned answer."""
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    from core.context import estimate_tokens
+
+    class FakeChatModel(BaseChatModel):
+        @property
+        def _llm_type(self) -> str:
+            return "benchmark-fake"
+
+        def _answer(self, messages) -> ChatResult:
+            prompt = "\n".join(str(m.content) for m in messages)
+            query = str(messages[-1].content)
+            # Vector-only answers are sometimes uncertain, exercising the web fallback
+            uncertain = (
+                "say \"I don't have enough information" in prompt
+                and _bucket(query) < uncertain_rate
+            )
+            if uncertain:
+                text = "I don't have enough information to answer this question."
+            else:
+                text = (f"Here is what I found about your question ({query}). The university "
+                        "publishes the details on its admissions and programs pages, and the "
+                        "office of the registrar can help with anything not covered there.")
+            usage = {
+                "input_tokens": estimate_tokens(prompt),
+                "output_tokens": estimate_tokens(text),
+                "total_tokens": estimate_tokens(prompt) + estimate_tokens(text),
+            }
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            latency.sleep()
+            return self._answer(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            await latency.asleep()
+            return self._answer(messages)
+
+    return FakeChatModel()
+
+
+def make_fake_retriever(latency: Latency, k: int = 3):
+    """Retriever over the dataset chunks, ranked by word overlap with the query."""
+    from langchain_core.retrievers import BaseRetriever
+
+    from core.vector_store import matches_filter
+    from ingest import load_chunks
+
+    chunks = load_chunks()
+    chunk_terms = [set(_WORD_RE.findall(c.page_content.lower())) for c in chunks]
+
+    def search(query: str, filter: Optional[dict] = None) -> list:
+        terms = set(_WORD_RE.findall(query.lower()))
+        scored = sorted(
+            (
+                (len(terms & t) / (len(terms) or 1), i) for i, t in enumerate(chunk_terms)
+                if not filter or matches_filter(chunks[i].metadata, filter)
+            ),
+            reverse=True,
+        )
+        docs = []
+        for score, i in scored[:k]:
+            if score <= 0:
+                break
+            doc = chunks[i].model_copy(deep=True)
+            doc.metadata["score"] = round(0.5 + score / 2, 4)
+            docs.append(doc)
+        return docs
+
+    class FakeRetriever(BaseRetriever):
+        def _get_relevant_documents(self, query, *, run_manager=None, filter=None):
+            latency.sleep()
+            return search(query, filter)
+
+        async def _aget_relevant_documents(self, query, *, run_manager=None, filter=None):
+            await latency.asleep()
+            return search(query, filter)
+
+    return FakeRetriever()
+
+
+class FakeTavily:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def search(self, query: str, max_results: int = 3, **kwargs) -> dict:
+        self.latency.sleep()
+        return {"results": WEB_PAGES[:max_results]}
+
+
+class FakeAsyncTavily(FakeTavily):
+    async def search(self, query: str, max_results: int = 3, **kwargs) -> dict:
+        await self.latency.asleep()
+        return {"results": WEB_PAGES[:max_results]}
+
+
+def _classify_label(text: str, labels: List[str]) -> List[dict]:
+    """Zero-shot style scores: the label whose category words appear wins."""
+    t = text.lower()
+    if any(w in t for w in ("deadline", "event", "week", "today", "upcoming", "latest", "schedule")):
+        best = 1
+    elif any(w in t for w in ("hi", "hello", "thank", "bye", "morning")) and len(t.split()) <= 4:
+        best = 0
+    elif any(w in t for w in ("apply", "admission", "scholarship", "enroll", "document")):
+        best = 2
+    elif any(w in t for w in ("program", "course", "degree", "curriculum", "major")):
+        best = 3
+    else:
+        best = 4
+    rest = (1.0 - 0.8) / (len(labels) - 1)
+    scores = [{"label": label, "score": 0.8 if i == best else rest} for i, label in enumerate(labels)]
+    return sorted(scores, key=lambda r: -r["score"])
+
+
+def start_fake_classifier(latency: Latency) -> ThreadingHTTPServer:
+    """Local HTTP server answering like the HF zero-shot endpoint."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+            labels = payload["parameters"]["candidate_labels"]
+            inputs = payload["inputs"]
+            latency.sleep()
+            if isinstance(inputs, list):
+                result = [_classify_label(text, labels) for text in inputs]
+            else:
+                result = _classify_label(inputs, labels)
+            body = json.dumps(result).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-classifier", daemon=True).start()
+    return server
+
+
+def _bucket(text: str) -> float:
+    """Deterministic number in [0, 1) for a text."""
+    import zlib
+
+    return zlib.crc32(text.encode("utf-8")) / 2 ** 32
+
+
+# =============================================================================
+# SETUP
+# =============================================================================
+
+def install_fakes(args) -> ThreadingHTTPServer:
+    """Point every external dependency at its stand-in; returns the classifier server."""
+    server = start_fake_classifier(Latency(args.classifier_ms, args.sigma, args.seed + 1))
+
+    # Read at import time by the project modules, so set before importing them
+    os.environ["CLASSIFIER_API_URL"] = f"http://127.0.0.1:{server.server_address[1]}/"
+    os.environ["HUGGINGFACEHUB_API_TOKEN"] = "benchmark"
+    os.environ["TAVILY_API_KEY"] = "benchmark"
+    os.environ["TRACE_LOG_PATH"] = ""
+
+    import langChainFun
+    import webSearch
+
+    langChainFun._llm = make_fake_llm(Latency(args.llm_ms, args.sigma, args.seed + 2), args.uncertain_rate)
+    langChainFun._retriever = make_fake_retriever(Latency(args.retriever_ms, args.sigma, args.seed + 3))
+    webSearch._tavily_client = FakeTavily(Latency(args.web_ms, args.sigma, args.seed + 4))
+    webSearch._async_tavily_client = FakeAsyncTavily(Latency(args.web_ms, args.sigma, args.seed + 5))
+    # Measure the pipeline itself, not the web search cache
+    webSearch.WEB_SEARCH_CACHE_ENABLED = args.web_cache
+    return server
+
+
+def build_workload(mix: Dict[str, float], n: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    categories = list(mix)
+    weights = [mix[c] for c in categories]
+    return [rng.choice(QUERIES[c]) for c in rng.choices(categories, weights, k=n)]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUERIES:
+            raise SystemExit(f"Unknown query category {name!r} (choose from {', '.join(QUERIES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# =============================================================================
+# RUNNING
+# =============================================================================
+
+def _run_one(app, query: str):
+    from core.tracing import close_trace, trace_request, with_callbacks
+
+    with trace_request(query) as trace:
+        result = app.invoke({"query": query}, with_callbacks(None, trace))
+        close_trace(trace, result)
+    return trace
+
+
+async def _arun_one(app, query: str):
+    from core.tracing import close_trace, trace_request, with_callbacks
+
+    with trace_request(query) as trace:
+        result = await app.ainvoke({"query": query}, with_callbacks(None, trace))
+        close_trace(trace, result)
+    return trace
+
+
+def _safe(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return e
+
+
+async def _asafe(coro):
+    try:
+        return await coro
+    except Exception as e:
+        return e
+
+
+def run_threads(app, queries: List[str], concurrency: int) -> list:
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        return list(pool.map(lambda q: _safe(_run_one, app, q), queries))
+
+
+def run_async(app, queries: List[str], concurrency: int, batch_window_ms: float) -> list:
+    async def main():
+        if batch_window_ms > 0:
+            from core.classifier import get_classifier
+
+            get_classifier().enable_batching(batch_window_ms)
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(query):
+            async with gate:
+                return await _asafe(_arun_one(app, query))
+
+        return await asyncio.gather(*(one(q) for q in queries))
+
+    return asyncio.run(main())
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _summary(values: List[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+    }
+
+
+def build_report(args, traces: list, wall: float) -> dict:
+    ok = [t for t in traces if not isinstance(t, Exception)]
+    errors = [str(t) for t in traces if isinstance(t, Exception)]
+
+    by_route: Dict[str, List[float]] = {}
+    by_node: Dict[str, List[float]] = {}
+    for trace in ok:
+        by_route.setdefault(trace.route, []).append(trace.seconds)
+        for node in trace.nodes:
+            by_node.setdefault(node["node"], []).append(node["seconds"])
+
+    return {
+        "benchmark": "load",
+        "timestamp": time.time(),
+        "commit": _git_commit(),
+        "config": {
+            k: v for k, v in vars(args).items() if k not in ("out", "compare")
+        },
+        "summary": {
+            "requests": len(traces),
+            "errors": len(errors),
+            "wall_seconds": wall,
+            "throughput_rps": len(ok) / wall if wall else None,
+            "latency": _summary([t.seconds for t in ok]),
+            "llm_calls": sum(t.llm_calls for t in ok),
+            "tokens_in": sum(t.tokens_in for t in ok),
+            "tokens_out": sum(t.tokens_out for t in ok),
+        },
+        "routes": {route: _summary(v) for route, v in sorted(by_route.items())},
+        "nodes": {node: _summary(v) for node, v in sorted(by_node.items())},
+        "errors": errors[:20],
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> None:
+    s = report["summary"]
+    print(f"\n{s['requests']} requests, {s['errors']} errors in {s['wall_seconds']:.2f}s "
+          f"→ {s['throughput_rps']:.1f} req/s; {s['llm_calls']} LLM calls, "
+          f"{s['tokens_in']} tokens in / {s['tokens_out']} out")
+
+    for title, rows, base in [
+        ("route", report["routes"], (baseline or {}).get("routes", {})),
+        ("node", report["nodes"], (baseline or {}).get("nodes", {})),
+    ]:
+        print(f"\n{title:<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+              + (f"{'Δp50':>9}{'Δp99':>9}" if baseline else ""))
+        for name, row in rows.items():
+            line = f"{name:<24}{row['count']:>7}{_ms(row['p50']):>10}{_ms(row['p95']):>10}{_ms(row['p99']):>10}"
+            if baseline:
+                line += "".join(f"{_delta(row, base.get(name), q):>9}" for q in ("p50", "p99"))
+            print(line)
+
+
+def _delta(row: dict, base: Optional[dict], q: str) -> str:
+    if not base or not base.get(q) or row.get(q) is None:
+        return "-"
+    return f"{(row[q] / base[q] - 1) * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load and latency benchmark for the agent graph")
+    parser.add_argument("--requests", type=int, default=200, help="Queries to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="Queries in flight at once")
+    parser.add_argument("--mode", choices=("async", "threads"), default="async",
+                        help="app.ainvoke on one event loop, or app.invoke from a thread pool")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Query category weights")
+    parser.add_argument("--llm-ms", type=float, default=700, help="Median LLM latency")
+    parser.add_argument("--retriever-ms", type=float, default=120, help="Median vector search latency")
+    parser.add_argument("--classifier-ms", type=float, default=150, help="Median HF classifier latency")
+    parser.add_argument("--web-ms", type=float, default=900, help="Median Tavily latency")
+    parser.add_argument("--sigma", type=float, default=0.35, help="Log-normal spread of every latency")
+    parser.add_argument("--uncertain-rate", type=float, default=0.2,
+                        help="Share of vector-only answers that trigger the web fallback")
+    parser.add_argument("--batch-window-ms", type=float, default=0,
+                        help="Micro-batch classifier calls (async mode), as the server does")
+    parser.add_argument("--web-cache", action="store_true", help="Keep the web search cache on")
+    parser.add_argument("--warmup", type=int, default=5, help="Unrecorded queries before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="./.cache/benchmarks/load.json", help="Where to write the JSON report")
+    parser.add_argument("--compare", default=None, help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    server = install_fakes(args)
+    from langGraphFun import get_app
+
+    app = get_app()
+    queries = build_workload(parse_mix(args.mix), args.requests, args.seed)
+
+    if args.mode == "threads":
+        run = lambda qs: run_threads(app, qs, args.concurrency)
+    else:
+        run = lambda qs: run_async(app, qs, args.concurrency, args.batch_window_ms)
+
+    if args.warmup:
+        run(queries[:args.warmup])
+    start = time.perf_counter()
+    traces = run(queries)
+    wall = time.perf_counter() - start
+    server.shutdown()
+
+    report = build_report(args, traces, wall)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# core/answer_cache.py
+"""
+Semantic answer cache in front of the compiled LangGraph app.
+
+Lookups first try the normalized query text, then fall back to
+query-embedding similarity above ANSWER_CACHE_SIMILARITY. Entries expire
+after a TTL chosen from the classified intent (short for time-sensitive
+questions, long for admissions/academic ones) and the cache is bounded
+with LRU eviction.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.config import (
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_TTLS,
+    ANSWER_CACHE_DEFAULT_TTL,
+)
+from core.facts import query_programs
+from core.keywords import KEYWORD_MATCHER
+
+
+# Facets that must agree for a semantic hit ("MS CS fee" must not answer "BS CS fee");
+# the programs named ("BS EE fee" vs "BS ME fee") must agree too
+_FACET_KEYS = ["undergraduate", "graduate", "engineering_cs", "business_natural"]
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    q = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(q.split())
+
+
+def _facets(query: str) -> frozenset:
+    programs = {f"program:{key}" for key in query_programs(query)}
+    return frozenset(KEYWORD_MATCHER.categories(query).intersection(_FACET_KEYS)) | programs
+
+
+@dataclass
+class _Entry:
+    result: Dict[str, Any]
+    expires_at: float
+    facets: frozenset
+    vector: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+class AnswerCache:
+    """Thread-safe LRU cache of final agent answers."""
+
+    def __init__(self, embeddings=None, max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY):
+        """
+        Args:
+            embeddings: Embedding backend for semantic matching (None = exact only)
+            max_entries: LRU size bound
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        if self.embeddings is None:
+            return None
+        try:
+            vector = np.asarray(self.embeddings.embed_query(normalized), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠ Answer cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _evict_expired(self, now: float) -> None:
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[key]
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result for the query, or None."""
+        return self.lookup_with_vector(query)[0]
+
+    def lookup_with_vector(self, query: str) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        lookup(), also returning the query vector it computed (None on an
+        exact hit), so a miss can be stored without embedding the query twice.
+        """
+        key = normalize_query(query)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return dict(entry.result), None
+
+        vector = self._embed(key)
+        if vector is None:
+            with self._lock:
+                self.misses += 1
+            return None, None
+
+        facets = _facets(query)
+        with self._lock:
+            self._evict_expired(now)
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if e.vector is not None and e.facets == facets
+            ]
+            if candidates:
+                scores = np.stack([e.vector for _, e in candidates]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    best_key, best_entry = candidates[best]
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return dict(best_entry.result), vector
+            self.misses += 1
+        return None, vector
+
+    def store(self, query: str, result: Dict[str, Any], vector: Optional[np.ndarray] = None) -> None:
+        """
+        Cache a final agent result, with a TTL based on its intent.
+
+        Args:
+            vector: Query vector from lookup_with_vector(); embedded here if None
+        """
+        answer = result.get("answer")
+        if not answer or answer == "ESCALATE":
+            return
+
+        key = normalize_query(query)
+        ttl = ANSWER_CACHE_TTLS.get(result.get("intent"), ANSWER_CACHE_DEFAULT_TTL)
+        entry = _Entry(
+            result={
+                "query": query,
+                "intent": result.get("intent"),
+                "answer": answer,
+                "web_results": list(result.get("web_results") or []),
+            },
+            expires_at=time.time() + ttl,
+            facets=_facets(query),
+            vector=vector if vector is not None else self._embed(key),
+        )
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+
+
+class CachedAgent:
+    """
+    Wraps the compiled graph so cached answers skip the whole pipeline.
+
+    Exposes the same invoke()/ainvoke() call shape as the compiled app.
+    """
+
+    def __init__(self, app, cache: AnswerCache):
+        self.app = app
+        self.cache = cache
+
+    def invoke(self, input: Dict[str, Any], config=None, **kwargs) -> Dict[str, Any]:
+        query = input["query"]
+        cached, vector = self.cache.lookup_with_vector(query)
+        if cached is not None:
+            cached["cache_hit"] = True
+            return cached
+
+        result = self.app.invoke(input, config, **kwargs)
+        self.cache.store(query, result, vector)
+        return result
+
+    async def ainvoke(self, input: Dict[str, Any], config=None, **kwargs) -> Dict[str, Any]:
+        """Async version of invoke(); cache I/O runs off the event loop."""
+        query = input["query"]
+        cached, vector = await asyncio.to_thread(self.cache.lookup_with_vector, query)
+        if cached is not None:
+            cached["cache_hit"] = True
+            return cached
+
+        result = await self.app.ainvoke(input, config, **kwargs)
+        await asyncio.to_thread(self.cache.store, query, result, vector)
+        return result
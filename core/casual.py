@@ -0,0 +1,110 @@
+# core/casual.py
+"""
+Template replies for casual messages.
+
+"hi", "thanks" or "ok" do not need the LLM. casual_reply matches the
+message against CASUAL_KEYWORD_CATEGORIES and, when the message is made
+only of casual keywords (and CASUAL_FILLER_WORDS such as "so much" or
+"there"), answers with one of that category's templates. The category of
+the last keyword wins, so "thanks, bye" is answered as a farewell.
+
+Anything else ("hi, what are the MS fees?") returns None and
+handle_casual_message asks the LLM. Every configured casual keyword must,
+sent alone, get a template of its own category; this is checked at
+import so a keyword added without replies fails loudly.
+"""
+
+import random
+import re
+from typing import Optional
+
+from core.config import CASUAL_FILLER_WORDS, CASUAL_KEYWORD_CATEGORIES
+from core.keywords import KeywordMatcher
+from core.metrics import counter
+
+
+CASUAL_REPLIES = {
+    "greeting": [
+        "Hello! How can I help you today? I can answer questions about admissions, programs, fees and more.",
+        "Hi there! What would you like to know about the university?",
+        "Hey! Ask me anything about admissions, programs or campus life.",
+    ],
+    "farewell": [
+        "Goodbye! Feel free to come back whenever you have more questions.",
+        "Take care! I'm here if you need anything else about the university.",
+        "See you! Good luck with your plans.",
+    ],
+    "gratitude": [
+        "You're welcome! Let me know if there's anything else I can help with.",
+        "Happy to help! Do you have any other questions?",
+        "Anytime! Feel free to ask if something else comes up.",
+    ],
+    "small_talk": [
+        "I'm doing well, thanks for asking! How can I help you with admissions, programs or anything else?",
+        "All good here! What would you like to know about the university?",
+    ],
+    "pleasantry": [
+        "Likewise! How can I help you with admissions, programs or anything else?",
+        "Glad to be talking with you! What would you like to know about the university?",
+    ],
+    "acknowledgement": [
+        "Great! Let me know if you have any other questions.",
+        "Alright! I'm here if you need anything else.",
+    ],
+    "compliment": [
+        "Thank you! Is there anything else I can help you with?",
+        "Glad to hear it! Let me know if you have more questions.",
+    ],
+}
+
+_MATCHER = KeywordMatcher(CASUAL_KEYWORD_CATEGORIES)
+_FILLER = frozenset(CASUAL_FILLER_WORDS)
+_WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+
+_replies = counter("casual_replies_total", "Casual messages answered, by source (template, llm)")
+
+
+def casual_category(message: str) -> Optional[str]:
+    """Category of a message made only of casual keywords, else None."""
+    hits = _MATCHER.find(message)
+    if not hits:
+        return None
+
+    rest, last = [], 0
+    for hit in hits:
+        rest.append(message[last:hit.start])
+        last = hit.end
+    rest.append(message[last:])
+    if any(word.lower() not in _FILLER for word in _WORD_RE.findall(" ".join(rest))):
+        return None
+    return hits[-1].categories[0]
+
+
+def casual_reply(message: str) -> Optional[str]:
+    """A template reply to the message, or None if the LLM should answer it."""
+    category = casual_category(message)
+    replies = CASUAL_REPLIES.get(category)
+    if not replies:
+        return None
+    _replies.inc(source="template")
+    return random.choice(replies)
+
+
+def record_llm_reply() -> None:
+    """Count a casual message the templates could not answer."""
+    _replies.inc(source="llm")
+
+
+def _check_templates() -> None:
+    """Every casual keyword, sent alone, must get a template of its own category."""
+    missing = [
+        f"{category}: {keyword!r}"
+        for category, keywords in CASUAL_KEYWORD_CATEGORIES.items()
+        for keyword in keywords
+        if casual_category(keyword) != category or not CASUAL_REPLIES.get(category)
+    ]
+    if missing:
+        raise ValueError("Casual keywords without a template reply: " + ", ".join(missing))
+
+
+_check_templates()
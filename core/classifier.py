@@ -4,13 +4,46 @@ ML-based intent classification using HuggingFace zero-shot classification.
 
 Uses a lightweight DeBERTa model for accurate intent classification
 instead of simple keyword matching.
+
+Classification is a cascade: a cheap local stage decides whenever it is
+confident, and only ambiguous queries go to the remote model. The local
+stage is the trained in-process intent model (core/intent_model.py) when
+one exists, keywords otherwise; without an HF token the local model (or
+keywords) classifies everything. In hedged mode a slow remote call is
+abandoned for the local answer after CLASSIFIER_HEDGE_MS.
+
+API calls share a pooled keep-alive session, use short timeouts with a
+jittered retry, and go through a circuit breaker: while the HF API is
+failing, queries are classified by keywords without waiting on it.
 """
 
+import asyncio
+import contextvars
+import json
 import os
+import re
+import threading
+import time
+import weakref
 import requests
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional, Tuple
 
-from core.config import CASUAL_KEYWORDS, TIME_SENSITIVE_KEYWORDS
+import httpx
+from requests.adapters import HTTPAdapter
+
+from core.config import CASUAL_KEYWORDS
+from core.keywords import CASUAL, TIME_SENSITIVE, KEYWORD_MATCHER
+from core.metrics import counter, histogram
+from core.tracing import annotate
+from core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    TransientHTTPError,
+    aretry_call,
+    check_response,
+    retry_call,
+)
 
 
 # =============================================================================
@@ -20,8 +53,9 @@ from core.config import CASUAL_KEYWORDS, TIME_SENSITIVE_KEYWORDS
 # Model to use for zero-shot classification
 # facebook/bart-large-mnli is always available on HuggingFace Inference API
 CLASSIFIER_MODEL = "MoritzLaurer/deberta-v3-xsmall-zeroshot-v1.1-all-33"
-# New HuggingFace router endpoint (api-inference.huggingface.co is deprecated)
-API_URL = f"https://router.huggingface.co/hf-inference/models/{CLASSIFIER_MODEL}"
+# New HuggingFace router endpoint (api-inference.huggingface.co is deprecated);
+# CLASSIFIER_API_URL points the classifier elsewhere (e.g. the benchmark's local stand-in)
+API_URL = os.getenv("CLASSIFIER_API_URL") or f"https://router.huggingface.co/hf-inference/models/{CLASSIFIER_MODEL}"
 
 # Classification labels
 INTENT_LABELS = [
@@ -44,6 +78,106 @@ LABEL_TO_INTENT = {
 # Minimum confidence threshold for classification
 MIN_CONFIDENCE = 0.4
 
+# Whole-message casual check for longer inputs
+_CASUAL_SET = frozenset(CASUAL_KEYWORDS)
+
+# HTTP transport: fail fast so the keyword fallback kicks in quickly
+CONNECT_TIMEOUT = 2.0          # Seconds to open a connection
+READ_TIMEOUT = 5.0             # Seconds to wait for the response
+MAX_RETRIES = 1                # Extra attempts on timeouts, 429 and 5xx
+POOL_SIZE = 16                 # Keep-alive connections to the HF router
+BATCH_CHUNK_SIZE = 16          # Queries per batched API request
+
+# Circuit breaker: skip the API for BREAKER_RESET_TIMEOUT seconds after
+# BREAKER_FAILURE_THRESHOLD consecutive failed calls, then probe again
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+
+_RETRYABLE_SYNC = (requests.ConnectionError, requests.Timeout, TransientHTTPError)
+_RETRYABLE_ASYNC = (httpx.TransportError, TransientHTTPError)
+
+# Cascade: the remote model only runs when the local stage is less
+# confident than CLASSIFIER_CASCADE_THRESHOLD
+CLASSIFIER_CASCADE = os.getenv("CLASSIFIER_CASCADE", "true").lower() in ("1", "true", "yes")
+CLASSIFIER_CASCADE_THRESHOLD = float(os.getenv("CLASSIFIER_CASCADE_THRESHOLD") or 0.7)
+# Hedged mode: use the local result if the remote call takes longer (0 = off)
+CLASSIFIER_HEDGE_MS = float(os.getenv("CLASSIFIER_HEDGE_MS") or 0)
+
+# Append every remote classification here (training data for core/intent_model.py)
+CLASSIFIER_LOG_PATH = os.getenv("CLASSIFIER_LOG_PATH") or ""
+
+Classification = Tuple[str, bool, bool]
+
+
+# =============================================================================
+# LOCAL STAGE
+# =============================================================================
+
+def classify_with_keywords(query: str) -> Classification:
+    """Fallback keyword-based classification (one pass of the keyword matcher)."""
+    q = query.lower().strip()
+    hits = KEYWORD_MATCHER.categories(query)
+
+    # Check for casual messages
+    if len(q.split()) <= 5:
+        is_casual = CASUAL in hits
+    else:
+        is_casual = q in _CASUAL_SET or q.rstrip('!?.') in _CASUAL_SET
+
+    if is_casual:
+        return "casual", True, False
+
+    # Check for time-sensitive queries
+    needs_web = TIME_SENSITIVE in hits
+
+    # Basic intent classification
+    if "admissions" in hits:
+        return "admissions", False, needs_web
+    elif "academic" in hits:
+        return "academic", False, needs_web
+    else:
+        return "general", False, needs_web
+
+
+def keyword_stage(query: str) -> Tuple[Classification, float]:
+    """
+    Keyword classification with a confidence score for the cascade.
+    
+    Confident: messages made only of casual phrases ("hi", "thanks!"),
+    and queries whose keywords point at exactly one intent. Anything
+    mixed, or with no intent keywords at all, is left to the remote model,
+    including queries whose only hits are generic time words ("When was
+    the university founded?").
+    """
+    hits = KEYWORD_MATCHER.find(query)
+    categories = {c for hit in hits for c in hit.categories}
+    
+    if CASUAL in categories:
+        residual = query
+        for hit in reversed(hits):
+            if CASUAL in hit.categories:
+                residual = residual[:hit.start] + residual[hit.end:]
+        if not re.search(r"\w", residual):
+            return ("casual", True, False), 0.95
+        return ("casual", True, False), 0.4
+    
+    needs_web = TIME_SENSITIVE in categories
+    intents = categories & {"admissions", "academic"}
+    if len(intents) == 1:
+        return (intents.pop(), False, needs_web), 0.8
+    if intents:
+        return ("admissions", False, needs_web), 0.3
+    if needs_web:
+        return ("time_sensitive", False, True), 0.4
+    return ("general", False, False), 0.3
+
+
+_log_lock = threading.Lock()
+
+
+# Background remote calls for hedged sync classification
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="classify-hedge")
+
 
 # =============================================================================
 # CLASSIFIER CLASS
@@ -61,13 +195,42 @@ class IntentClassifier:
         self.token = os.getenv("HUGGINGFACEHUB_API_TOKEN")
         self.headers = None
         self.enabled = False
+        # One async HTTP client per event loop (httpx clients are loop-bound)
+        self._async_clients = weakref.WeakKeyDictionary()
+        # Micro-batching of concurrent aclassify() calls (off until enabled)
+        self._batch_window_ms = 0.0
+        self._max_batch = 16
+        self._batchers = weakref.WeakKeyDictionary()
+        # Pooled keep-alive session, shared breaker for sync and async calls
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._breaker = CircuitBreaker("hf_classifier", BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        self._latency = histogram("classifier_request_seconds", "HF classifier API call latency")
+        self._fallbacks = counter("classifier_fallbacks_total", "Queries classified by keywords instead of the API")
+        # Trained in-process model (None until `python -m core.intent_model train`)
+        from core.intent_model import load_intent_model
+        self.model = load_intent_model()
+        # Cascade: local stage returns (classification, confidence)
+        self.local_stage: Optional[Callable[[str], Tuple[Classification, float]]] = None
+        if CLASSIFIER_CASCADE:
+            self.local_stage = self._model_stage if self.model is not None else keyword_stage
+        self.cascade_threshold = CLASSIFIER_CASCADE_THRESHOLD
+        self.hedge_ms = CLASSIFIER_HEDGE_MS
+        self._decisions = counter("classifier_decisions_total", "Classified queries by deciding stage")
+        self._remote_scores = histogram(
+            "classifier_remote_score", "Top label score of remote classifications, by label",
+            buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+        )
         
         if self.token:
             self.headers = {"Authorization": f"Bearer {self.token}"}
             self.enabled = True
             print("✓ ML classifier initialized with HuggingFace API")
         else:
-            print("⚠ HUGGINGFACEHUB_API_TOKEN not set, using keyword fallback")
+            fallback = "local intent model" if self.model is not None else "keyword fallback"
+            print(f"⚠ HUGGINGFACEHUB_API_TOKEN not set, using {fallback}")
     
     def classify(self, query: str) -> Tuple[str, bool, bool]:
         """
@@ -79,34 +242,307 @@ class IntentClassifier:
         Returns:
             Tuple of (intent, is_casual, needs_web_search)
         """
-        if self.enabled and self.headers:
+        if not (self.enabled and self.headers):
+            return self._decide(*self._offline(query))
+        
+        local, confidence = self._local(query)
+        if confidence >= self.cascade_threshold:
+            return self._decide(local, "local")
+        
+        if self.hedge_ms > 0 and local is not None:
+            future = _hedge_pool.submit(contextvars.copy_context().run, self._remote, query)
             try:
-                return self._classify_with_ml(query)
-            except Exception as e:
-                print(f"⚠ ML classification failed: {e}, using fallback")
-                return self._classify_with_keywords(query)
+                return self._decide(*future.result(timeout=self.hedge_ms / 1000))
+            except FutureTimeoutError:
+                return self._decide(local, "hedged")
+        return self._decide(*self._remote(query))
+    
+    async def aclassify(self, query: str) -> Tuple[str, bool, bool]:
+        """
+        Async version of classify(); the HTTP call does not block the event loop.
+        
+        With batching enabled, concurrent calls are merged into one API request.
+        """
+        if not (self.enabled and self.headers):
+            return self._decide(*self._offline(query))
+        
+        local, confidence = self._local(query)
+        if confidence >= self.cascade_threshold:
+            return self._decide(local, "local")
+        
+        if self.hedge_ms > 0 and local is not None:
+            task = asyncio.ensure_future(self._aremote(query))
+            done, _ = await asyncio.wait({task}, timeout=self.hedge_ms / 1000)
+            if task in done:
+                return self._decide(*task.result())
+            # Let the call finish in the background so the breaker still learns from it
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            return self._decide(local, "hedged")
+        return self._decide(*await self._aremote(query))
+    
+    def classify_batch(self, queries: List[str]) -> List[Tuple[str, bool, bool]]:
+        """
+        Classify many queries at once (cache warming, re-labelling logs, evaluation).
+        
+        Queries the local stage is unsure about are deduplicated and sent in
+        chunks of BATCH_CHUNK_SIZE per API request. Results keep input order;
+        a failed chunk or malformed item falls back to keywords on its own.
+        """
+        if not queries:
+            return []
+        if not (self.enabled and self.headers):
+            return [self._decide(*self._offline(q)) for q in queries]
+        
+        results, remote = self._cascade_batch(queries)
+        if remote:
+            for i, decided in zip(remote, self._remote_batch([queries[i] for i in remote])):
+                results[i] = self._decide(*decided)
+        return results
+    
+    async def aclassify_batch(self, queries: List[str]) -> List[Tuple[str, bool, bool]]:
+        """Async version of classify_batch; chunks are sent concurrently."""
+        if not queries:
+            return []
+        if not (self.enabled and self.headers):
+            return [self._decide(*self._offline(q)) for q in queries]
+        
+        results, remote = self._cascade_batch(queries)
+        if remote:
+            for i, decided in zip(remote, await self._aremote_batch([queries[i] for i in remote])):
+                results[i] = self._decide(*decided)
+        return results
+    
+    # -------------------------------------------------------------------------
+    # Cascade stages
+    # -------------------------------------------------------------------------
+    
+    def _local(self, query: str) -> Tuple[Optional[Classification], float]:
+        """Local stage decision and confidence ((None, 0.0) if the cascade is off)."""
+        if self.local_stage is None:
+            return None, 0.0
+        return self.local_stage(query)
+    
+    def _model_stage(self, query: str) -> Tuple[Classification, float]:
+        label, proba = self.model.predict(query)
+        return LABEL_TO_INTENT.get(label, ("general", False, False)), proba
+    
+    def _offline(self, query: str) -> Tuple[Classification, str]:
+        """Classification without the API: trained model if confident, else keywords."""
+        if self.model is not None:
+            local, confidence = self._model_stage(query)
+            if confidence >= MIN_CONFIDENCE:
+                return local, "model"
+        return self._classify_with_keywords(query), "keywords"
+    
+    def _cascade_batch(self, queries: List[str]) -> Tuple[list, List[int]]:
+        """Decide what the local stage can; return results and indexes left for the API."""
+        results, remote = [], []
+        for i, query in enumerate(queries):
+            local, confidence = self._local(query)
+            if confidence >= self.cascade_threshold:
+                results.append(self._decide(local, "local"))
+            else:
+                results.append(None)
+                remote.append(i)
+        return results, remote
+    
+    def _decide(self, result: Classification, stage: str) -> Classification:
+        self._decisions.inc(stage=stage)
+        annotate(classifier_stage=stage)
+        return result
+    
+    def _remote(self, query: str) -> Tuple[Classification, str]:
+        """Remote classification and the stage that produced it."""
+        try:
+            return self._classify_with_ml(query), "remote"
+        except Exception as e:
+            return self._fallback(query, e), "fallback"
+    
+    async def _aremote(self, query: str) -> Tuple[Classification, str]:
+        if self._batch_window_ms > 0:
+            return await self._get_batcher().submit(query)
+        try:
+            return await self._aclassify_with_ml(query), "remote"
+        except Exception as e:
+            return self._fallback(query, e), "fallback"
+    
+    def _remote_batch(self, queries: List[str]) -> List[Tuple[Classification, str]]:
+        """Classify via the API in chunks, once per distinct query, in input order."""
+        unique = list(dict.fromkeys(queries))
+        decided = {}
+        for chunk in _chunks(unique, BATCH_CHUNK_SIZE):
+            decided.update(zip(chunk, self._classify_batch_with_ml(chunk)))
+        return [decided[q] for q in queries]
+    
+    async def _aremote_batch(self, queries: List[str]) -> List[Tuple[Classification, str]]:
+        """Async version of _remote_batch; chunks are sent concurrently."""
+        unique = list(dict.fromkeys(queries))
+        chunks = _chunks(unique, BATCH_CHUNK_SIZE)
+        results = await asyncio.gather(*[self._aclassify_batch_with_ml(chunk) for chunk in chunks])
+        decided = {q: r for chunk, rs in zip(chunks, results) for q, r in zip(chunk, rs)}
+        return [decided[q] for q in queries]
+    
+    def _fallback(self, query: str, error: Exception) -> Tuple[str, bool, bool]:
+        """Keyword classification after the API call failed or was skipped."""
+        if isinstance(error, CircuitOpenError):
+            self._fallbacks.inc(reason="circuit_open")
         else:
-            return self._classify_with_keywords(query)
+            self._fallbacks.inc(reason="error")
+            print(f"⚠ ML classification failed: {error}, using fallback")
+        return self._classify_with_keywords(query)
+    
+    def stats(self) -> dict:
+        """Deciding stages, breaker state, fallback counts and API latency by outcome."""
+        decisions = {labels["stage"]: int(v) for labels, v in self._decisions.items()}
+        total = sum(decisions.values())
+        return {
+            "decisions": decisions,
+            "remote_rate": decisions.get("remote", 0) / total if total else 0.0,
+            "breaker": self._breaker.stats(),
+            "fallbacks": {labels["reason"]: int(v) for labels, v in self._fallbacks.items()},
+            "latency": {
+                labels["outcome"]: self._latency.summary(**labels)
+                for labels, *_ in self._latency.items()
+            },
+        }
+    
+    def enable_batching(self, window_ms: float, max_batch: int = 16) -> None:
+        """
+        Merge concurrent aclassify() calls into batched API requests.
+        
+        Args:
+            window_ms: How long the first call of a batch waits for company
+            max_batch: Flush immediately once this many calls are waiting
+        """
+        self._batch_window_ms = window_ms
+        self._max_batch = max_batch
+    
+    def _get_batcher(self) -> "ClassifierBatcher":
+        loop = asyncio.get_running_loop()
+        batcher = self._batchers.get(loop)
+        if batcher is None:
+            batcher = ClassifierBatcher(self, self._batch_window_ms, self._max_batch)
+            self._batchers[loop] = batcher
+        return batcher
     
     def _classify_with_ml(self, query: str) -> Tuple[str, bool, bool]:
         """Classify using the zero-shot ML model via direct API call."""
-        payload = {
-            "inputs": query,
+        return self._parse_ml_result(query, self._post(self._ml_payload(query)))
+    
+    async def _aclassify_with_ml(self, query: str) -> Tuple[str, bool, bool]:
+        """Async version of _classify_with_ml."""
+        return self._parse_ml_result(query, await self._apost(self._ml_payload(query)))
+    
+    def _classify_batch_with_ml(self, queries: List[str]) -> List[Tuple[Classification, str]]:
+        """One API request for a chunk; a failed request falls back for the whole chunk."""
+        try:
+            result = self._post(self._ml_payload(queries))
+        except Exception as e:
+            return [(self._fallback(q, e), "fallback") for q in queries]
+        return self._parse_batch_result(queries, result)
+    
+    async def _aclassify_batch_with_ml(self, queries: List[str]) -> List[Tuple[Classification, str]]:
+        try:
+            result = await self._apost(self._ml_payload(queries))
+        except Exception as e:
+            return [(self._fallback(q, e), "fallback") for q in queries]
+        return self._parse_batch_result(queries, result)
+    
+    def _post(self, payload: dict):
+        """POST to the API through the circuit breaker, with retries."""
+        if not self._breaker.allow():
+            raise CircuitOpenError("HF classifier circuit is open")
+        try:
+            result = retry_call(lambda: self._post_once(payload), MAX_RETRIES, _RETRYABLE_SYNC)
+        except BaseException:
+            self._breaker.record_failure()
+            raise
+        self._breaker.record_success()
+        return result
+    
+    async def _apost(self, payload: dict):
+        """Async version of _post."""
+        if not self._breaker.allow():
+            raise CircuitOpenError("HF classifier circuit is open")
+        try:
+            result = await aretry_call(lambda: self._apost_once(payload), MAX_RETRIES, _RETRYABLE_ASYNC)
+        except BaseException:
+            self._breaker.record_failure()
+            raise
+        self._breaker.record_success()
+        return result
+    
+    def _post_once(self, payload: dict):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self._session.post(
+                API_URL, headers=self.headers, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
+            outcome = str(response.status_code)
+            check_response(response)
+            return response.json()
+        finally:
+            self._latency.observe(time.perf_counter() - start, outcome=outcome)
+    
+    async def _apost_once(self, payload: dict):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._get_async_client().post(API_URL, headers=self.headers, json=payload)
+            outcome = str(response.status_code)
+            check_response(response)
+            return response.json()
+        finally:
+            self._latency.observe(time.perf_counter() - start, outcome=outcome)
+    
+    def _parse_batch_result(self, queries: List[str], result) -> List[Tuple[Classification, str]]:
+        """Per-query results; malformed items fall back to keywords individually."""
+        # A single input comes back as a flat list of {"label", "score"}
+        if len(queries) == 1 and isinstance(result, list) and result and isinstance(result[0], dict):
+            result = [result]
+        if not isinstance(result, list) or len(result) != len(queries):
+            error = ValueError(f"expected {len(queries)} results, got {len(result) if isinstance(result, list) else result!r}")
+            return [(self._fallback(q, error), "fallback") for q in queries]
+        
+        decided = []
+        for query, item in zip(queries, result):
+            try:
+                decided.append((self._parse_ml_result(query, item), "remote"))
+            except (KeyError, IndexError, TypeError):
+                decided.append((self._fallback(query, ValueError(f"malformed result {item!r}")), "fallback"))
+        return decided
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_keepalive_connections=POOL_SIZE),
+            )
+            self._async_clients[loop] = client
+        return client
+    
+    @staticmethod
+    def _ml_payload(inputs) -> dict:
+        return {
+            "inputs": inputs,
             "parameters": {
                 "candidate_labels": INTENT_LABELS
             }
         }
-        
-        response = requests.post(API_URL, headers=self.headers, json=payload, timeout=30)
-        response.raise_for_status()
-        result = response.json()
-        
+    
+    def _parse_ml_result(self, query: str, result) -> Tuple[str, bool, bool]:
+        """Map the zero-shot API response to (intent, is_casual, needs_web_search)."""
         # Result format: list of {"label": "...", "score": 0.xx}
         # First item is the highest scoring label
-        print('Results: ', result)
         top_result = result[0]
         top_label = top_result["label"]
         top_score = top_result["score"]
+        self._remote_scores.observe(top_score, label=top_label)
+        if CLASSIFIER_LOG_PATH:
+            _log_classification(query, top_label, top_score)
         
         # If confidence is too low, fall back to keywords
         if top_score < MIN_CONFIDENCE:
@@ -122,27 +558,80 @@ class IntentClassifier:
     
     def _classify_with_keywords(self, query: str) -> Tuple[str, bool, bool]:
         """Fallback keyword-based classification."""
-        q = query.lower().strip()
-        
-        # Check for casual messages
-        if len(q.split()) <= 5:
-            is_casual = any(kw in q for kw in CASUAL_KEYWORDS)
-        else:
-            is_casual = q in CASUAL_KEYWORDS or q.rstrip('!?.') in CASUAL_KEYWORDS
-        
-        if is_casual:
-            return "casual", True, False
+        return classify_with_keywords(query)
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _log_classification(query: str, label: str, score: float) -> None:
+    """Append a remote classification to the training log for the intent model."""
+    record = json.dumps({"query": query, "label": label, "score": round(score, 4)})
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(CLASSIFIER_LOG_PATH) or ".", exist_ok=True)
+            with open(CLASSIFIER_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(record + "\n")
+    except OSError as e:
+        print(f"⚠ Could not write classification log: {e}")
+
+
+# =============================================================================
+# MICRO-BATCHING
+# =============================================================================
+
+class ClassifierBatcher:
+    """
+    Collects concurrent remote classifications on one event loop into a batch.
+    
+    The first call opens a window of ``window_ms``; every call that arrives
+    in the window (up to ``max_batch``) shares a single API request.
+    """
+    
+    def __init__(self, classifier: IntentClassifier, window_ms: float, max_batch: int):
+        self.classifier = classifier
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer = None
+        self.batches = 0
+        self.batched_queries = 0
+    
+    async def submit(self, query: str) -> Tuple[Classification, str]:
+        """Queue a query; resolves to (classification, deciding stage)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
         
-        # Check for time-sensitive queries
-        needs_web = any(kw in q for kw in TIME_SENSITIVE_KEYWORDS)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
         
-        # Basic intent classification
-        if any(x in q for x in ["admission", "apply", "enroll", "entrance", "scholarship"]):
-            return "admissions", False, needs_web
-        elif any(x in q for x in ["program", "course", "degree", "curriculum", "major"]):
-            return "academic", False, needs_web
-        else:
-            return "general", False, needs_web
+        return await future
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+    
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.batched_queries += len(batch)
+        try:
+            results = await self.classifier._aremote_batch([q for q, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
 
 
 # =============================================================================
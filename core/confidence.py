@@ -0,0 +1,356 @@
+# core/confidence.py
+"""
+Pre-generation confidence gating for the vector-only path.
+
+resolve_with_fallback used to find out that the retrieved context could
+not answer a query only after a full LLM generation (by scanning the
+answer for UNCERTAINTY_PHRASES), after which the web fallback or the
+escalation threw that answer away. Here the decision is made from the
+retrieval itself, before any generation:
+
+- "answer": the vector context is likely enough → resolve_with_fallback
+- "web": go straight to web_fallback
+- "escalate": neither is likely to help → escalate
+
+The decision comes from a small softmax regression over retrieval
+features (vector relevance scores, BM25 score, how many query terms the
+context contains, how much context there is), calibrated on a labelled
+query set. Queries are only diverted from "answer" below a threshold
+chosen so that CONFIDENCE_MIN_RECALL of the answerable calibration
+queries are still answered. Without a calibrated model, only the old
+thin-context rule applies (no docs or too little text → web).
+
+Usage:
+    python -m core.confidence calibrate --queries benchmarks/confidence_queries.jsonl
+    python -m core.confidence assess "hostel fees for international students"
+"""
+
+import argparse
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.config import (
+    CHARS_PER_TOKEN,
+    CONFIDENCE_MIN_RECALL,
+    CONTEXT_TOKEN_BUDGET,
+    LEXICAL_SCORE_SCALE,
+    MIN_CONTEXT_LENGTH,
+    RETRIEVER_K,
+)
+from core.lexical import tokenize
+from core.metrics import counter
+from core.tracing import annotate
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONFIDENCE_GATING = os.getenv("CONFIDENCE_GATING", "true").lower() in ("1", "true", "yes")
+CONFIDENCE_MODEL_PATH = os.getenv("CONFIDENCE_MODEL_PATH") or "./.cache/confidence_model.json"
+
+MODEL_VERSION = 1
+DECISIONS = ("answer", "web", "escalate")
+FEATURES = ("top_score", "mean_score", "scored_docs", "top_lexical", "term_coverage", "context_fill")
+
+_decisions = counter("context_decisions_total", "Pre-generation context decisions, by decision and source")
+
+
+@dataclass
+class Assessment:
+    decision: str
+    confidence: Optional[float]     # P(answer); None when decided by the thin-context rule
+
+
+# =============================================================================
+# FEATURES
+# =============================================================================
+
+def retrieval_scores(docs: Sequence) -> List[float]:
+    """Vector relevance score of each doc (0.0 for docs only BM25 found)."""
+    return [float(d.metadata.get("score", 0.0)) for d in docs]
+
+
+def features(query: str, docs: Sequence) -> np.ndarray:
+    """Retrieval features of a query's docs, each in [0, 1], in FEATURES order."""
+    scores = [d.metadata["score"] for d in docs if "score" in d.metadata]
+    lexical = [d.metadata["lexical_score"] for d in docs if "lexical_score" in d.metadata]
+    terms = set(tokenize(query))
+    found = set(tokenize(" ".join(d.page_content for d in docs))) if terms else set()
+    chars = sum(len(d.page_content) for d in docs)
+
+    top_lexical = max(lexical, default=0.0)
+    return np.array([
+        max(scores, default=0.0),
+        sum(scores) / len(scores) if scores else 0.0,
+        min(1.0, len(scores) / RETRIEVER_K),
+        top_lexical / (top_lexical + LEXICAL_SCORE_SCALE),
+        len(terms & found) / len(terms) if terms else 0.0,
+        min(1.0, chars / (CONTEXT_TOKEN_BUDGET * CHARS_PER_TOKEN)),
+    ], dtype=np.float32)
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+
+class ConfidenceModel:
+    """Softmax regression from retrieval features to DECISIONS."""
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None,
+                 answer_threshold: float = 0.5, calibration: Optional[dict] = None):
+        self.weights = weights if weights is not None else np.zeros((len(FEATURES), len(DECISIONS)), np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(DECISIONS), np.float32)
+        self.answer_threshold = answer_threshold
+        self.calibration = calibration or {}
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        """Probability of each decision for one feature vector (or a batch)."""
+        logits = x @ self.weights + self.bias
+        logits = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return logits / logits.sum(axis=-1, keepdims=True)
+
+    def decide(self, x: np.ndarray) -> Tuple[str, float]:
+        """Decision and P(answer) for one feature vector."""
+        proba = self.predict_proba(x)
+        p_answer = float(proba[0])
+        if p_answer >= self.answer_threshold:
+            return "answer", p_answer
+        return ("web" if proba[1] >= proba[2] else "escalate"), p_answer
+
+    # -------------------------------------------------------------------------
+    # Training
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def train(cls, x: np.ndarray, labels: Sequence[str], epochs: int = 3000,
+              learning_rate: float = 1.0, l2: float = 1e-3) -> "ConfidenceModel":
+        """Full-batch gradient descent on the softmax cross-entropy."""
+        model = cls()
+        n = len(labels)
+        targets = np.zeros((n, len(DECISIONS)), np.float32)
+        targets[np.arange(n), [DECISIONS.index(l) for l in labels]] = 1.0
+        # Classes weighted by inverse frequency, so a rare "escalate" still counts
+        class_weight = n / (len(DECISIONS) * np.maximum(targets.sum(axis=0), 1.0))
+        sample_weight = (targets * class_weight).sum(axis=1, keepdims=True)
+
+        for _ in range(epochs):
+            error = (model.predict_proba(x) - targets) * sample_weight / n
+            model.weights -= learning_rate * (x.T @ error + l2 * model.weights)
+            model.bias -= learning_rate * error.sum(axis=0)
+        return model
+
+    def calibrate(self, x: np.ndarray, labels: Sequence[str], min_recall: float = CONFIDENCE_MIN_RECALL) -> float:
+        """
+        Set the highest answer threshold that still answers min_recall of
+        the "answer" queries, so the most doomed generations are skipped.
+        """
+        if not 0 < min_recall <= 1:
+            raise ValueError(f"min_recall must be in (0, 1], got {min_recall}")
+        p_answer = self.predict_proba(x)[:, 0]
+        answerable = np.sort(p_answer[np.asarray(labels) == "answer"])
+        if len(answerable) == 0:
+            self.answer_threshold = 0.5
+        else:
+            # At most this many answerable queries may fall below the threshold
+            allowed = int(np.floor(len(answerable) * (1 - min_recall) + 1e-9))
+            self.answer_threshold = float(answerable[allowed])
+        return self.answer_threshold
+
+    def evaluate(self, x: np.ndarray, labels: Sequence[str]) -> dict:
+        """Answer recall, LLM calls saved and decision accuracy on a labelled set."""
+        decisions = [self.decide(row)[0] for row in x]
+        labels = list(labels)
+        answerable = [d for d, l in zip(decisions, labels) if l == "answer"]
+        doomed = [d for d, l in zip(decisions, labels) if l != "answer"]
+        return {
+            "queries": len(labels),
+            "answer_recall": answerable.count("answer") / len(answerable) if answerable else 0.0,
+            "calls_saved": sum(d != "answer" for d in doomed),
+            "doomed": len(doomed),
+            "accuracy": sum(d == l for d, l in zip(decisions, labels)) / len(labels) if labels else 0.0,
+        }
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MODEL_VERSION,
+                "features": list(FEATURES),
+                "decisions": list(DECISIONS),
+                "weights": self.weights.round(6).tolist(),
+                "bias": self.bias.round(6).tolist(),
+                "answer_threshold": round(self.answer_threshold, 6),
+                "calibration": self.calibration,
+            }, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ConfidenceModel":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"unsupported confidence model version {data.get('version')}")
+        if tuple(data["features"]) != FEATURES or tuple(data["decisions"]) != DECISIONS:
+            raise ValueError("confidence model was calibrated with different features; re-run calibrate")
+        return cls(
+            weights=np.asarray(data["weights"], dtype=np.float32),
+            bias=np.asarray(data["bias"], dtype=np.float32),
+            answer_threshold=float(data["answer_threshold"]),
+            calibration=data.get("calibration"),
+        )
+
+
+def load_confidence_model(path: str = CONFIDENCE_MODEL_PATH) -> Optional[ConfidenceModel]:
+    """Load the calibrated model, or None if there is none (or it is unreadable)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        model = ConfidenceModel.load(path)
+    except Exception as e:
+        print(f"⚠ Could not load confidence model from {path}: {e}")
+        return None
+    print(f"✓ Loaded confidence model from {path} (answer threshold {model.answer_threshold:.3f})")
+    return model
+
+
+_model: Optional[ConfidenceModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_confidence_model() -> Optional[ConfidenceModel]:
+    """The calibrated model, loaded once (None if not calibrated yet)."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                _model = load_confidence_model()
+                _model_loaded = True
+    return _model
+
+
+# =============================================================================
+# GATING
+# =============================================================================
+
+def assess_context(query: str, docs: Sequence) -> Assessment:
+    """Decide, before generation, what to do with the retrieved docs."""
+    if not docs or sum(len(d.page_content) for d in docs) < MIN_CONTEXT_LENGTH:
+        assessment, source = Assessment("web", None), "rule"
+    elif not CONFIDENCE_GATING or get_confidence_model() is None:
+        assessment, source = Assessment("answer", None), "rule"
+    else:
+        decision, confidence = get_confidence_model().decide(features(query, docs))
+        assessment, source = Assessment(decision, round(confidence, 4)), "model"
+
+    _decisions.inc(decision=assessment.decision, source=source)
+    annotate(context_decision=assessment.decision, confidence=assessment.confidence)
+    return assessment
+
+
+# =============================================================================
+# CALIBRATION
+# =============================================================================
+
+def read_queries(path: str) -> Tuple[List[str], List[str]]:
+    """Queries and labels from a JSONL file of {"query", "label"} records."""
+    queries, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record["label"] not in DECISIONS:
+                raise SystemExit(f"{path}:{n}: label must be one of {', '.join(DECISIONS)}")
+            queries.append(record["query"])
+            labels.append(record["label"])
+    return queries, labels
+
+
+def _retrieve(query: str) -> list:
+    """Docs for a query, retrieved exactly as the vector-only path does."""
+    from core.classifier import get_classifier
+    from core.scope import retrieve
+    from langChainFun import get_retriever
+
+    intent = get_classifier().classify(query)[0]
+    return retrieve(get_retriever(), query, intent)
+
+
+def _split(n: int, holdout: float, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.random.default_rng(seed).permutation(n)
+    n_test = int(n * holdout)
+    return order[n_test:], order[:n_test]
+
+
+def _report(name: str, metrics: dict) -> None:
+    print(f"{name}: answered {metrics['answer_recall']:.0%} of answerable queries, "
+          f"skipped {metrics['calls_saved']}/{metrics['doomed']} doomed generations, "
+          f"decision accuracy {metrics['accuracy']:.0%} ({metrics['queries']} queries)")
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Calibrate or try the pre-generation confidence model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = sub.add_parser("calibrate", help="fit the model on a labelled query set")
+    calibrate.add_argument("--queries", default="benchmarks/confidence_queries.jsonl",
+                           help='JSONL of {"query", "label"} with label answer / web / escalate')
+    calibrate.add_argument("--out", default=CONFIDENCE_MODEL_PATH, help="where to write the model")
+    calibrate.add_argument("--min-recall", type=float, default=CONFIDENCE_MIN_RECALL,
+                           help="share of answerable queries that must still be answered")
+    calibrate.add_argument("--holdout", type=float, default=0.25, help="fraction held out for evaluation")
+
+    assess = sub.add_parser("assess", help="show the features and decision for queries")
+    assess.add_argument("queries", nargs="+")
+    assess.add_argument("--model", default=CONFIDENCE_MODEL_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "assess":
+        model = load_confidence_model(args.model)
+        for query in args.queries:
+            x = features(query, _retrieve(query))
+            shown = "  ".join(f"{name}={value:.2f}" for name, value in zip(FEATURES, x))
+            decision, confidence = model.decide(x) if model else ("answer", float("nan"))
+            print(f"{decision:<8} p={confidence:.2f}  {shown}  ← {query}")
+        return
+
+    if not 0 < args.min_recall <= 1:
+        raise SystemExit(f"--min-recall must be in (0, 1], got {args.min_recall}")
+    queries, labels = read_queries(args.queries)
+    if not queries:
+        raise SystemExit(f"No queries in {args.queries}")
+    print(f"Retrieving context for {len(queries)} labelled queries...")
+    x = np.stack([features(q, _retrieve(q)) for q in queries])
+    labels = np.asarray(labels)
+
+    train, test = _split(len(queries), args.holdout)
+    if len(test):
+        model = ConfidenceModel.train(x[train], labels[train])
+        model.calibrate(x[train], labels[train], args.min_recall)
+        _report("Held out", model.evaluate(x[test], labels[test]))
+
+    # Final model sees every query
+    model = ConfidenceModel.train(x, labels)
+    model.calibrate(x, labels, args.min_recall)
+    model.calibration = {"queries": args.queries, "min_recall": args.min_recall, **model.evaluate(x, labels)}
+    _report("Calibration set", model.calibration)
+    model.save(args.out)
+    print(f"✓ Answer threshold {model.answer_threshold:.3f}, saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,28 @@
 
 # =============================================================================
 # CASUAL KEYWORDS
-# Messages containing these skip the RAG pipeline entirely
-# =============================================================================
-CASUAL_KEYWORDS = [
-    # Greetings
-    "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
-    "greetings", "howdy", "what's up", "whats up", "sup",
-    # Farewells
-    "bye", "goodbye", "see you", "take care", "good night",
-    # Gratitude
-    "thank you", "thanks", "thank", "appreciate", "grateful",
-    # Casual conversation
-    "how are you", "how's it going", "nice to meet", "pleasure",
-    # Simple responses
-    "ok", "okay", "sure", "yes", "no", "got it", "understood",
-    # Compliments
-    "great", "awesome", "cool", "nice", "good job", "well done"
+# Messages containing these skip the RAG pipeline entirely; categories with
+# a template reply (core/casual.py) are answered without the LLM
+# =============================================================================
+CASUAL_KEYWORD_CATEGORIES = {
+    "greeting": [
+        "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
+        "greetings", "howdy", "what's up", "whats up", "sup",
+    ],
+    "farewell": ["bye", "goodbye", "see you", "take care", "good night"],
+    "gratitude": ["thank you", "thanks", "thank", "appreciate", "grateful"],
+    "small_talk": ["how are you", "how's it going"],
+    "pleasantry": ["nice to meet", "pleasure"],
+    "acknowledgement": ["ok", "okay", "sure", "yes", "no", "got it", "understood"],
+    "compliment": ["great", "awesome", "cool", "nice", "good job", "well done"],
+}
+CASUAL_KEYWORDS = [kw for keywords in CASUAL_KEYWORD_CATEGORIES.values() for kw in keywords]
+
+# Words that may surround casual keywords in a message that still gets a template reply
+CASUAL_FILLER_WORDS = [
+    "a", "again", "all", "and", "bot", "dear", "everyone", "for", "friend", "guys",
+    "help", "i", "it", "lot", "much", "my", "oh", "so", "that", "the", "then", "there",
+    "too", "very", "well", "you", "your",
 ]
 
 # =============================================================================
@@ -38,6 +44,7 @@ TIME_SENSITIVE_KEYWORDS = [
 # =============================================================================
 INTENT_KEYWORDS = {
     "admissions": ["admission", "apply", "enroll", "entrance", "scholarship"],
+    "academic": ["program", "course", "degree", "curriculum", "major"],
     "undergraduate": ["undergraduate", "bachelor", "bba", "bs"],
     "graduate": ["graduate", "master", "mba", "ms", "phd"],
     "engineering_cs": ["engineering", "information technology", "IT", "CS", "SE", 
@@ -60,3 +67,117 @@ UNCERTAINTY_PHRASES = [
 # =============================================================================
 MIN_CONTEXT_LENGTH = 50  # Minimum context length to proceed without fallback
 MIN_ANSWER_LENGTH = 40   # Answers shorter than this may trigger escalation
+
+# =============================================================================
+# RETRIEVAL SETTINGS
+# =============================================================================
+RETRIEVAL_BRANCH_TIMEOUT = 8.0  # Seconds each parallel retrieval branch may take
+
+# Weak-context thresholds that trigger a speculative web prefetch
+SPECULATIVE_MIN_DOCS = 2         # Fewer retrieved docs than this is weak
+SPECULATIVE_MIN_TOP_SCORE = 0.6  # Top relevance score below this is weak
+SPECULATIVE_PREFETCH_TTL = 30.0  # Seconds an unclaimed prefetch is kept before it expires
+
+# =============================================================================
+# ANSWER CACHE SETTINGS
+# Cached answers are reused for the same (or a near-identical) question
+# =============================================================================
+ANSWER_CACHE_MAX_ENTRIES = 1000       # LRU bound on cached answers
+ANSWER_CACHE_SIMILARITY = 0.93        # Min cosine similarity for a semantic hit
+
+# Time-to-live in seconds per classified intent
+ANSWER_CACHE_TTLS = {
+    "time_sensitive": 5 * 60,         # Deadlines/events change: keep briefly
+    "admissions": 24 * 60 * 60,
+    "academic": 24 * 60 * 60,
+    "general": 6 * 60 * 60,
+    "casual": 24 * 60 * 60,
+}
+ANSWER_CACHE_DEFAULT_TTL = 60 * 60
+
+# =============================================================================
+# WEB SEARCH CACHE SETTINGS
+# Tavily results are reused across users asking the same question
+# =============================================================================
+WEB_SEARCH_CACHE_TTL = 10 * 60          # Seconds a result is served as fresh
+WEB_SEARCH_CACHE_STALE_TTL = 60 * 60    # Further seconds served stale while refreshing
+WEB_SEARCH_CACHE_MAX_ENTRIES = 1000     # In-memory LRU bound (SQLite keeps the rest)
+
+# =============================================================================
+# CONTEXT ASSEMBLY SETTINGS
+# How retrieved chunks and web results are packed into the prompt
+# =============================================================================
+CONTEXT_TOKEN_BUDGET = 1500     # Estimated tokens of context per prompt
+CONTEXT_WEB_SHARE = 0.5         # Share of the budget for web results when both are present
+WEB_RESULT_MAX_TOKENS = 250     # Each web result is trimmed to its best passages within this
+CHARS_PER_TOKEN = 4             # Rough characters per token for estimates
+MIN_CHUNK_OVERLAP = 20          # Shortest shared text treated as splitter overlap
+MAX_CHUNK_OVERLAP = 200         # Longest overlap searched for between two chunks
+
+# =============================================================================
+# LLM RESPONSE CACHE SETTINGS
+# =============================================================================
+LLM_CACHE_MAX_ENTRIES = 5000    # Least recently used responses are evicted beyond this
+
+# =============================================================================
+# HYBRID RETRIEVAL SETTINGS
+# BM25 over the dataset chunks, fused with vector results (core/lexical.py)
+# =============================================================================
+RETRIEVER_K = 3                 # Documents handed to the answer nodes
+HYBRID_CANDIDATES = 8           # Candidates taken from each retriever before fusion
+RRF_K = 60                      # Reciprocal-rank fusion constant
+BM25_K1 = 1.5                   # Term frequency saturation
+BM25_B = 0.75                   # Document length normalization
+
+# =============================================================================
+# RETRIEVAL SCOPE
+# Chunks are tagged at ingest with an intent and facets; retrieval searches
+# only the chunks that fit the query, and everything if none do
+# =============================================================================
+SCOPED_INTENTS = ("admissions", "academic")   # Classifier intents that narrow the search
+FILE_INTENTS = {                              # Dataset file name prefix → chunk intent
+    "admissions": "admissions",
+    "programs": "academic",
+}
+FACETS = {                                    # Facet → INTENT_KEYWORDS categories it takes
+    "degree_level": ("undergraduate", "graduate"),
+    "faculty": ("engineering_cs", "business_natural"),
+}
+
+# =============================================================================
+# FACT LOOKUP
+# Fee and eligibility questions answered from the parsed dataset (core/facts.py)
+# =============================================================================
+FACT_FEE_TERMS = ["fee", "fees", "tuition", "cost", "price", "how much"]
+FACT_ELIGIBILITY_TERMS = ["eligibility", "eligible", "criteria", "qualify", "minimum"]
+# Eligibility questions about one criterion only get the matching lines
+FACT_CRITERIA_TERMS = {
+    "gpa": ["gpa", "cgpa", "grade"],
+    "test": ["gat", "test", "entrance test"],
+    "experience": ["experience", "work experience"],
+}
+# Degree codes and level words → level ("graduate" alone covers both)
+FACT_LEVEL_TERMS = {
+    "undergraduate": ["undergraduate", "undergrad", "bachelor", "bachelors", "bs", "bba"],
+    "masters": ["master", "masters", "ms", "mba", "graduate"],
+    "phd": ["phd", "doctorate", "doctoral", "graduate"],
+}
+FACT_DEGREE_PROGRAMS = {"bba": "Business Administration", "mba": "Business Administration"}
+# Billing period words → the period a fee must state to answer them
+FACT_PERIOD_TERMS = {
+    "per semester": ["semester", "per semester", "semesterly"],
+    "per year": ["year", "per year", "yearly", "annual", "annually", "per annum"],
+}
+# Words that don't change what is asked
+FACT_FILLER_TERMS = [
+    "program", "programs", "degree", "per", "student",
+    "admission", "admissions", "university", "sargodha", "uos", "please", "s", "structure",
+]
+
+# =============================================================================
+# CONFIDENCE GATING
+# Decide from the retrieval scores, before generation, whether to answer from
+# the vector context, go straight to web search or escalate (core/confidence.py)
+# =============================================================================
+CONFIDENCE_MIN_RECALL = 0.95    # Share of answerable queries calibration must keep answering
+LEXICAL_SCORE_SCALE = 5.0       # BM25 score that maps to a 0.5 lexical feature
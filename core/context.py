@@ -0,0 +1,208 @@
+# core/context.py
+"""
+Prompt context assembly for the answer generation nodes.
+
+Every generation node builds its context here instead of joining
+``page_content`` and ``format_web_results`` itself:
+
+- Retrieved chunks from the same source lose the text they share with
+  another chunk (the splitter's ``chunk_overlap``), and duplicates are
+  dropped, so nothing is sent to the model twice.
+- Web results are trimmed to the passages that best match the query.
+- Everything is packed, best-ranked first, into CONTEXT_TOKEN_BUDGET
+  tokens; whatever does not fit is left out.
+
+Token counts are estimates (about CHARS_PER_TOKEN characters per token),
+which is close enough for budgeting without loading a tokenizer.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from core.config import (
+    CHARS_PER_TOKEN,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_WEB_SHARE,
+    MAX_CHUNK_OVERLAP,
+    MIN_CHUNK_OVERLAP,
+    WEB_RESULT_MAX_TOKENS,
+)
+from core.metrics import histogram
+from webSearch import format_web_results
+
+
+_WORD_RE = re.compile(r"\w+")
+_PASSAGE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Too common to say anything about which passage answers the query
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "the their there this to was what when where which who why will with you your".split()
+)
+
+_PROMPT_TOKENS = histogram(
+    "agent_prompt_tokens",
+    "Estimated prompt tokens sent to the LLM, by node",
+    buckets=(100, 250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def record_prompt_tokens(node: str, messages: Sequence) -> int:
+    """Estimate the prompt size of the messages and record it for the node."""
+    tokens = sum(estimate_tokens(m.content) for m in messages)
+    _PROMPT_TOKENS.observe(tokens, node=node)
+    return tokens
+
+
+@dataclass
+class PackedContext:
+    vector_context: str
+    web_context: str
+    tokens: int          # Estimated tokens of both contexts
+    dropped: int         # Chunks/results left out for lack of budget
+
+
+# =============================================================================
+# VECTOR CHUNKS
+# =============================================================================
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of left that is also a prefix of right."""
+    longest = min(len(left), len(right), MAX_CHUNK_OVERLAP)
+    for size in range(longest, MIN_CHUNK_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def dedupe_chunks(docs: Sequence) -> List[str]:
+    """
+    Chunk texts in rank order, without text already sent in another chunk.
+
+    Only chunks from the same source (``metadata["source"]``) are compared,
+    since that is where the splitter's overlap comes from.
+    """
+    kept: List[str] = []
+    sources: List[Optional[str]] = []
+    for doc in docs:
+        text = doc.page_content.strip()
+        source = (doc.metadata or {}).get("source")
+        for other, other_source in zip(kept, sources):
+            if other_source != source or not text:
+                continue
+            if text in other:
+                text = ""
+                break
+            # Right after a kept chunk → drop the repeated head;
+            # right before one → drop the repeated tail
+            head = _overlap(other, text)
+            if head:
+                text = text[head:].lstrip()
+            tail = _overlap(text, other)
+            if tail:
+                text = text[:-tail].rstrip()
+        if text:
+            kept.append(text)
+            sources.append(source)
+    return kept
+
+
+# =============================================================================
+# WEB RESULTS
+# =============================================================================
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def select_passages(content: str, query: str, max_tokens: int) -> str:
+    """
+    The sentences of the content that share the most terms with the query,
+    in their original order, within max_tokens.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+    passages = [p.strip() for p in _PASSAGE_RE.split(content) if p.strip()]
+    terms = _terms(query)
+    scores = [len(terms & _terms(p)) for p in passages]
+    ranked = sorted((i for i in range(len(passages)) if scores[i]), key=lambda i: (-scores[i], i))
+    # Nothing matches the query → keep the opening passages
+    ranked = ranked or list(range(len(passages)))
+
+    chosen, used = [], 0
+    for i in ranked:
+        cost = estimate_tokens(passages[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        chosen.append(i)
+        used += cost
+    if not chosen:
+        return passages[ranked[0]][:max_tokens * CHARS_PER_TOKEN]
+    return " ".join(passages[i] for i in sorted(chosen))
+
+
+def trim_web_results(results: Sequence[dict], query: str, max_tokens: int = WEB_RESULT_MAX_TOKENS) -> List[dict]:
+    """Copies of the results with content cut down to the query's passages."""
+    return [
+        {**r, "content": select_passages(r.get("content", ""), query, max_tokens)}
+        for r in results
+    ]
+
+
+# =============================================================================
+# PACKING
+# =============================================================================
+
+def _pack(pieces: List[str], budget: int, separator_tokens: int) -> List[str]:
+    """Leading pieces that fit the budget (the first one is cut to fit)."""
+    packed, used = [], 0
+    for piece in pieces:
+        cost = estimate_tokens(piece) + (separator_tokens if packed else 0)
+        if used + cost > budget:
+            if not packed and budget > 0:
+                packed.append(piece[:budget * CHARS_PER_TOKEN])
+            break
+        packed.append(piece)
+        used += cost
+    return packed
+
+
+def build_context(query: str, docs: Sequence = (), web_results: Sequence[dict] = (),
+                  budget: int = CONTEXT_TOKEN_BUDGET) -> PackedContext:
+    """
+    De-duplicated, trimmed vector and web context within the token budget.
+
+    With both kinds of context, web results get CONTEXT_WEB_SHARE of the
+    budget; whatever one side leaves unused goes to the other.
+    """
+    chunks = dedupe_chunks(docs)
+    web = [format_web_results([r]) for r in trim_web_results(web_results, query)]
+
+    web_budget = int(budget * CONTEXT_WEB_SHARE) if chunks and web else budget
+    vector_budget = budget - web_budget if web else budget
+    web_separator = estimate_tokens("\n\n---\n\n")
+
+    # Hand the side with the smaller need its share first, the rest to the other
+    if sum(map(estimate_tokens, web)) < web_budget:
+        packed_web = _pack(web, web_budget, web_separator)
+        used = sum(map(estimate_tokens, packed_web))
+        packed_chunks = _pack(chunks, budget - used, 1)
+    else:
+        packed_chunks = _pack(chunks, vector_budget, 1)
+        used = sum(map(estimate_tokens, packed_chunks))
+        packed_web = _pack(web, budget - used, web_separator)
+
+    vector_context = "\n\n".join(packed_chunks)
+    web_context = "\n\n---\n\n".join(packed_web)
+    return PackedContext(
+        vector_context=vector_context,
+        web_context=web_context,
+        tokens=estimate_tokens(vector_context) + estimate_tokens(web_context),
+        dropped=len(chunks) - len(packed_chunks) + len(web) - len(packed_web),
+    )
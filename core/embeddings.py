@@ -0,0 +1,189 @@
+# core/embeddings.py
+"""
+Embedding backends for ingestion and query retrieval.
+
+- LocalEmbeddings: runs a sentence-transformers model (e.g. a local copy of
+  all-mpnet-base-v2) on CPU with batched encoding, so neither ingestion nor
+  query embedding needs an HTTP call to the HuggingFace endpoint.
+- CachedEmbeddings: wraps any embedding backend with a persistent SQLite
+  cache keyed by model id + text hash, so the same text is never encoded
+  twice across re-ingestion runs, repeated queries or process restarts.
+
+sentence-transformers is an optional dependency; it is only imported when
+the local backend is actually used.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# =============================================================================
+# LOCAL CPU BACKEND
+# =============================================================================
+
+class LocalEmbeddings(Embeddings):
+    """
+    In-process sentence-transformers encoder.
+
+    The model is loaded on first use. Inputs are encoded in batches of
+    ``batch_size`` and vectors are L2-normalized, matching the output of
+    the all-mpnet-base-v2 inference endpoint.
+    """
+
+    def __init__(self, model_path: str, batch_size: int = 32, num_threads: Optional[int] = None):
+        """
+        Args:
+            model_path: Local directory (or hub id) of a sentence-transformers model
+            batch_size: Number of texts encoded per forward pass
+            num_threads: Torch intra-op thread count (None keeps the default)
+        """
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError as e:
+                        raise ImportError(
+                            "EMBEDDING_BACKEND=local requires sentence-transformers: "
+                            "pip install 'university-support-system[local-embeddings]'"
+                        ) from e
+
+                    if self.num_threads:
+                        import torch
+                        torch.set_num_threads(self.num_threads)
+
+                    self._model = SentenceTransformer(self.model_path, device="cpu")
+                    print(f"✓ Local embedding model loaded from {self.model_path}")
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        vectors = self._get_model().encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+# =============================================================================
+# PERSISTENT CACHE
+# =============================================================================
+
+class CachedEmbeddings(Embeddings):
+    """
+    Persistent embedding cache in front of another backend.
+
+    Only texts missing from the cache are sent to the underlying backend,
+    de-duplicated and in a single batched call.
+    """
+
+    def __init__(self, underlying: Embeddings, model_id: str, cache_path: str):
+        """
+        Args:
+            underlying: Backend used for cache misses
+            model_id: Identifies the model; part of every cache key
+            cache_path: SQLite file holding the cached vectors
+        """
+        self.underlying = underlying
+        self.model_id = model_id
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite caps the number of bound parameters per statement
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in items.items()],
+            )
+            self._conn.commit()
+
+    def _count(self, hits: int = 0, misses: int = 0) -> None:
+        # Lookups run on many threads; `+=` on an attribute is not atomic
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        keys = [self._key(t) for t in texts]
+        cached = self._lookup(list(set(keys)))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        self._count(hits=len(texts) - len(missing), misses=len(missing))
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        cached = self._lookup([key])
+        if key in cached:
+            self._count(hits=1)
+            return cached[key]
+
+        self._count(misses=1)
+        vector = self.underlying.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    def stats(self) -> dict:
+        """Hit/miss counters since process start."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,461 @@
+# core/facts.py
+"""
+Structured fee and eligibility facts, answered without the LLM.
+
+Questions like "MS CS tuition?" or "minimum GPA for undergrad?" are
+answered by a literal line of dataset/admissions_*.txt or
+dataset/programs_*.txt. FactIndex parses those files into a small typed
+table:
+
+- Fee: program, level (undergraduate / masters / phd), amount, period
+- Criterion: level, eligibility criterion, optional degree it is limited to
+
+and FactIndex.lookup answers a query from it with a templated answer that
+names its source files. A lookup only answers when the question is
+unambiguous: exactly one of fee/eligibility asked, at most one program,
+every matching fact agreeing, a fee for every level the program is
+offered at when no level is asked, the billing period asked for (if any)
+stated by the dataset, and no query term it does not understand ("MS CS
+late fee", "not the CS fee"). Anything else returns None and the query
+goes through the normal RAG path.
+
+Disabled with FACT_LOOKUP=false.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from core.config import (
+    FACT_CRITERIA_TERMS,
+    FACT_DEGREE_PROGRAMS,
+    FACT_ELIGIBILITY_TERMS,
+    FACT_FEE_TERMS,
+    FACT_FILLER_TERMS,
+    FACT_LEVEL_TERMS,
+    FACT_PERIOD_TERMS,
+)
+from core.lexical import tokenize
+from core.metrics import counter
+
+
+FACT_LOOKUP = os.getenv("FACT_LOOKUP", "true").lower() in ("1", "true", "yes")
+
+FACT_FILE_PREFIXES = ("admissions_", "programs_")
+ANY_PROGRAM = "*"
+
+LEVELS = ("undergraduate", "masters", "phd")
+LEVEL_LABELS = {"undergraduate": "Undergraduate", "masters": "Master's", "phd": "PhD"}
+DEGREE_LEVELS = {"bs": "undergraduate", "bba": "undergraduate", "ms": "masters", "mba": "masters", "phd": "phd"}
+
+_lookups = counter("fact_lookups_total", "Structured fact lookups, by result (hit, miss)")
+
+_MONEY = r"\$\d{1,3}(?:,\d{3})*(?:\s*-\s*\$\d{1,3}(?:,\d{3})*)?"
+_HEADER_RE = re.compile(r"^(?!-)(?P<title>[^:]+):\s*$")
+_BULLET_RE = re.compile(r"^-\s*(?P<text>.+?)\s*$")
+_FEE_RE = re.compile(rf"^(?P<label>[^:]+):\s*(?P<amount>{_MONEY})$")
+_TUITION_RE = re.compile(r"^Tuition:\s*(?P<items>.+)$")
+_TUITION_ITEM_RE = re.compile(rf"(?P<degree>\w+):\s*(?P<amount>{_MONEY})")
+_PARENS_RE = re.compile(r"\(([^)]*)\)")
+_ACRONYM_RE = re.compile(r"^[A-Z]{2,6}$")
+
+
+@dataclass(frozen=True)
+class Fee:
+    program: str            # Program as written in the dataset
+    program_key: str        # Canonical program (aliases resolved), or ANY_PROGRAM
+    level: str
+    amount: str
+    period: Optional[str]   # "per semester" when the dataset says so
+    source: str
+
+
+@dataclass(frozen=True)
+class Criterion:
+    level: str
+    text: str
+    degree: Optional[str]   # Degree code the criterion is limited to ("mba"), if any
+    source: str
+
+
+@dataclass
+class FactAnswer:
+    answer: str
+    sources: List[str]
+
+
+def _phrase(text: str) -> Tuple[str, ...]:
+    return tuple(tokenize(text))
+
+
+# =============================================================================
+# PARSING
+# =============================================================================
+
+def _amount(text: str) -> str:
+    low, _, high = (part.strip() for part in text.partition("-"))
+    return low if not high or high == low else f"{low}-{high}"
+
+
+def _split_name(text: str) -> Tuple[str, List[str], List[str]]:
+    """
+    "Electrical Engineering or(EE) (BS/MS/PhD)" →
+    ("Electrical Engineering", ["EE"], ["bs", "ms", "phd"])
+    """
+    acronyms, degrees = [], []
+    for group in _PARENS_RE.findall(text):
+        parts = [p for p in re.split(r"[\s,/]+", group.strip()) if p]
+        if parts and all(p.lower() in DEGREE_LEVELS for p in parts):
+            degrees.extend(p.lower() for p in parts)
+        elif _ACRONYM_RE.match(group.strip()):
+            acronyms.append(group.strip())
+    name = _PARENS_RE.sub(" ", text)
+    name = re.sub(r"\s+or\s*$", "", " ".join(name.split()))
+    return name.strip(), acronyms, degrees
+
+
+class FactIndex:
+    """Fees and eligibility criteria parsed from the dataset files."""
+
+    def __init__(self, folder: str):
+        """
+        Args:
+            folder: Dataset directory; only admissions_* and programs_* files are read
+        """
+        self.fees: List[Fee] = []
+        self.criteria: List[Criterion] = []
+        self._aliases: Dict[Tuple[str, ...], str] = {}   # Phrase → canonical program
+        self._names: Dict[str, str] = {}                  # Canonical program → display name
+        self._levels: Dict[str, Set[str]] = {}            # Canonical program → levels it is offered at
+
+        names = sorted(n for n in os.listdir(folder) if n.startswith(FACT_FILE_PREFIXES))
+        # Program files first: they define the program names and acronyms
+        for name in sorted(names, key=lambda n: not n.startswith("programs_")):
+            with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+            if name.startswith("programs_"):
+                self._parse_programs(name, lines)
+            else:
+                self._parse_admissions(name, lines)
+        self._vocabulary = self._build_vocabulary()
+
+    def __len__(self) -> int:
+        return len(self.fees) + len(self.criteria)
+
+    # -------------------------------------------------------------------------
+    # Programs
+    # -------------------------------------------------------------------------
+
+    def _program(self, name: str, acronyms: Iterable[str] = ()) -> str:
+        """Canonical key of a program, registering its name and acronyms as aliases."""
+        phrases = [_phrase(name)] + [_phrase(a) for a in acronyms]
+        # "Social Sciences & Humanities" is found under either part
+        parts = [p for p in name.split("&") if p.strip()]
+        if len(parts) > 1:
+            phrases += [_phrase(p) for p in parts]
+        phrases = [p for p in phrases if p]
+        if not phrases:
+            return ANY_PROGRAM
+
+        key = next((self._aliases[p] for p in phrases if p in self._aliases), " ".join(phrases[0]))
+        for phrase in phrases:
+            self._aliases.setdefault(phrase, key)
+        self._names.setdefault(key, name.strip())
+        return key
+
+    def _parse_programs(self, source: str, lines: List[str]) -> None:
+        faculty: List[Tuple[str, str]] = []                # (name, key)
+        programs: List[Tuple[str, str, List[str]]] = []   # (name, key, degrees)
+
+        for line in lines:
+            header = _HEADER_RE.match(line)
+            if header:
+                title = header.group("title")
+                faculty, programs = [], []
+                if title.startswith("Faculty of "):
+                    for part in title[len("Faculty of "):].split("&"):
+                        name, acronyms, _ = _split_name(part)
+                        faculty.append((name, self._program(name, acronyms)))
+                continue
+
+            bullet = _BULLET_RE.match(line)
+            if bullet and faculty:
+                name, acronyms, degrees = _split_name(bullet.group("text"))
+                key = self._program(name, acronyms)
+                programs.append((name, key, degrees))
+                self._levels.setdefault(key, set()).update(DEGREE_LEVELS[d] for d in degrees)
+                continue
+
+            tuition = _TUITION_RE.match(line)
+            if tuition and faculty:
+                for item in _TUITION_ITEM_RE.finditer(tuition.group("items")):
+                    degree = item.group("degree").lower()
+                    level = DEGREE_LEVELS.get(degree)
+                    if level is None:
+                        continue
+                    amount = _amount(item.group("amount"))
+                    # The faculty pays every listed rate; a program only the rates of its own degrees
+                    targets = faculty + [(n, k) for n, k, degrees in programs if degree in degrees]
+                    for name, key in targets:
+                        self.fees.append(Fee(name, key, level, amount, None, source))
+
+    # -------------------------------------------------------------------------
+    # Admissions
+    # -------------------------------------------------------------------------
+
+    def _parse_admissions(self, source: str, lines: List[str]) -> None:
+        file_level = "undergraduate" if "undergraduate" in source else None
+        section, level, period = None, file_level, None
+
+        for line in lines:
+            header = _HEADER_RE.match(line)
+            if header:
+                title = header.group("title")
+                sublevel = self._level_of(title)
+                if section == "eligibility" and sublevel:
+                    level = sublevel
+                    continue
+                section, level = title.split("(")[0].strip().lower(), file_level
+                periods = _PARENS_RE.findall(title)
+                period = periods[0].strip() if periods else None
+                continue
+
+            bullet = _BULLET_RE.match(line)
+            if not bullet:
+                continue
+            text = bullet.group("text")
+
+            if section == "eligibility" and level:
+                label = text.split(":")[0].strip().lower()
+                degree = label if ":" in text and label in DEGREE_LEVELS else None
+                self.criteria.append(Criterion(level, text, degree, source))
+            elif section == "tuition fees":
+                fee = _FEE_RE.match(text)
+                if fee:
+                    self._add_fee(fee.group("label"), _amount(fee.group("amount")), period, file_level, source)
+
+    def _add_fee(self, label: str, amount: str, period: Optional[str], level: Optional[str], source: str) -> None:
+        # "MS Engineering", "MBA", "PhD all departments", "Medicine (MBBS)"
+        first, _, rest = label.partition(" ")
+        degree = first.lower()
+        if degree in DEGREE_LEVELS:
+            level = DEGREE_LEVELS[degree]
+            label = rest.strip() or FACT_DEGREE_PROGRAMS.get(degree, "")
+        if level is None or not label:
+            return
+        if label.lower().startswith("all "):
+            self.fees.append(Fee(label, ANY_PROGRAM, level, amount, period, source))
+            return
+        name, acronyms, _ = _split_name(label)
+        self.fees.append(Fee(name, self._program(name, acronyms), level, amount, period, source))
+
+    @staticmethod
+    def _level_of(title: str) -> Optional[str]:
+        """Level a header such as "Master's" or "PhD" stands for, if exactly one."""
+        first = _phrase(title)[:1]
+        levels = {level for level, words in FACT_LEVEL_TERMS.items() if any(_phrase(w) == first for w in words)}
+        return levels.pop() if len(levels) == 1 else None
+
+    # -------------------------------------------------------------------------
+    # Query matching
+    # -------------------------------------------------------------------------
+
+    def _build_vocabulary(self) -> Dict[Tuple[str, ...], List[Tuple[str, str]]]:
+        """Phrase → [(role, value)] for every phrase a fact query may contain."""
+        vocabulary: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+
+        def add(phrase: Tuple[str, ...], role: str, value: str) -> None:
+            if phrase:
+                vocabulary.setdefault(phrase, []).append((role, value))
+
+        for word in FACT_FEE_TERMS:
+            add(_phrase(word), "kind", "fee")
+        for word in FACT_ELIGIBILITY_TERMS:
+            add(_phrase(word), "kind", "eligibility")
+        for criterion, words in FACT_CRITERIA_TERMS.items():
+            for word in words:
+                add(_phrase(word), "criterion", criterion)
+        for level, words in FACT_LEVEL_TERMS.items():
+            for word in words:
+                add(_phrase(word), "level", level)
+        for period, words in FACT_PERIOD_TERMS.items():
+            for word in words:
+                add(_phrase(word), "period", period)
+        for degree, program in FACT_DEGREE_PROGRAMS.items():
+            add(_phrase(degree), "degree", degree)
+            if _phrase(program) in self._aliases:
+                add(_phrase(degree), "program", self._aliases[_phrase(program)])
+        for phrase, key in self._aliases.items():
+            add(phrase, "program", key)
+        for word in FACT_FILLER_TERMS:
+            add(_phrase(word), "filler", "")
+        return vocabulary
+
+    def _parse_query(self, query: str) -> Optional[Dict[str, Set[str]]]:
+        """Role → values found in the query, or None if any of it is not understood."""
+        terms = tokenize(query)
+        longest = max(map(len, self._vocabulary), default=1)
+        found: Dict[str, Set[str]] = {}
+
+        i = 0
+        while i < len(terms):
+            for size in range(min(longest, len(terms) - i), 0, -1):
+                meanings = self._vocabulary.get(tuple(terms[i:i + size]))
+                if meanings:
+                    for role, value in meanings:
+                        found.setdefault(role, set()).add(value)
+                    i += size
+                    break
+            else:
+                # An unknown qualifier ("late", "hostel", "refund", "not") may change the question
+                return None
+        return found
+
+    def programs(self, text: str) -> Set[str]:
+        """Canonical programs the text names ("EE" and "Electrical Engineering" are one)."""
+        terms = tokenize(text)
+        longest = max(map(len, self._vocabulary), default=1)
+        found: Set[str] = set()
+
+        i = 0
+        while i < len(terms):
+            for size in range(min(longest, len(terms) - i), 0, -1):
+                meanings = self._vocabulary.get(tuple(terms[i:i + size]))
+                if meanings:
+                    found.update(value for role, value in meanings if role == "program")
+                    i += size
+                    break
+            else:
+                i += 1
+        return found
+
+    def lookup(self, query: str) -> Optional[FactAnswer]:
+        """A templated answer for an unambiguous fee or eligibility question, else None."""
+        found = self._parse_query(query)
+        kinds = (found or {}).get("kind", set()) | ({"eligibility"} if (found or {}).get("criterion") else set())
+        if found is None or len(kinds) != 1:
+            return None
+        programs = found.get("program", set())
+        if len(programs) > 1:
+            return None
+        # "graduate" means both master's and PhD; no level means every level
+        levels = [level for level in LEVELS if level in found.get("level", LEVELS)]
+        program = next(iter(programs), None)
+
+        if kinds == {"fee"}:
+            if not program:
+                return None
+            return self._fee_answer(program, levels, "level" in found, found.get("period", set()))
+        if "level" not in found:
+            return None
+        return self._eligibility_answer(levels, found.get("degree", set()), found.get("criterion", set()))
+
+    # -------------------------------------------------------------------------
+    # Answers
+    # -------------------------------------------------------------------------
+
+    def _fee_answer(self, program: str, levels: Sequence[str], level_asked: bool,
+                    periods: Set[str]) -> Optional[FactAnswer]:
+        lines, sources = [], set()
+        for level in levels:
+            fees = [f for f in self.fees if f.level == level and f.program_key == program]
+            # "PhD all departments" only counts when nothing names the program, that level
+            # was asked for, and the program list says the program is offered at it
+            if not fees and level_asked and level in self._levels.get(program, ()):
+                fees = [f for f in self.fees if f.level == level and f.program_key == ANY_PROGRAM]
+            if not fees:
+                # Every level was asked for; listing only some would read as complete
+                if not level_asked and level in self._levels.get(program, ()):
+                    return None
+                continue
+            if len({f.amount for f in fees}) > 1:
+                return None
+            period = next((f.period for f in fees if f.period), None)
+            # "per year" is not answered with a per-semester (or unstated) amount
+            if periods and period not in periods:
+                return None
+            lines.append((level, fees[0].amount + (f" {period}" if period else "")))
+            sources.update(f.source for f in fees)
+        if not lines:
+            return None
+
+        name = self._names.get(program, program)
+        if len(lines) == 1:
+            level, amount = lines[0]
+            answer = f"Tuition for {name} ({LEVEL_LABELS[level]}) is {amount}."
+        else:
+            answer = f"Tuition for {name}:\n" + "\n".join(f"- {LEVEL_LABELS[l]}: {a}" for l, a in lines)
+        return self._with_sources(answer, sources)
+
+    def _eligibility_answer(self, levels: Sequence[str], degrees: Set[str], criteria: Set[str]) -> Optional[FactAnswer]:
+        sections, sources = [], set()
+        for level in levels:
+            rows = [c for c in self.criteria if c.level == level and (c.degree is None or not degrees or c.degree in degrees)]
+            if criteria:
+                words = {w.lower() for name in criteria for w in FACT_CRITERIA_TERMS[name]}
+                matching = [c for c in rows if words & set(re.findall(r"[a-z]+", c.text.lower()))]
+                rows = matching or rows
+            if not rows:
+                continue
+            sections.append(f"{LEVEL_LABELS[level]} eligibility:\n" + "\n".join(f"- {c.text}" for c in rows))
+            sources.update(c.source for c in rows)
+        if not sections:
+            return None
+        return self._with_sources("\n\n".join(sections), sources)
+
+    @staticmethod
+    def _with_sources(answer: str, sources: Iterable[str]) -> FactAnswer:
+        sources = sorted(sources)
+        return FactAnswer(answer=f"{answer}\n\nSource: {', '.join(sources)}", sources=sources)
+
+
+# =============================================================================
+# SHARED INDEX
+# =============================================================================
+
+_index: Optional[FactIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_fact_index() -> FactIndex:
+    """Get or build the fact index over the dataset folder."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from ingest import DATASET_DIR
+
+                _index = FactIndex(DATASET_DIR)
+                print(f"✓ Fact index built ({len(_index.fees)} fees, {len(_index.criteria)} criteria)")
+    return _index
+
+
+def reset_fact_index() -> None:
+    """Drop the fact index so the next lookup re-parses the dataset."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def query_programs(query: str) -> Set[str]:
+    """Canonical programs the query names, or none if the dataset cannot be read."""
+    try:
+        return get_fact_index().programs(query)
+    except OSError as e:
+        print(f"⚠ Fact index unavailable: {e}")
+        return set()
+
+
+def lookup_fact(query: str) -> Optional[FactAnswer]:
+    """Answer the query from the fact index, or None to use RAG."""
+    if not FACT_LOOKUP:
+        return None
+    try:
+        answer = get_fact_index().lookup(query)
+    except OSError as e:
+        print(f"⚠ Fact index unavailable: {e}")
+        answer = None
+    _lookups.inc(result="hit" if answer else "miss")
+    return answer
@@ -0,0 +1,269 @@
+# core/intent_model.py
+"""
+In-process intent model trained from logged remote classifications.
+
+A multinomial logistic regression over hashed features (words, word
+bigrams and character trigrams), trained with NumPy and saved as a
+small .npz file that loads in a few milliseconds. Predicting one query
+takes about 0.1 ms and needs no network, so it can serve as the
+cascade's local stage or as the offline classifier when the HF API is
+not configured.
+
+Training data is the JSONL log written by IntentClassifier when
+CLASSIFIER_LOG_PATH is set: one {"query", "label", "score"} per line.
+
+Usage:
+    python -m core.intent_model train --log ./.cache/classifications.jsonl
+    python -m core.intent_model predict "when is the fall deadline?"
+"""
+
+import argparse
+import json
+import os
+import re
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH") or "./.cache/intent_model.npz"
+
+N_FEATURES = 2 ** 16       # Hashed feature space
+MODEL_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\w+")
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'"})
+
+
+# =============================================================================
+# FEATURES
+# =============================================================================
+
+def _features(text: str) -> List[str]:
+    tokens = _TOKEN_RE.findall(text.translate(_APOSTROPHES).lower())
+    features = [f"w:{t}" for t in tokens]
+    features += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for token in tokens:
+        padded = f" {token} "
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return features
+
+
+def hash_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashed feature indices and L2-normalized counts for one text."""
+    features = _features(text)
+    if not features:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashed = np.fromiter(
+        (zlib.crc32(f.encode("utf-8")) % n_features for f in features),
+        dtype=np.int64, count=len(features),
+    )
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = counts.astype(np.float32)
+    return indices, values / np.linalg.norm(values)
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+
+class IntentModel:
+    """Hashed n-gram logistic regression over a fixed label set."""
+
+    def __init__(self, labels: Sequence[str], n_features: int = N_FEATURES,
+                 weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.weights = weights if weights is not None else np.zeros((n_features, len(self.labels)), np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(self.labels), np.float32)
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        indices, values = hash_features(text, self.n_features)
+        logits = values @ self.weights[indices] + self.bias
+        logits = np.exp(logits - logits.max())
+        return logits / logits.sum()
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its probability."""
+        proba = self.predict_proba(text)
+        best = int(np.argmax(proba))
+        return self.labels[best], float(proba[best])
+
+    # -------------------------------------------------------------------------
+    # Training
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], label_set: Sequence[str],
+              n_features: int = N_FEATURES, epochs: int = 300, learning_rate: float = 5.0,
+              l2: float = 1e-4) -> "IntentModel":
+        """
+        Full-batch gradient descent on the softmax cross-entropy.
+
+        Args:
+            texts: Training queries
+            labels: Label of each query (must be in label_set)
+            label_set: All labels, in output order
+        """
+        model = cls(label_set, n_features)
+        label_index = {label: i for i, label in enumerate(model.labels)}
+        n, k = len(texts), len(model.labels)
+
+        rows, cols, vals = [], [], []
+        for i, text in enumerate(texts):
+            indices, values = hash_features(text, n_features)
+            rows.append(np.full(len(indices), i, dtype=np.int64))
+            cols.append(indices)
+            vals.append(values)
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+        targets = np.zeros((n, k), np.float32)
+        targets[np.arange(n), [label_index[l] for l in labels]] = 1.0
+
+        weights, bias = model.weights, model.bias
+        for _ in range(epochs):
+            contrib = weights[cols] * vals[:, None]
+            logits = np.zeros((n, k), np.float32)
+            np.add.at(logits, rows, contrib)
+            logits += bias
+            logits -= logits.max(axis=1, keepdims=True)
+            proba = np.exp(logits)
+            proba /= proba.sum(axis=1, keepdims=True)
+
+            error = (proba - targets) / n
+            grad = np.stack(
+                [np.bincount(cols, weights=vals * error[rows, j], minlength=n_features) for j in range(k)],
+                axis=1,
+            ).astype(np.float32)
+            weights -= learning_rate * (grad + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return model
+
+    def accuracy(self, texts: Sequence[str], labels: Sequence[str]) -> float:
+        if not texts:
+            return 0.0
+        return sum(self.predict(t)[0] == l for t, l in zip(texts, labels)) / len(texts)
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            version=MODEL_VERSION,
+            labels=np.array(self.labels),
+            n_features=self.n_features,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        with np.load(path) as data:
+            if int(data["version"]) != MODEL_VERSION:
+                raise ValueError(f"unsupported intent model version {int(data['version'])}")
+            return cls(
+                labels=[str(l) for l in data["labels"]],
+                n_features=int(data["n_features"]),
+                weights=data["weights"].astype(np.float32),
+                bias=data["bias"].astype(np.float32),
+            )
+
+
+def load_intent_model(path: str = INTENT_MODEL_PATH) -> Optional[IntentModel]:
+    """Load the trained model, or None if there is none (or it is unreadable)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        model = IntentModel.load(path)
+    except Exception as e:
+        print(f"⚠ Could not load intent model from {path}: {e}")
+        return None
+    print(f"✓ Loaded intent model from {path}")
+    return model
+
+
+# =============================================================================
+# TRAINING LOG
+# =============================================================================
+
+def read_log(path: str, min_score: float = 0.0) -> Tuple[List[str], List[str]]:
+    """Queries and labels from a classification log, last label per query wins."""
+    latest = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("score", 1.0) >= min_score:
+                latest[record["query"].strip()] = record["label"]
+    return list(latest), list(latest.values())
+
+
+def _split(texts: List[str], labels: List[str], holdout: float, seed: int = 0):
+    order = np.random.default_rng(seed).permutation(len(texts))
+    n_test = int(len(texts) * holdout)
+    test, train = order[:n_test], order[n_test:]
+    pick = lambda idx, items: [items[i] for i in idx]
+    return pick(train, texts), pick(train, labels), pick(test, texts), pick(test, labels)
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Train or query the offline intent model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train = sub.add_parser("train", help="train from a classification log")
+    train.add_argument("--log", default=None, help="JSONL log of remote classifications "
+                       "(default: CLASSIFIER_LOG_PATH or ./.cache/classifications.jsonl)")
+    train.add_argument("--out", default=INTENT_MODEL_PATH, help="where to write the model")
+    train.add_argument("--min-score", type=float, default=0.5, help="skip low-confidence labels")
+    train.add_argument("--holdout", type=float, default=0.2, help="fraction held out for evaluation")
+    train.add_argument("--epochs", type=int, default=300)
+    train.add_argument("--features", type=int, default=N_FEATURES, help="hashed feature space size")
+
+    predict = sub.add_parser("predict", help="classify queries with a trained model")
+    predict.add_argument("queries", nargs="+")
+    predict.add_argument("--model", default=INTENT_MODEL_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "predict":
+        model = IntentModel.load(args.model)
+        for query in args.queries:
+            label, proba = model.predict(query)
+            print(f"{proba:.2f}  {label}  ← {query}")
+        return
+
+    from core.classifier import CLASSIFIER_LOG_PATH, INTENT_LABELS
+
+    args.log = args.log or CLASSIFIER_LOG_PATH or "./.cache/classifications.jsonl"
+    texts, labels = read_log(args.log, args.min_score)
+    unknown = set(labels) - set(INTENT_LABELS)
+    if unknown:
+        raise SystemExit(f"Unknown labels in {args.log}: {sorted(unknown)}")
+    if not texts:
+        raise SystemExit(f"No usable records in {args.log}")
+
+    train_x, train_y, test_x, test_y = _split(texts, labels, args.holdout)
+    model = IntentModel.train(train_x, train_y, INTENT_LABELS, args.features, epochs=args.epochs)
+    if test_x:
+        print(f"Held-out agreement with the remote classifier: {model.accuracy(test_x, test_y):.1%} "
+              f"({len(test_x)} queries)")
+
+    # Final model sees every example
+    model = IntentModel.train(texts, labels, INTENT_LABELS, args.features, epochs=args.epochs)
+    model.save(args.out)
+    print(f"✓ Trained on {len(texts)} queries, saved to {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
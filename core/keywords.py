@@ -0,0 +1,235 @@
+# core/keywords.py
+"""
+Precompiled multi-pattern keyword matching.
+
+All keyword lists from core/config.py are compiled at import into a
+single regex shaped like a trie (shared prefixes are matched once), so
+one scan of the text reports every category that matched. Matching is
+on whole words ("hi" does not match "things", "now" does not match
+"know"), single keywords of four or more letters also match common
+inflections ("deadline" → "deadlines", "enroll" → "enrollment"), and
+all-uppercase acronyms such as "IT" or "CS" only match in uppercase.
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from core.config import (
+    CASUAL_KEYWORDS,
+    TIME_SENSITIVE_KEYWORDS,
+    INTENT_KEYWORDS,
+    UNCERTAINTY_PHRASES,
+)
+
+
+# Endings accepted after single keywords of MIN_STEM_LENGTH+ letters
+INFLECTION_SUFFIXES = ("ments", "ment", "ing", "es", "ed", "s", "d")
+MIN_STEM_LENGTH = 4
+
+# Typographic apostrophes are treated like "'" so "don’t" matches "don't"
+_APOSTROPHES = "'’‘ʼ"
+_APOSTROPHE_MAP = str.maketrans({ch: "'" for ch in _APOSTROPHES})
+
+
+def _is_acronym(keyword: str) -> bool:
+    return len(keyword) > 1 and keyword.isalpha() and keyword.isupper()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.translate(_APOSTROPHE_MAP).lower().split())
+
+
+class KeywordHit(NamedTuple):
+    keyword: str          # Keyword as configured
+    categories: tuple     # Every category the keyword belongs to
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """Matches many keyword lists against a text in a single regex pass."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Args:
+            categories: Category name → keywords/phrases
+        """
+        owners: Dict[str, List[str]] = defaultdict(list)
+        canonical: Dict[str, str] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                key = keyword if _is_acronym(keyword) else _normalize(keyword)
+                canonical.setdefault(key, keyword)
+                if category not in owners[key]:
+                    owners[key].append(category)
+
+        self._owners = {key: tuple(cats) for key, cats in owners.items()}
+        self._canonical = canonical
+        self._stems = {
+            key for key in owners
+            if " " not in key and len(key) >= MIN_STEM_LENGTH and not _is_acronym(key)
+        }
+
+        self._acronyms = {key.lower() for key in owners if _is_acronym(key)}
+        # Longest space/apostrophe-free piece of each keyword: a text without
+        # any of them cannot match, which contains() checks with plain `in`
+        self._fragments = tuple({max(re.split(r"[\s']+", key.lower()), key=len) for key in owners})
+
+        # The trie runs on lowercased text (much faster than re.IGNORECASE);
+        # acronym case is checked against the original text when resolving
+        trie = r"\b%s\b" % self._trie_pattern(owners)
+        self._pattern = re.compile(trie)
+        # For the rare text whose lowercase form changes length (and offsets)
+        self._pattern_ci = re.compile(trie, re.IGNORECASE)
+        self._resolve = lru_cache(maxsize=4096)(self._resolve_uncached)
+
+    # -------------------------------------------------------------------------
+    # Compilation
+    # -------------------------------------------------------------------------
+
+    def _trie_pattern(self, keys: Iterable[str]) -> str:
+        root: dict = {}
+        for key in keys:
+            node = root
+            for ch in key.lower():
+                node = node.setdefault(ch, {})
+            node[""] = key
+        return self._emit(root)
+
+    def _emit(self, node: dict) -> str:
+        branches = []
+        for ch in sorted(k for k in node if k):
+            if ch == " ":
+                piece = r"\s+"
+            elif ch == "'":
+                piece = "[%s]" % _APOSTROPHES
+            else:
+                piece = re.escape(ch)
+            branches.append(piece + self._emit(node[ch]))
+
+        key = node.get("")
+        ending = ""
+        if key is not None and key in self._stems:
+            ending = "(?:%s)" % "|".join(INFLECTION_SUFFIXES)
+
+        if not branches:
+            return ending + "?" if ending else ""
+        body = branches[0] if len(branches) == 1 else "(?:%s)" % "|".join(branches)
+        if key is None:
+            return body
+        # Longer keywords are tried first, then this one (with its inflections)
+        return "(?:%s|%s)?" % (body, ending) if ending else "(?:%s)?" % body
+
+    # -------------------------------------------------------------------------
+    # Matching
+    # -------------------------------------------------------------------------
+
+    def _resolve_uncached(self, matched: str) -> Optional[Tuple[str, tuple]]:
+        """Matched text → (keyword, categories), or None for a case mismatch."""
+        if matched in self._owners:
+            return self._canonical[matched], self._owners[matched]
+        key = _normalize(matched)
+        if key in self._owners:
+            return self._canonical[key], self._owners[key]
+        for suffix in INFLECTION_SUFFIXES:
+            stem = key[:-len(suffix)]
+            if key.endswith(suffix) and stem in self._stems:
+                return self._canonical[stem], self._owners[stem]
+        return None
+
+    def _finditer(self, text: str):
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return self._pattern_ci.finditer(text)
+        return self._pattern.finditer(lowered)
+
+    def _findall(self, text: str) -> List[str]:
+        """Matched strings, in original case for acronym candidates."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return self._pattern_ci.findall(text)
+        found = self._pattern.findall(lowered)
+        if self._acronyms.isdisjoint(found):
+            return found
+        return [
+            text[m.start():m.end()] if m.group() in self._acronyms else m.group()
+            for m in self._pattern.finditer(lowered)
+        ]
+
+    def contains(self, text: str) -> bool:
+        """True if any keyword occurs in the text; stops at the first hit."""
+        lowered = text.lower()
+        if not any(map(lowered.__contains__, self._fragments)):
+            return False
+        pattern, subject = (self._pattern, lowered) if len(lowered) == len(text) else (self._pattern_ci, text)
+        match = pattern.search(subject)
+        if not self._acronyms:
+            # Only acronym hits can still be rejected (by case) when resolved
+            return match is not None
+        while match is not None:
+            if self._resolve(text[match.start():match.end()]) is not None:
+                return True
+            match = pattern.search(subject, match.end())
+        return False
+
+    def find(self, text: str) -> List[KeywordHit]:
+        """Every keyword occurrence in the text, left to right."""
+        hits = []
+        for match in self._finditer(text):
+            resolved = self._resolve(text[match.start():match.end()])
+            if resolved is not None:
+                hits.append(KeywordHit(resolved[0], resolved[1], match.start(), match.end()))
+        return hits
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Category → matched keywords, for every category with a hit."""
+        result: Dict[str, List[str]] = defaultdict(list)
+        for matched in self._findall(text):
+            resolved = self._resolve(matched)
+            if resolved is not None:
+                for category in resolved[1]:
+                    result[category].append(resolved[0])
+        return dict(result)
+
+    def categories(self, text: str) -> Set[str]:
+        """Names of the categories with at least one hit."""
+        found: Set[str] = set()
+        for matched in self._findall(text):
+            resolved = self._resolve(matched)
+            if resolved is not None:
+                found.update(resolved[1])
+        return found
+
+
+# =============================================================================
+# SHARED MATCHER
+# =============================================================================
+
+CASUAL = "casual"
+TIME_SENSITIVE = "time_sensitive"
+UNCERTAINTY = "uncertainty"
+
+# Intent categories keep their INTENT_KEYWORDS names
+KEYWORD_MATCHER = KeywordMatcher({
+    CASUAL: CASUAL_KEYWORDS,
+    TIME_SENSITIVE: TIME_SENSITIVE_KEYWORDS,
+    UNCERTAINTY: UNCERTAINTY_PHRASES,
+    **INTENT_KEYWORDS,
+})
+
+
+# The answer check runs on every generated answer and only needs to know
+# whether an uncertainty phrase occurs, so it gets its own small pattern
+UNCERTAINTY_MATCHER = KeywordMatcher({UNCERTAINTY: UNCERTAINTY_PHRASES})
+
+
+def is_uncertain(answer: str) -> bool:
+    """True if the answer contains an uncertainty phrase ("I don't know", ...)."""
+    return UNCERTAINTY_MATCHER.contains(answer)
+
+
+def match_keywords(text: str) -> Dict[str, List[str]]:
+    """Category → matched keywords for the text, using KEYWORD_MATCHER."""
+    return KEYWORD_MATCHER.match(text)
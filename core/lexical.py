@@ -0,0 +1,207 @@
+# core/lexical.py
+"""
+In-memory BM25 index and hybrid (lexical + vector) retrieval.
+
+Embedding similarity is weak on short codes and exact terms ("EE",
+"GAT Subject", "CGPA"), and the vector retriever's score threshold often
+returns nothing for them. BM25Index scores the same dataset chunks by
+exact term overlap, and HybridRetriever fuses both rankings with
+reciprocal-rank fusion (RRF), so a query that either side understands
+still gets context.
+
+Postings are stored CSR-style in three flat NumPy arrays (per-term
+offsets, document ids, term frequencies) rather than per-term Python
+lists, so the whole index is a few small contiguous buffers and a query
+touches only the postings of its own terms.
+
+Both retrievers take the same metadata ``filter`` (core/scope.py), so a
+scoped search narrows the lexical and the vector side alike.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from core.config import BM25_B, BM25_K1, HYBRID_CANDIDATES, RETRIEVER_K, RRF_K
+from core.vector_store import filter_key, filter_mask
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Dropped unless written in capitals ("IT" the department is kept, "it" is not)
+_STOPWORDS = frozenset(
+    "a about an and are as at be by can could do does for from has have how i if in is it "
+    "me my of on or our so tell than that the their there these this to was we what when "
+    "where which who why will with would you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms of a text, without stopwords, plural -s folded."""
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        term = token.lower()
+        if term in _STOPWORDS and not (len(token) > 1 and token.isupper()):
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+# =============================================================================
+# BM25 INDEX
+# =============================================================================
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, docs: Sequence[Document], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Args:
+            docs: Documents to index (kept by reference and returned by search)
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.docs = list(docs)
+        self.k1 = k1
+        self.b = b
+
+        counts = [Counter(tokenize(d.page_content)) for d in self.docs]
+        vocab: Dict[str, int] = {}
+        for c in counts:
+            for term in c:
+                vocab.setdefault(term, len(vocab))
+        self.vocab = vocab
+
+        # (term id, doc id, tf) triples sorted by term → CSR postings
+        term_ids, doc_ids, tfs = [], [], []
+        for doc_id, c in enumerate(counts):
+            for term, tf in c.items():
+                term_ids.append(vocab[term])
+                doc_ids.append(doc_id)
+                tfs.append(min(tf, 65535))
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self._tfs = np.asarray(tfs, dtype=np.uint16)[order]
+        self._offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(term_ids, minlength=len(vocab)))),
+        ).astype(np.int64)
+
+        n = len(self.docs)
+        df = np.diff(self._offsets).astype(np.float32)
+        self._idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._doc_len = np.asarray([sum(c.values()) for c in counts], dtype=np.float32)
+        avg = float(self._doc_len.mean()) if n else 0.0
+        # Per-document part of the BM25 denominator, computed once
+        self._norm = (k1 * (1 - b + b * self._doc_len / avg)).astype(np.float32) if avg else self._doc_len
+        self._masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the postings and per-document arrays."""
+        return sum(a.nbytes for a in (self._doc_ids, self._tfs, self._offsets, self._idf, self._doc_len, self._norm))
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query."""
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for term in set(tokenize(query)):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            start, end = self._offsets[t], self._offsets[t + 1]
+            docs = self._doc_ids[start:end]
+            tf = self._tfs[start:end].astype(np.float32)
+            scores[docs] += self._idf[t] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        return scores
+
+    def _filter_mask(self, filter: dict) -> np.ndarray:
+        key = filter_key(filter)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = filter_mask([d.metadata for d in self.docs], filter)
+        return mask
+
+    def search(self, query: str, k: int, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        """Top-k documents with a positive score (among those matching ``filter``), best first."""
+        scores = self.scores(query)
+        if filter:
+            scores[~self._filter_mask(filter)] = 0
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self.docs[i], float(scores[i])) for i in hits]
+
+
+# =============================================================================
+# HYBRID RETRIEVAL
+# =============================================================================
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], k: int = RRF_K) -> List[Tuple[Document, float]]:
+    """
+    Fuse ranked lists by summing 1 / (k + rank) per document.
+
+    Documents are matched by content, so the same chunk found by both
+    retrievers counts once (the first list's copy is kept).
+    """
+    fused: Dict[str, List] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            entry = fused.setdefault(doc.page_content, [doc, 0.0])
+            entry[1] += 1.0 / (k + rank)
+    return sorted(((doc, score) for doc, score in fused.values()), key=lambda x: -x[1])
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Vector retriever plus BM25, fused with reciprocal-rank fusion.
+
+    Vector hits keep their relevance score in ``metadata["score"]``;
+    every returned document also carries ``metadata["rrf_score"]`` and,
+    when BM25 found it, ``metadata["lexical_score"]``.
+    """
+
+    vector_retriever: BaseRetriever
+    lexical: Optional[BM25Index] = None
+    k: int = RETRIEVER_K
+    candidates: int = HYBRID_CANDIDATES
+    rrf_k: int = RRF_K
+
+    def _lexical_hits(self, query: str, filter: Optional[dict] = None) -> List[Document]:
+        index = self.lexical
+        if index is None:
+            return []
+        hits = []
+        for doc, score in index.search(query, self.candidates, filter):
+            doc = doc.model_copy(update={"metadata": {**doc.metadata, "lexical_score": round(score, 4)}})
+            hits.append(doc)
+        return hits
+
+    def _fuse(self, vector_docs: List[Document], lexical_docs: List[Document]) -> List[Document]:
+        fused = reciprocal_rank_fusion([vector_docs, lexical_docs], self.rrf_k)
+        lexical_scores = {d.page_content: d.metadata["lexical_score"] for d in lexical_docs}
+        docs = []
+        for doc, score in fused[:self.k]:
+            doc.metadata["rrf_score"] = round(score, 6)
+            if doc.page_content in lexical_scores:
+                doc.metadata["lexical_score"] = lexical_scores[doc.page_content]
+            docs.append(doc)
+        return docs
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        vector_docs = self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self._fuse(vector_docs, self._lexical_hits(query, kwargs.get("filter")))
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        vector_docs = await self.vector_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self._fuse(vector_docs, self._lexical_hits(query, kwargs.get("filter")))
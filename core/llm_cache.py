@@ -0,0 +1,142 @@
+# core/llm_cache.py
+"""
+Persistent exact-match cache of LLM responses.
+
+The chat model runs at temperature 0 and the prompts are built
+deterministically from the retrieved context, so the same model,
+parameters and message list always give the same answer. This cache
+plugs into LangChain's ``BaseCache`` interface (``ChatGroq(cache=...)``),
+so every ``invoke``/``ainvoke`` of the model checks it first, including
+streamed calls from the graph.
+
+Entries live in SQLite keyed by a hash of the serialized messages and
+the model configuration (LangChain's ``llm_string``). The table is
+bounded: once it grows past ``max_entries``, the least recently used
+entries are evicted.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from core.metrics import counter
+from core.tracing import record_cache_hit
+
+
+class SQLiteLLMCache(BaseCache):
+    """Size-bounded SQLite cache of chat model generations."""
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        """
+        Args:
+            path: SQLite file holding the cached generations
+            max_entries: Entries kept before least recently used ones are evicted
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lookups = counter("llm_cache_lookups_total", "LLM response cache lookups, by result")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses "
+            "(key TEXT PRIMARY KEY, generations TEXT NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_used_at ON llm_responses (used_at)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generations FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE llm_responses SET used_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+
+        if row is None:
+            self._count(hit=False)
+            self._lookups.inc(result="miss")
+            return None
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")   # loads() is marked beta
+                generations = loads(row[0], allowed_objects="core")
+        except Exception as e:
+            # Written by an incompatible LangChain version: treat as a miss
+            print(f"⚠ Unreadable LLM cache entry, ignoring it: {e}")
+            self._count(hit=False)
+            self._lookups.inc(result="miss")
+            return None
+        self._count(hit=True)
+        self._lookups.inc(result="hit")
+        record_cache_hit("llm")
+        return generations
+
+    def _count(self, hit: bool) -> None:
+        # Lookups run on many threads; `+=` on an attribute is not atomic
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        key = self._key(prompt, llm_string)
+        row = (dumps(list(return_val)), time.time(), key)
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE llm_responses SET generations = ?, used_at = ? WHERE key = ?", row
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO llm_responses (generations, used_at, key) VALUES (?, ?, ?)", row
+                )
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Evict a tenth at a time so a full cache doesn't prune on every write
+        target = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM llm_responses WHERE key IN "
+            "(SELECT key FROM llm_responses ORDER BY used_at LIMIT ?)",
+            (self._size - target,),
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            size, hits, misses = self._size, self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,203 @@
+# core/metrics.py
+"""
+In-process metrics: counters and latency histograms.
+
+Metrics are registered by name on first use and are safe to update from
+any thread. Histograms keep cumulative bucket counts plus a bounded
+window of recent observations for percentile summaries.
+render_prometheus() exports everything in the Prometheus text format.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+# Latency buckets in seconds (upper bounds)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Recent observations kept per label set for percentiles
+WINDOW_SIZE = 2048
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def items(self):
+        """(labels, value) pairs."""
+        with self._lock:
+            return [(dict(k), v) for k, v in self._values.items()]
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "total", "window")
+
+    def __init__(self, n_buckets: int):
+        self.buckets = [0] * n_buckets
+        self.count = 0
+        self.total = 0.0
+        self.window = deque(maxlen=WINDOW_SIZE)
+
+
+class Histogram:
+    """Latency/size histogram, optionally split by labels."""
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.bounds = tuple(sorted(buckets))
+        self._series: Dict[tuple, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds))
+            for i, bound in enumerate(self.bounds):
+                if value <= bound:
+                    series.buckets[i] += 1
+            series.count += 1
+            series.total += value
+            series.window.append(value)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Percentile over the recent window (None if nothing observed)."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if series is None or not series.window:
+                return None
+            values = sorted(series.window)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def summary(self, **labels) -> dict:
+        """Count, mean and p50/p95/p99 for one label set."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if series is None:
+                return {"count": 0}
+            count, total = series.count, series.total
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self.quantile(0.5, **labels),
+            "p95": self.quantile(0.95, **labels),
+            "p99": self.quantile(0.99, **labels),
+        }
+
+    def items(self):
+        """(labels, bucket counts, count, sum) per label set."""
+        with self._lock:
+            return [
+                (dict(k), list(s.buckets), s.count, s.total)
+                for k, s in self._series.items()
+            ]
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str, description: str = "") -> Counter:
+    """Get or register a counter."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Counter(name, description)
+        return _registry[name]
+
+
+def histogram(name: str, description: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Get or register a histogram."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Histogram(name, description, buckets)
+        return _registry[name]
+
+
+def all_metrics() -> Dict[str, object]:
+    """Snapshot of every registered metric by name."""
+    with _registry_lock:
+        return dict(_registry)
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+# Percentiles exported next to each histogram, from its recent window
+EXPORT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str], **extra) -> str:
+    merged = {**labels, **extra}
+    if not merged:
+        return ""
+    return "{%s}" % ",".join(f'{k}="{_escape(str(v))}"' for k, v in sorted(merged.items()))
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_prometheus() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format.
+
+    Histograms are exported as cumulative buckets plus ``_sum``/``_count``,
+    and their recent-window percentiles as a ``<name>_quantile`` gauge.
+    """
+    lines = []
+    for name, metric in sorted(all_metrics().items()):
+        if isinstance(metric, Counter):
+            lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in metric.items():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+
+        lines.append(f"# HELP {name} {metric.description}")
+        lines.append(f"# TYPE {name} histogram")
+        series = metric.items()
+        for labels, buckets, count, total in series:
+            for bound, n in zip(metric.bounds, buckets):
+                lines.append(f"{name}_bucket{_format_labels(labels, le=_format_value(bound))} {n}")
+            lines.append(f"{name}_bucket{_format_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        lines.append(f"# HELP {name}_quantile {metric.description} (recent-window percentiles)")
+        lines.append(f"# TYPE {name}_quantile gauge")
+        for labels, *_ in series:
+            for q in EXPORT_QUANTILES:
+                value = metric.quantile(q, **labels)
+                if value is not None:
+                    lines.append(f"{name}_quantile{_format_labels(labels, quantile=q)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
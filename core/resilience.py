@@ -0,0 +1,154 @@
+# core/resilience.py
+"""
+Failure handling for calls to external services.
+
+- CircuitBreaker: after ``failure_threshold`` consecutive failures the
+  breaker opens and callers skip the service for ``reset_timeout``
+  seconds; then a single probe call is let through and closes the
+  breaker again if it succeeds.
+- retry_call / aretry_call: bounded retries of transient errors with
+  exponential backoff and full jitter.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Tuple, Type
+
+from core.metrics import counter
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# HTTP statuses worth retrying (rate limiting, overload, model loading)
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open."""
+
+
+class TransientHTTPError(Exception):
+    """An HTTP response with a retryable status code."""
+
+
+def check_response(response) -> None:
+    """Raise for error statuses (works for requests and httpx responses)."""
+    if response.status_code in RETRYABLE_STATUS:
+        raise TransientHTTPError(f"HTTP {response.status_code}")
+    response.raise_for_status()
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure circuit breaker."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            name: Service name, used in metric labels and messages
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before probing again
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._transitions = counter(
+            "circuit_breaker_transitions_total", "Circuit breaker state changes"
+        )
+        self._rejected = counter(
+            "circuit_breaker_rejected_total", "Calls skipped because the breaker was open"
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            self._transitions.inc(breaker=self.name, state=state)
+            if state == OPEN:
+                print(f"⚠ {self.name} circuit open, skipping calls for {self.reset_timeout:.0f}s")
+            elif state == CLOSED:
+                print(f"✓ {self.name} circuit closed")
+
+    def allow(self) -> bool:
+        """True if a call may go through (at most one probe while half-open)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._rejected.inc(breaker=self.name)
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "rejected": int(self._rejected.value(breaker=self.name)),
+            }
+
+
+# =============================================================================
+# RETRIES
+# =============================================================================
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_call(fn: Callable, retries: int, retry_on: Tuple[Type[BaseException], ...],
+               base_delay: float = 0.1, max_delay: float = 1.0):
+    """Call fn(), retrying up to ``retries`` times on ``retry_on`` errors."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except retry_on:
+            if attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+
+
+async def aretry_call(fn: Callable, retries: int, retry_on: Tuple[Type[BaseException], ...],
+                      base_delay: float = 0.1, max_delay: float = 1.0):
+    """Async version of retry_call; fn returns an awaitable."""
+    for attempt in range(retries + 1):
+        try:
+            return await fn()
+        except retry_on:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt, base_delay, max_delay))
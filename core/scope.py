@@ -0,0 +1,118 @@
+# core/scope.py
+"""
+Intent-scoped retrieval.
+
+Ingestion tags every chunk (chunk_metadata) with:
+
+- source_file: the dataset file it came from
+- intent: "admissions", "academic" or "general", from the file name
+  (FILE_INTENTS)
+- one value per FACETS entry (degree_level, faculty): the value the file
+  name is about, or "all" when it names several or none
+
+Tags come from the file name only: chunk text mentions other faculties
+and degrees in passing ("Math, Physics" in undergraduate eligibility),
+and a wrong tag would hide the chunk from the queries it answers.
+
+At query time retrieval_filter turns the classifier's intent and the
+facet keywords in the query into a metadata filter (Pinecone syntax,
+also understood by LocalVectorStore and BM25Index). "general" and "all"
+chunks always pass, so overview text is never scoped away. When the
+scoped search finds nothing, it is repeated over the whole index.
+
+Disabled with SCOPED_RETRIEVAL=false.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+from core.config import FACETS, FILE_INTENTS, SCOPED_INTENTS
+from core.keywords import KEYWORD_MATCHER
+from core.metrics import counter
+from core.tracing import annotate
+
+
+SCOPED_RETRIEVAL = os.getenv("SCOPED_RETRIEVAL", "true").lower() in ("1", "true", "yes")
+
+GENERAL_INTENT = "general"
+ALL_VALUES = "all"
+
+_retrievals = counter("retrieval_scope_total", "Vector retrievals, by scope (scoped, fallback, global)")
+
+
+# =============================================================================
+# CHUNK TAGGING
+# =============================================================================
+
+def _single(values: Iterable[str], found) -> str:
+    """The one value that was found, or ALL_VALUES for several or none."""
+    matched = [v for v in values if v in found]
+    return matched[0] if len(matched) == 1 else ALL_VALUES
+
+
+def chunk_metadata(source_file: str) -> Dict[str, str]:
+    """Intent and facet tags for the chunks of a dataset file."""
+    stem = os.path.splitext(source_file)[0].lower()
+    intent = next(
+        (intent for prefix, intent in FILE_INTENTS.items() if stem.startswith(prefix)),
+        GENERAL_INTENT,
+    )
+    # Whole name parts only: "undergraduate" must not count as "graduate"
+    in_name = {value for values in FACETS.values() for value in values if f"_{value}_" in f"_{stem}_"}
+
+    metadata = {"source_file": source_file, "intent": intent}
+    for facet, values in FACETS.items():
+        metadata[facet] = _single(values, in_name)
+    return metadata
+
+
+# =============================================================================
+# QUERY SCOPE
+# =============================================================================
+
+def retrieval_filter(intent: Optional[str], query: str) -> Optional[dict]:
+    """Metadata filter for the query, or None to search everything."""
+    if not SCOPED_RETRIEVAL:
+        return None
+    scope = {}
+    if intent in SCOPED_INTENTS:
+        scope["intent"] = {"$in": [intent, GENERAL_INTENT]}
+    found = KEYWORD_MATCHER.categories(query)
+    for facet, values in FACETS.items():
+        value = _single(values, found)
+        if value != ALL_VALUES:
+            scope[facet] = {"$in": [value, ALL_VALUES]}
+    return scope or None
+
+
+def _record(scope: str, filter: Optional[dict]) -> None:
+    _retrievals.inc(scope=scope)
+    annotate(retrieval_scope=scope, retrieval_filter=filter)
+
+
+def retrieve(retriever, query: str, intent: Optional[str]) -> List:
+    """Scoped retrieval with a global fallback when the scope has no results."""
+    filter = retrieval_filter(intent, query)
+    if filter:
+        docs = retriever.invoke(query, filter=filter)
+        if docs:
+            _record("scoped", filter)
+            return docs
+        _record("fallback", filter)
+    else:
+        _record("global", None)
+    return retriever.invoke(query)
+
+
+async def aretrieve(retriever, query: str, intent: Optional[str]) -> List:
+    """Async version of retrieve."""
+    filter = retrieval_filter(intent, query)
+    if filter:
+        docs = await retriever.ainvoke(query, filter=filter)
+        if docs:
+            _record("scoped", filter)
+            return docs
+        _record("fallback", filter)
+    else:
+        _record("global", None)
+    return await retriever.ainvoke(query)
@@ -0,0 +1,271 @@
+# core/search_cache.py
+"""
+TTL cache with single-flight de-duplication for web search results.
+
+- Fresh entries (younger than ``ttl``) are served without a search.
+- Stale entries (up to ``stale_ttl`` past the TTL) are served at once
+  while one background search refreshes them.
+- Concurrent lookups of the same missing key share a single in-flight
+  search instead of each starting their own.
+- Entries are kept in memory (LRU) and persisted to SQLite, so they
+  survive restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.answer_cache import normalize_query
+from core.tracing import record_cache_hit
+
+
+@dataclass
+class _Entry:
+    results: List[dict]
+    fetched_at: float
+
+
+class WebSearchCache:
+    """Persistent, single-flight TTL cache of search results."""
+
+    def __init__(self, path: Optional[str], ttl: float, stale_ttl: float, max_entries: int = 1000):
+        """
+        Args:
+            path: SQLite file for persistence (None = memory only)
+            ttl: Seconds a result is served without searching again
+            stale_ttl: Further seconds a result may be served while it is refreshed
+            max_entries: In-memory LRU bound
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight = weakref.WeakKeyDictionary()   # loop → {key: asyncio.Future}
+        self._refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search-refresh")
+
+        self.hits = 0          # Served fresh from cache
+        self.stale_hits = 0    # Served stale while refreshing
+        self.misses = 0        # Searched (as leader)
+        self.coalesced = 0     # Waited on another caller's identical search
+        self.refreshes = 0     # Background revalidations
+        self.errors = 0
+
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_results "
+                "(key TEXT PRIMARY KEY, results TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM search_results WHERE fetched_at < ?", (time.time() - ttl - stale_ttl,)
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, domain: str, max_results: int, search_depth: str) -> str:
+        """Cache key: normalized query plus every parameter that changes the results."""
+        raw = json.dumps([normalize_query(query), domain, max_results, search_depth])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = _Entry(json.loads(row[0]), row[1])
+            self._remember(key, entry)
+            return entry
+
+    def _put(self, key: str, results: List[dict]) -> None:
+        entry = _Entry(list(results), time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_results (key, results, fetched_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(entry.results), entry.fetched_at),
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _classify(self, entry: Optional[_Entry]) -> str:
+        if entry is None:
+            return "miss"
+        age = time.time() - entry.fetched_at
+        if age < self.ttl:
+            return "fresh"
+        if age < self.ttl + self.stale_ttl:
+            return "stale"
+        return "miss"
+
+    # -------------------------------------------------------------------------
+    # Sync
+    # -------------------------------------------------------------------------
+
+    def fetch(self, key: str, search_fn: Callable[[], List[dict]]) -> List[dict]:
+        """
+        Cached results for the key, calling search_fn() only when needed.
+
+        Errors from search_fn propagate to the caller (and to every caller
+        waiting on the same search); they are never cached.
+        """
+        entry = self._get(key)
+        state = self._classify(entry)
+        if state == "fresh":
+            self.hits += 1
+            record_cache_hit("web_search")
+            return list(entry.results)
+        if state == "stale":
+            self.stale_hits += 1
+            record_cache_hit("web_search")
+            self._refresh(key, search_fn)
+            return list(entry.results)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.coalesced += 1
+            return list(future.result())
+
+        self.misses += 1
+        return list(self._lead(key, future, search_fn))
+
+    def _lead(self, key: str, future: Future, search_fn: Callable[[], List[dict]]) -> List[dict]:
+        try:
+            results = search_fn()
+        except BaseException as e:
+            self.errors += 1
+            future.set_exception(e)
+            raise
+        else:
+            self._put(key, results)
+            future.set_result(results)
+            return results
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, key: str, search_fn: Callable[[], List[dict]]) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+            future = self._inflight[key] = Future()
+        self.refreshes += 1
+        self._refresh_pool.submit(self._lead_quietly, key, future, search_fn)
+
+    def _lead_quietly(self, key: str, future: Future, search_fn) -> None:
+        try:
+            self._lead(key, future, search_fn)
+        except Exception as e:
+            print(f"⚠ Web search refresh failed, keeping stale result: {e}")
+
+    # -------------------------------------------------------------------------
+    # Async
+    # -------------------------------------------------------------------------
+
+    async def afetch(self, key: str, search_fn: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+        """Async version of fetch(); search_fn returns an awaitable."""
+        entry = self._get(key)
+        state = self._classify(entry)
+        if state == "fresh":
+            self.hits += 1
+            record_cache_hit("web_search")
+            return list(entry.results)
+
+        inflight = self._ainflight.setdefault(asyncio.get_running_loop(), {})
+        if state == "stale":
+            self.stale_hits += 1
+            record_cache_hit("web_search")
+            if key not in inflight:
+                self.refreshes += 1
+                task = inflight[key] = asyncio.ensure_future(self._alead(key, inflight, search_fn))
+                task.add_done_callback(self._log_refresh_error)
+            return list(entry.results)
+
+        task = inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return list(await asyncio.shield(task))
+
+        self.misses += 1
+        task = inflight[key] = asyncio.ensure_future(self._alead(key, inflight, search_fn))
+        return list(await asyncio.shield(task))
+
+    async def _alead(self, key: str, inflight: dict, search_fn) -> List[dict]:
+        try:
+            try:
+                results = await search_fn()
+            except BaseException:
+                self.errors += 1
+                raise
+            await asyncio.to_thread(self._put, key, results)
+            return results
+        finally:
+            inflight.pop(key, None)
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠ Web search refresh failed, keeping stale result: {task.exception()}")
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_results")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit rate and the number of searches the cache saved."""
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        served = self.hits + self.stale_hits + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "hit_rate": served / lookups if lookups else 0.0,
+            # Stale hits still trigger one refresh search each
+            "saved_calls": self.hits + self.coalesced + self.stale_hits - self.refreshes,
+        }
@@ -16,15 +16,23 @@ class AgentState:
         is_casual: Whether the query is casual/greeting (skips RAG)
         needs_web_search: Whether the query needs fresh data from web
         docs: Retrieved documents from vector store
+        retrieval_scores: Vector relevance score of each retrieved doc (0.0 for lexical-only hits)
+        confidence: Probability the vector context answers the query (calibrated model only)
+        context_decision: Pre-generation decision: "answer", "web" or "escalate"
         web_results: Results from web search
         low_confidence: Whether the answer confidence is low (triggers fallback)
         answer: The generated answer to return to user
+        prompt_tokens: Estimated prompt tokens sent to the LLM for this request
     """
     query: str
     intent: Optional[str] = None
     is_casual: bool = False
     needs_web_search: bool = False
     docs: List = field(default_factory=list)
+    retrieval_scores: List[float] = field(default_factory=list)
+    confidence: Optional[float] = None
+    context_decision: Optional[str] = None
     web_results: List = field(default_factory=list)
     low_confidence: bool = False
     answer: Optional[str] = None
+    prompt_tokens: int = 0
@@ -0,0 +1,304 @@
+# core/tracing.py
+"""
+Per-request tracing for the agent workflow.
+
+Every query runs under a RequestTrace held in a context variable, so any
+code on the request's path (graph nodes, the classifier, the caches) can
+add to it without the trace being passed around. A trace records:
+
+- the route taken (casual, facts, parallel_retrieve, vector_only, fallback,
+  escalate, cache)
+- the duration of every graph node
+- LLM calls and their input/output tokens (from the model's usage data)
+- cache hits (answer, LLM, web search) and the classifier's decision
+
+When the request ends the trace is folded into the metrics registry
+(request and node latency histograms, token and cache counters) and,
+if TRACE_LOG_PATH is set, appended to a JSONL file.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from core.metrics import counter, histogram
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# One JSON line per request; empty disables the trace log
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH") or ""
+
+_log_lock = threading.Lock()
+_current: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar("request_trace", default=None)
+
+_request_seconds = histogram("agent_request_seconds", "End-to-end request latency, by route")
+_node_seconds = histogram("agent_node_seconds", "Graph node latency, by node")
+_requests = counter("agent_requests_total", "Requests, by route and outcome")
+_llm_tokens = counter("agent_llm_tokens_total", "LLM tokens, by direction (input/output)")
+_llm_calls = counter("agent_llm_calls_total", "LLM calls that reached the provider")
+_cache_hits = counter("agent_cache_hits_total", "Cache hits on the request path, by cache")
+
+
+# =============================================================================
+# TRACE
+# =============================================================================
+
+@dataclass
+class RequestTrace:
+    """Everything recorded about one request."""
+    query: str
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    started_at: float = field(default_factory=time.time)
+    route: Optional[str] = None
+    intent: Optional[str] = None
+    nodes: List[Dict[str, Any]] = field(default_factory=list)
+    llm_calls: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    cache_hits: Dict[str, int] = field(default_factory=dict)
+    annotations: Dict[str, Any] = field(default_factory=dict)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    def __post_init__(self):
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_node(self, node: str, seconds: float) -> None:
+        with self._lock:
+            self.nodes.append({"node": node, "seconds": round(seconds, 6)})
+
+    def add_llm_usage(self, tokens_in: int, tokens_out: int) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+
+    def add_cache_hit(self, cache: str) -> None:
+        with self._lock:
+            self.cache_hits[cache] = self.cache_hits.get(cache, 0) + 1
+
+    def callbacks(self) -> list:
+        """Callback handlers that report LLM token usage to this trace."""
+        return [_UsageHandler(self)]
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "ts": self.started_at,
+            "query": self.query,
+            "route": self.route,
+            "intent": self.intent,
+            "seconds": round(self.seconds, 6),
+            "nodes": self.nodes,
+            "llm_calls": self.llm_calls,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "cache_hits": self.cache_hits,
+            **self.annotations,
+            "error": self.error,
+        }
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """The trace of the request being served, if any."""
+    return _current.get()
+
+
+def record_cache_hit(cache: str) -> None:
+    """Count a cache hit on the current request (no-op outside a request)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_cache_hit(cache)
+
+
+def annotate(**values) -> None:
+    """Attach extra fields to the current request's trace."""
+    trace = _current.get()
+    if trace is not None:
+        trace.annotations.update(values)
+
+
+class _UsageHandler(BaseCallbackHandler):
+    """Adds token usage of every LLM call to a trace."""
+
+    def __init__(self, trace: RequestTrace):
+        self.trace = trace
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                # LangChain marks responses replayed from the LLM cache with a zero cost
+                if not usage or "total_cost" in usage:
+                    continue
+                self.trace.add_llm_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+# =============================================================================
+# ROUTES
+# =============================================================================
+
+def route_of(nodes: List[str], cache_hit: bool = False) -> Optional[str]:
+    """Route label for a request from the graph nodes it ran."""
+    if cache_hit:
+        return "cache"
+    if "handle_casual" in nodes:
+        return "casual"
+    if "retrieve_parallel" in nodes:
+        return "parallel_retrieve"
+    if "lookup_facts" in nodes and "retrieve_vector" not in nodes:
+        return "facts"
+    if "web_fallback" in nodes:
+        return "fallback"
+    if "retrieve_vector" in nodes and "resolve_with_fallback" not in nodes and "escalate" in nodes:
+        return "escalate"
+    if "retrieve_vector" in nodes:
+        return "vector_only"
+    return None
+
+
+@contextmanager
+def trace_request(query: str):
+    """
+    Run the enclosed request under a new trace and record it on exit.
+
+    Call close_trace() with the final agent result before leaving the block.
+    """
+    trace = RequestTrace(query=query)
+    token = _current.set(trace)
+    try:
+        yield trace
+    except Exception as e:
+        trace.error = f"{type(e).__name__}: {e}"
+        raise
+    except BaseException:
+        # Client went away (generator closed / task cancelled)
+        trace.error = "cancelled"
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # A streaming generator closed from a different context
+            _current.set(None)
+        _finish(trace)
+
+
+def _finish(trace: RequestTrace) -> None:
+    trace.seconds = time.perf_counter() - trace._start
+    trace.route = route_of(
+        [n["node"] for n in trace.nodes], bool(trace.annotations.get("cache_hit"))
+    ) or "none"
+    if trace.annotations.get("cache_hit"):
+        trace.add_cache_hit("answer")
+
+    outcome = "error" if trace.error else "ok"
+    _requests.inc(route=trace.route, outcome=outcome)
+    if not trace.error:
+        _request_seconds.observe(trace.seconds, route=trace.route)
+    if trace.llm_calls:
+        _llm_calls.inc(trace.llm_calls)
+        _llm_tokens.inc(trace.tokens_in, direction="input")
+        _llm_tokens.inc(trace.tokens_out, direction="output")
+    for cache, hits in trace.cache_hits.items():
+        _cache_hits.inc(hits, cache=cache)
+
+    if TRACE_LOG_PATH:
+        _write(trace)
+
+
+def _write(trace: RequestTrace) -> None:
+    try:
+        record = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+        with _log_lock:
+            os.makedirs(os.path.dirname(TRACE_LOG_PATH) or ".", exist_ok=True)
+            with open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(record + "\n")
+    except OSError as e:
+        print(f"⚠ Could not write trace log: {e}")
+
+
+# =============================================================================
+# NODE TIMING
+# =============================================================================
+
+def timed(node: str, func, afunc):
+    """Sync and async versions of a graph node that time every run."""
+
+    def _record(start: float) -> None:
+        seconds = time.perf_counter() - start
+        _node_seconds.observe(seconds, node=node)
+        trace = _current.get()
+        if trace is not None:
+            trace.add_node(node, seconds)
+
+    @functools.wraps(func)
+    def run(state):
+        start = time.perf_counter()
+        try:
+            return func(state)
+        finally:
+            _record(start)
+
+    @functools.wraps(afunc)
+    async def arun(state):
+        start = time.perf_counter()
+        try:
+            return await afunc(state)
+        finally:
+            _record(start)
+
+    return run, arun
+
+
+class TracedAgent:
+    """
+    Wraps the agent so every invoke()/ainvoke() runs under a RequestTrace.
+
+    Other attributes (such as ``cache``) pass through to the wrapped agent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def __getattr__(self, name):
+        return getattr(self.app, name)
+
+    def invoke(self, input: Dict[str, Any], config=None, **kwargs) -> Dict[str, Any]:
+        with trace_request(input["query"]) as trace:
+            result = self.app.invoke(input, with_callbacks(config, trace), **kwargs)
+            close_trace(trace, result)
+        return result
+
+    async def ainvoke(self, input: Dict[str, Any], config=None, **kwargs) -> Dict[str, Any]:
+        with trace_request(input["query"]) as trace:
+            result = await self.app.ainvoke(input, with_callbacks(config, trace), **kwargs)
+            close_trace(trace, result)
+        return result
+
+
+def with_callbacks(config: Optional[dict], trace: RequestTrace) -> dict:
+    config = dict(config or {})
+    config["callbacks"] = list(config.get("callbacks") or []) + trace.callbacks()
+    return config
+
+
+def close_trace(trace: RequestTrace, result: Dict[str, Any]) -> None:
+    """Copy what the trace needs from the final agent result."""
+    trace.intent = result.get("intent")
+    trace.annotations["cache_hit"] = bool(result.get("cache_hit", False))
+    trace.annotations["prompt_tokens_estimate"] = result.get("prompt_tokens") or 0
+
@@ -0,0 +1,393 @@
+# core/vector_store.py
+"""
+In-process vector store backed by a memory-mapped NumPy matrix.
+
+The corpus is tiny (a handful of files in ./dataset), so a brute-force
+cosine search over a normalized float32 matrix answers in microseconds
+instead of paying a network round-trip to Pinecone on every query.
+
+On-disk layout (inside the index directory):
+    index.json           : ids, texts, metadatas and the current matrix file
+    embeddings-<n>.npy   : L2-normalized float32 matrix, one row per document
+
+The matrix is opened with ``mmap_mode="r"`` so several worker processes
+share a single copy through the OS page cache. Writers produce a new
+matrix file and then atomically swap ``index.json``, so readers never see
+a half-written index. In memory, each loaded version is one immutable
+snapshot swapped in with a single assignment; a search reads it once, so
+a reload mid-search cannot mix rows of two versions.
+
+Searches accept a Pinecone-style metadata ``filter`` (see matches_filter),
+so scoped retrieval behaves the same on both backends.
+
+ScoredRetriever works with any LangChain vector store (local or Pinecone)
+and keeps each document's relevance score in its metadata.
+"""
+
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
+
+
+INDEX_FILE = "index.json"
+
+
+def matches_filter(metadata: dict, filter: dict) -> bool:
+    """
+    True if the metadata satisfies a Pinecone-style filter.
+
+    Supports ``{field: value}``, ``{field: {"$eq": value}}`` and
+    ``{field: {"$in": [values]}}``; every field must match. A field the
+    metadata lacks never matches.
+    """
+    for key, condition in filter.items():
+        if key not in metadata:
+            return False
+        value = metadata[key]
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, operand in condition.items():
+            if op == "$eq":
+                ok = value == operand
+            elif op == "$in":
+                ok = value in operand
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            if not ok:
+                return False
+    return True
+
+
+def filter_mask(metadatas: Sequence[dict], filter: dict) -> np.ndarray:
+    """Boolean mask of the metadatas that satisfy the filter."""
+    return np.fromiter((matches_filter(m, filter) for m in metadatas), dtype=bool, count=len(metadatas))
+
+
+def filter_key(filter: dict) -> str:
+    """Canonical form of a filter, for caching its mask."""
+    return json.dumps(filter, sort_keys=True)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One loaded version of the index; replaced as a whole, never modified."""
+    ids: List[str]
+    texts: List[str]
+    metadatas: List[dict]
+    matrix: np.ndarray
+    mtime: Optional[int] = None
+    # Filter masks for this version; queries reuse a handful of distinct filters
+    masks: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def document_at(self, i: int) -> Document:
+        return Document(id=self.ids[i], page_content=self.texts[i], metadata=dict(self.metadatas[i]))
+
+    def filter_mask(self, filter: dict) -> np.ndarray:
+        key = filter_key(filter)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = self.masks[key] = filter_mask(self.metadatas, filter)
+        return mask
+
+
+_EMPTY = _Snapshot(ids=[], texts=[], metadatas=[], matrix=np.zeros((0, 0), dtype=np.float32))
+
+
+class LocalVectorStore(VectorStore):
+    """
+    LangChain-compatible vector store kept on local disk.
+
+    Scores follow the Pinecone cosine convention: ``similarity_search_with_score``
+    returns raw cosine similarity in [-1, 1], and relevance scores are mapped
+    to ``(score + 1) / 2`` so ``similarity_score_threshold`` retrievers behave
+    exactly like they did against the Pinecone index.
+    """
+
+    def __init__(self, index_dir: str, embedding: Embeddings):
+        """
+        Open (or prepare) a local index.
+
+        Args:
+            index_dir: Directory holding index.json and the embedding matrix
+            embedding: Embedding model used for queries and new documents
+        """
+        self.index_dir = index_dir
+        self._embedding = embedding
+        self._lock = threading.Lock()
+        self._state = _EMPTY
+        self._reload_if_changed()
+
+    # =========================================================================
+    # PROPERTIES
+    # =========================================================================
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._reload_if_changed().ids)
+
+    def is_empty(self) -> bool:
+        """Return True if the index has no documents."""
+        return len(self) == 0
+
+    # =========================================================================
+    # LOADING / PERSISTENCE
+    # =========================================================================
+
+    def _index_path(self) -> str:
+        return os.path.join(self.index_dir, INDEX_FILE)
+
+    def _reload_if_changed(self, force: bool = False) -> _Snapshot:
+        """Re-open the index if another process has rewritten it; return the current snapshot."""
+        try:
+            mtime = os.stat(self._index_path()).st_mtime_ns
+        except FileNotFoundError:
+            return self._state
+        if mtime == self._state.mtime and not force:
+            return self._state
+
+        with self._lock:
+            if mtime == self._state.mtime and not force:
+                return self._state
+            while True:
+                with open(self._index_path(), "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                try:
+                    matrix = self._load_matrix(index["matrix"])
+                    break
+                except FileNotFoundError:
+                    # A writer swapped in a newer index and removed this matrix; read again
+                    mtime = os.stat(self._index_path()).st_mtime_ns
+            self._state = _Snapshot(
+                ids=index["ids"],
+                texts=index["texts"],
+                metadatas=index["metadatas"],
+                matrix=matrix,
+                mtime=mtime,
+            )
+            return self._state
+
+    def _load_matrix(self, name: str) -> np.ndarray:
+        path = os.path.join(self.index_dir, name)
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Empty matrices cannot be memory-mapped
+            return np.load(path)
+
+    def _write(self, ids: List[str], texts: List[str], metadatas: List[dict], matrix: np.ndarray) -> None:
+        """Persist a new version of the index and swap it in atomically."""
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        old_matrix = None
+        if os.path.exists(self._index_path()):
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                old_matrix = json.load(f).get("matrix")
+
+        matrix_name = f"embeddings-{uuid.uuid4().hex[:12]}.npy"
+        np.save(os.path.join(self.index_dir, matrix_name), np.ascontiguousarray(matrix, dtype=np.float32))
+
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "dimension": int(matrix.shape[1]) if matrix.size else 0,
+                    "matrix": matrix_name,
+                    "ids": ids,
+                    "texts": texts,
+                    "metadatas": metadatas,
+                },
+                f,
+            )
+        os.replace(tmp_path, self._index_path())
+
+        # Readers that still hold the old mmap keep working after unlink
+        if old_matrix and old_matrix != matrix_name:
+            try:
+                os.remove(os.path.join(self.index_dir, old_matrix))
+            except FileNotFoundError:
+                pass
+
+        self._reload_if_changed(force=True)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    # =========================================================================
+    # WRITE API
+    # =========================================================================
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Embed and add texts. Existing ids are overwritten (upsert)."""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+
+        vectors = np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+        vectors = self._normalize(vectors)
+
+        state = self._reload_if_changed()
+        new_ids = set(ids)
+        keep = [i for i, existing in enumerate(state.ids) if existing not in new_ids]
+
+        all_ids = [state.ids[i] for i in keep] + list(ids)
+        all_texts = [state.texts[i] for i in keep] + texts
+        all_metadatas = [state.metadatas[i] for i in keep] + [dict(m) for m in metadatas]
+        if keep:
+            matrix = np.vstack([np.asarray(state.matrix[keep]), vectors])
+        else:
+            matrix = vectors
+
+        self._write(all_ids, all_texts, all_metadatas, matrix)
+        return list(ids)
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: Optional[bool] = None, **kwargs: Any) -> Optional[bool]:
+        """Delete documents by id, or everything with ``delete_all=True``."""
+        state = self._reload_if_changed()
+        if delete_all:
+            keep = []
+        elif ids is not None:
+            drop = set(ids)
+            keep = [i for i, existing in enumerate(state.ids) if existing not in drop]
+        else:
+            raise ValueError("Either ids or delete_all must be provided.")
+
+        if len(keep) == len(state.ids):
+            return True
+
+        dimension = state.matrix.shape[1] if state.matrix.ndim == 2 else 0
+        matrix = np.asarray(state.matrix[keep]) if keep else np.zeros((0, dimension), dtype=np.float32)
+        self._write(
+            [state.ids[i] for i in keep],
+            [state.texts[i] for i in keep],
+            [state.metadatas[i] for i in keep],
+            matrix,
+        )
+        return True
+
+    def get_by_ids(self, ids: List[str], /) -> List[Document]:
+        """Return stored documents for the given ids (missing ids are skipped)."""
+        state = self._reload_if_changed()
+        position = {doc_id: i for i, doc_id in enumerate(state.ids)}
+        return [state.document_at(position[i]) for i in ids if i in position]
+
+    # =========================================================================
+    # SEARCH API
+    # =========================================================================
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Return the top-k documents (matching ``filter``, if given) and their cosine similarity."""
+        state = self._reload_if_changed()
+        n = len(state.ids)
+        if n == 0 or k <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = state.matrix @ query
+        if filter:
+            mask = state.filter_mask(filter)
+            n = int(mask.sum())
+            if n == 0:
+                return []
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, n)
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+        else:
+            top = np.argsort(-scores)
+
+        return [(state.document_at(int(i)), float(scores[i])) for i in top]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Embed the query and return the top-k documents with cosine similarity."""
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k=k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)]
+
+    @staticmethod
+    def _cosine_relevance_score_fn(score: float) -> float:
+        """Map cosine similarity in [-1, 1] to [0, 1], same as langchain_pinecone."""
+        return (score + 1) / 2
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self._cosine_relevance_score_fn
+
+    # =========================================================================
+    # CONSTRUCTORS
+    # =========================================================================
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        index_dir: str = "./.index",
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        """Create a local index at ``index_dir`` and add the given texts."""
+        store = cls(index_dir, embedding)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+
+class ScoredRetriever(VectorStoreRetriever):
+    """
+    Retriever that keeps the relevance score of every returned document.
+
+    Behaves like ``as_retriever(search_type="similarity_score_threshold")``
+    but stores each score in ``doc.metadata["score"]`` so downstream nodes
+    can judge how strong the retrieved context is.
+    """
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        docs_and_scores = self.vectorstore.similarity_search_with_relevance_scores(
+            query, **(self.search_kwargs | kwargs)
+        )
+        for doc, score in docs_and_scores:
+            doc.metadata["score"] = float(score)
+        return [doc for doc, _ in docs_and_scores]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        docs_and_scores = await self.vectorstore.asimilarity_search_with_relevance_scores(
+            query, **(self.search_kwargs | kwargs)
+        )
+        for doc, score in docs_and_scores:
+            doc.metadata["score"] = float(score)
+        return [doc for doc, _ in docs_and_scores]
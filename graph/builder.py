@@ -1,27 +1,50 @@
 # graph/builder.py
 """Graph builder for constructing the LangGraph workflow."""
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from core.state import AgentState
+from core.tracing import timed
 from graph.nodes import (
     classify_query,
+    aclassify_query,
+    lookup_facts,
+    alookup_facts,
     handle_casual_message,
+    ahandle_casual_message,
     retrieve_from_vector_store,
-    retrieve_from_web,
+    aretrieve_from_vector_store,
+    retrieve_parallel,
+    aretrieve_parallel,
     generate_hybrid_answer,
+    agenerate_hybrid_answer,
     generate_answer_with_fallback_check,
+    agenerate_answer_with_fallback_check,
     web_search_fallback,
-    check_parallel_routing,
-    escalate_if_needed
+    aweb_search_fallback,
+    escalate_if_needed,
+    aescalate_if_needed
 )
 from graph.routing import (
     route_after_classify,
-    route_after_vector_retrieval,
+    route_after_facts,
+    route_after_retrieval,
     route_after_fallback_check
 )
 
 
+def _node(name: str, func, afunc) -> RunnableLambda:
+    """
+    Node with a sync implementation for invoke() and an async one for ainvoke().
+
+    Every run is timed into the agent_node_seconds histogram and the
+    current request's trace.
+    """
+    func, afunc = timed(name, func, afunc)
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
 def create_agent_graph() -> StateGraph:
     """
     Build and compile the agent workflow graph.
@@ -30,11 +53,16 @@ def create_agent_graph() -> StateGraph:
         1. Classify query intent
         2. Route based on classification:
            - Casual → Direct LLM response → END
-           - Time-sensitive → Vector + Web search → Hybrid answer
-           - Standard → Vector search → Answer with fallback check
+           - Time-sensitive → Vector + Web search (concurrent) → Hybrid answer
+           - Fee/eligibility lookup → Templated answer from the fact index → END
+           - Standard → Vector search → Confidence gate on the retrieval scores
+             → Answer with fallback check, or straight to web search / escalation
         3. If low confidence, fallback to web search
         4. Escalate if still unable to answer
     
+    Every node has a sync and an async implementation, so the compiled
+    graph serves both app.invoke() and app.ainvoke().
+    
     Returns:
         Compiled StateGraph ready for invocation
     """
@@ -43,15 +71,15 @@ def create_agent_graph() -> StateGraph:
     # =========================================================================
     # ADD NODES
     # =========================================================================
-    graph.add_node("classify", classify_query)
-    graph.add_node("handle_casual", handle_casual_message)
-    graph.add_node("retrieve_vector", retrieve_from_vector_store)
-    graph.add_node("retrieve_web", retrieve_from_web)
-    graph.add_node("check_parallel", check_parallel_routing)
-    graph.add_node("resolve_hybrid", generate_hybrid_answer)
-    graph.add_node("resolve_with_fallback", generate_answer_with_fallback_check)
-    graph.add_node("web_fallback", web_search_fallback)
-    graph.add_node("escalate", escalate_if_needed)
+    graph.add_node("classify", _node("classify", classify_query, aclassify_query))
+    graph.add_node("handle_casual", _node("handle_casual", handle_casual_message, ahandle_casual_message))
+    graph.add_node("lookup_facts", _node("lookup_facts", lookup_facts, alookup_facts))
+    graph.add_node("retrieve_vector", _node("retrieve_vector", retrieve_from_vector_store, aretrieve_from_vector_store))
+    graph.add_node("retrieve_parallel", _node("retrieve_parallel", retrieve_parallel, aretrieve_parallel))
+    graph.add_node("resolve_hybrid", _node("resolve_hybrid", generate_hybrid_answer, agenerate_hybrid_answer))
+    graph.add_node("resolve_with_fallback", _node("resolve_with_fallback", generate_answer_with_fallback_check, agenerate_answer_with_fallback_check))
+    graph.add_node("web_fallback", _node("web_fallback", web_search_fallback, aweb_search_fallback))
+    graph.add_node("escalate", _node("escalate", escalate_if_needed, aescalate_if_needed))
     
     # =========================================================================
     # SET ENTRY POINT
@@ -66,7 +94,8 @@ def create_agent_graph() -> StateGraph:
         route_after_classify,
         {
             "casual": "handle_casual",
-            "parallel_retrieve": "retrieve_vector",
+            "parallel_retrieve": "retrieve_parallel",
+            "facts": "lookup_facts",
             "vector_only": "retrieve_vector"
         }
     )
@@ -75,28 +104,36 @@ def create_agent_graph() -> StateGraph:
     graph.add_edge("handle_casual", END)
     
     # =========================================================================
-    # VECTOR RETRIEVAL → PARALLEL CHECK
+    # FACT LOOKUP → END, OR VECTOR-ONLY WHEN NOT A CLEAR LOOKUP
     # =========================================================================
-    graph.add_edge("retrieve_vector", "check_parallel")
-    
     graph.add_conditional_edges(
-        "check_parallel",
-        route_after_vector_retrieval,
+        "lookup_facts",
+        route_after_facts,
         {
-            "do_web_search": "retrieve_web",
-            "vector_only_resolve": "resolve_with_fallback"
+            "answered": END,
+            "vector_only": "retrieve_vector"
         }
     )
     
     # =========================================================================
-    # WEB RETRIEVAL → HYBRID ANSWER
+    # PARALLEL RETRIEVAL (VECTOR + WEB) → HYBRID ANSWER
     # =========================================================================
-    graph.add_edge("retrieve_web", "resolve_hybrid")
+    graph.add_edge("retrieve_parallel", "resolve_hybrid")
     graph.add_edge("resolve_hybrid", "escalate")
     
     # =========================================================================
-    # VECTOR-ONLY → FALLBACK CHECK
+    # VECTOR-ONLY → CONFIDENCE GATE → FALLBACK CHECK
     # =========================================================================
+    graph.add_conditional_edges(
+        "retrieve_vector",
+        route_after_retrieval,
+        {
+            "answer": "resolve_with_fallback",
+            "web_fallback": "web_fallback",
+            "escalate": "escalate"
+        }
+    )
+    
     graph.add_conditional_edges(
         "resolve_with_fallback",
         route_after_fallback_check,
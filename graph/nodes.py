@@ -1,11 +1,30 @@
 # graph/nodes.py
-"""Node functions for the LangGraph workflow."""
+"""
+Node functions for the LangGraph workflow.
+
+Every node has a sync version (used by app.invoke) and an async version
+prefixed with "a" (used by app.ainvoke). Both share the same message
+building and state-update helpers, so they only differ in how they wait
+on I/O.
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from core.state import AgentState
-from core.config import UNCERTAINTY_PHRASES, MIN_CONTEXT_LENGTH
+from core.config import MIN_CONTEXT_LENGTH, RETRIEVAL_BRANCH_TIMEOUT
+from core.context import build_context, record_prompt_tokens
+from core.keywords import is_uncertain
+from core.casual import casual_reply, record_llm_reply
 from core.classifier import get_classifier
+from core.confidence import assess_context, retrieval_scores
+from core.facts import lookup_fact
+from core.scope import aretrieve, retrieve
 from core.prompts import (
     get_casual_prompt,
     get_rag_prompt,
@@ -13,8 +32,9 @@ from core.prompts import (
     get_hybrid_prompt,
     get_web_fallback_prompt
 )
-from langChainFun import llm, retriever
-from webSearch import search_university_website, format_web_results
+from graph.prefetch import SPECULATIVE_WEB_PREFETCH, get_prefetcher, is_weak_context
+from langChainFun import get_llm, get_retriever
+from webSearch import search_university_website, asearch_university_website
 
 
 # =============================================================================
@@ -23,142 +43,335 @@ from webSearch import search_university_website, format_web_results
 def classify_query(state: AgentState) -> AgentState:
     """
     Classify query intent using ML-based zero-shot classification.
-    
+
     Uses HuggingFace's DeBERTa model for accurate intent detection.
     Falls back to keyword matching if API fails.
-    
+
     Sets:
         - state.is_casual: True if query is a greeting/casual message
         - state.needs_web_search: True if query needs fresh web data
         - state.intent: Category for retrieval filtering
     """
-    classifier = get_classifier()
-    intent, is_casual, needs_web = classifier.classify(state.query)
-    
+    return _apply_classification(state, get_classifier().classify(state.query))
+
+
+async def aclassify_query(state: AgentState) -> AgentState:
+    """Async version of classify_query."""
+    return _apply_classification(state, await get_classifier().aclassify(state.query))
+
+
+def _apply_classification(state: AgentState, result) -> AgentState:
+    intent, is_casual, needs_web = result
+
     state.intent = intent
     state.is_casual = is_casual
     state.needs_web_search = needs_web
-    
+
+    return state
+
+
+# =============================================================================
+# FACT LOOKUP NODE
+# =============================================================================
+def lookup_facts(state: AgentState) -> AgentState:
+    """
+    Answer fee and eligibility lookups from the structured fact index.
+
+    Only unambiguous questions get an answer (with its source files);
+    otherwise state.answer stays empty and the query goes on to retrieval.
+    """
+    fact = lookup_fact(state.query)
+    if fact is not None:
+        state.answer = fact.answer
     return state
 
 
+async def alookup_facts(state: AgentState) -> AgentState:
+    """Async version of lookup_facts (in-memory, runs inline)."""
+    return lookup_facts(state)
+
+
 # =============================================================================
 # CASUAL MESSAGE NODE
 # =============================================================================
 def handle_casual_message(state: AgentState) -> AgentState:
-    """Handle casual/greeting messages directly without RAG."""
-    messages = [
-        SystemMessage(content=get_casual_prompt()),
-        HumanMessage(content=state.query),
-    ]
-    
-    result = llm.invoke(messages)
-    state.answer = result.content
+    """
+    Handle casual/greeting messages directly without RAG.
+
+    Greetings, thanks and the like get a template reply (core/casual.py);
+    only casual messages no template fits are sent to the LLM.
+    """
+    state.answer = casual_reply(state.query)
+    if state.answer is None:
+        record_llm_reply()
+        state.answer = get_llm().invoke(_casual_messages(state)).content
+    return state
+
+
+async def ahandle_casual_message(state: AgentState) -> AgentState:
+    """Async version of handle_casual_message."""
+    state.answer = casual_reply(state.query)
+    if state.answer is None:
+        record_llm_reply()
+        state.answer = (await get_llm().ainvoke(_casual_messages(state))).content
     return state
 
 
+def _casual_messages(state: AgentState) -> list:
+    return _prompt_messages(state, "handle_casual", get_casual_prompt())
+
+
 # =============================================================================
 # RETRIEVAL NODES
 # =============================================================================
 def retrieve_from_vector_store(state: AgentState) -> AgentState:
-    """Retrieve relevant documents from vector store."""
-    state.docs = retriever.invoke(state.query)
+    """
+    Retrieve relevant documents from vector store.
+
+    The search is scoped to chunks matching state.intent and the query's
+    facets (core/scope.py), falling back to the whole index if that finds
+    nothing. The retrieval scores then decide, before any generation,
+    whether to answer from the docs, go straight to the web or escalate
+    (core/confidence.py).
+
+    With SPECULATIVE_WEB_PREFETCH on, weak results that are still answered
+    start the web search in the background in case the answer needs the
+    web fallback.
+    """
+    state.docs = retrieve(get_retriever(), state.query, state.intent)
+    _assess_context(state)
+    _maybe_prefetch(state)
+    return state
+
+
+async def aretrieve_from_vector_store(state: AgentState) -> AgentState:
+    """Async version of retrieve_from_vector_store."""
+    state.docs = await aretrieve(get_retriever(), state.query, state.intent)
+    _assess_context(state)
+    _maybe_prefetch(state)
+    return state
+
+
+def _assess_context(state: AgentState) -> None:
+    state.retrieval_scores = retrieval_scores(state.docs)
+    assessment = assess_context(state.query, state.docs)
+    state.confidence = assessment.confidence
+    state.context_decision = assessment.decision
+    # Skipping generation must not skip escalation: an empty web fallback still escalates
+    if assessment.decision != "answer":
+        state.low_confidence = True
+
+
+def _maybe_prefetch(state: AgentState) -> None:
+    if (SPECULATIVE_WEB_PREFETCH and not state.needs_web_search and state.context_decision == "answer"
+            and is_weak_context(state.docs)):
+        get_prefetcher().start(state.query)
+
+
+# Shared pool for fan-out; branches that time out keep running in the
+# background, so the pool is sized for a few stragglers per worker.
+_retrieval_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="retrieve")
+
+
+def retrieve_parallel(state: AgentState) -> AgentState:
+    """
+    Run vector and web retrieval concurrently and join the results.
+
+    Each branch gets RETRIEVAL_BRANCH_TIMEOUT seconds; a slow or failing
+    branch contributes an empty result instead of holding up the answer.
+    """
+    vector_future = _retrieval_pool.submit(
+        contextvars.copy_context().run, retrieve, get_retriever(), state.query, state.intent
+    )
+    web_future = _retrieval_pool.submit(
+        contextvars.copy_context().run, search_university_website, state.query
+    )
+
+    # Both branches share one deadline, so the join waits for the slower one at most
+    deadline = time.monotonic() + RETRIEVAL_BRANCH_TIMEOUT
+    state.docs = _branch_result(vector_future, "vector", deadline)
+    state.retrieval_scores = retrieval_scores(state.docs)
+    state.web_results = _branch_result(web_future, "web", deadline)
     return state
 
 
-def retrieve_from_web(state: AgentState) -> AgentState:
-    """Fetch latest info from university website."""
-    state.web_results = search_university_website(state.query)
+async def aretrieve_parallel(state: AgentState) -> AgentState:
+    """Async version of retrieve_parallel."""
+    vector_task = asyncio.ensure_future(aretrieve(get_retriever(), state.query, state.intent))
+    web_task = asyncio.ensure_future(asearch_university_website(state.query))
+
+    done, pending = await asyncio.wait({vector_task, web_task}, timeout=RETRIEVAL_BRANCH_TIMEOUT)
+    for task in pending:
+        task.cancel()
+
+    state.docs = _task_result(vector_task, "vector", done)
+    state.retrieval_scores = retrieval_scores(state.docs)
+    state.web_results = _task_result(web_task, "web", done)
     return state
 
 
+def _branch_result(future, name: str, deadline: float) -> list:
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        print(f"⚠ {name} retrieval exceeded {RETRIEVAL_BRANCH_TIMEOUT}s, continuing without it")
+    except Exception as e:
+        print(f"⚠ {name} retrieval failed: {e}")
+    return []
+
+
+def _task_result(task: asyncio.Task, name: str, done: set) -> list:
+    if task not in done:
+        print(f"⚠ {name} retrieval exceeded {RETRIEVAL_BRANCH_TIMEOUT}s, continuing without it")
+        return []
+    if task.exception() is not None:
+        print(f"⚠ {name} retrieval failed: {task.exception()}")
+        return []
+    return task.result()
+
+
 # =============================================================================
 # ANSWER GENERATION NODES
 # =============================================================================
 def generate_hybrid_answer(state: AgentState) -> AgentState:
     """Generate answer using both vector store and web context."""
-    vector_context = "\n\n".join([d.page_content for d in state.docs])
-    web_context = format_web_results(state.web_results)
-    
-    if web_context:
-        prompt = get_hybrid_prompt(vector_context, web_context)
-    else:
-        prompt = get_rag_prompt(vector_context)
+    result = get_llm().invoke(_hybrid_messages(state))
+    state.answer = result.content
+    return state
 
-    messages = [
-        SystemMessage(content=prompt),
-        HumanMessage(content=state.query),
-    ]
 
-    result = llm.invoke(messages)
+async def agenerate_hybrid_answer(state: AgentState) -> AgentState:
+    """Async version of generate_hybrid_answer."""
+    result = await get_llm().ainvoke(_hybrid_messages(state))
     state.answer = result.content
     return state
 
 
+def _hybrid_messages(state: AgentState) -> list:
+    context = build_context(state.query, state.docs, state.web_results)
+
+    if context.web_context:
+        prompt = get_hybrid_prompt(context.vector_context, context.web_context)
+    else:
+        prompt = get_rag_prompt(context.vector_context)
+
+    return _prompt_messages(state, "resolve_hybrid", prompt)
+
+
 def generate_answer_with_fallback_check(state: AgentState) -> AgentState:
     """Generate answer and check if we need to fallback to web search."""
-    vector_context = "\n\n".join([d.page_content for d in state.docs])
-    
+    messages = _fallback_check_messages(state)
+    if messages is None:
+        return state
+
+    result = get_llm().invoke(messages)
+    return _apply_fallback_check(state, result.content)
+
+
+async def agenerate_answer_with_fallback_check(state: AgentState) -> AgentState:
+    """Async version of generate_answer_with_fallback_check."""
+    messages = _fallback_check_messages(state)
+    if messages is None:
+        return state
+
+    result = await get_llm().ainvoke(messages)
+    return _apply_fallback_check(state, result.content)
+
+
+def _fallback_check_messages(state: AgentState) -> Optional[list]:
+    """Messages for the vector-only answer, or None if context is too thin."""
+    vector_context = build_context(state.query, state.docs).vector_context
+
     # Check if we have enough context
     if len(state.docs) == 0 or len(vector_context) < MIN_CONTEXT_LENGTH:
         state.low_confidence = True
         state.answer = None
-        return state
-    
-    messages = [
-        SystemMessage(content=get_rag_with_fallback_prompt(vector_context)),
-        HumanMessage(content=state.query),
-    ]
+        return None
+
+    return _prompt_messages(state, "resolve_with_fallback", get_rag_with_fallback_prompt(vector_context))
+
+
+def _apply_fallback_check(state: AgentState, answer: str) -> AgentState:
+    state.answer = answer
 
-    result = llm.invoke(messages)
-    state.answer = result.content
-    
     # Check for uncertainty in the answer
-    state.low_confidence = any(
-        phrase in state.answer.lower() 
-        for phrase in UNCERTAINTY_PHRASES
-    )
+    state.low_confidence = is_uncertain(state.answer)
+
+    # Confident answer → any speculative web search is not needed
+    if SPECULATIVE_WEB_PREFETCH and not state.low_confidence:
+        get_prefetcher().discard(state.query)
     return state
 
 
 def web_search_fallback(state: AgentState) -> AgentState:
     """Fallback to web search when vector store doesn't have the answer."""
-    state.web_results = search_university_website(state.query)
-    
+    prefetched = get_prefetcher().take(state.query) if SPECULATIVE_WEB_PREFETCH else None
+    state.web_results = prefetched if prefetched is not None else search_university_website(state.query)
+
+    messages = _web_fallback_messages(state)
+    if messages is None:
+        return state
+
+    result = get_llm().invoke(messages)
+    state.answer = result.content
+    state.low_confidence = False
+    return state
+
+
+async def aweb_search_fallback(state: AgentState) -> AgentState:
+    """Async version of web_search_fallback."""
+    prefetched = await get_prefetcher().atake(state.query) if SPECULATIVE_WEB_PREFETCH else None
+    state.web_results = prefetched if prefetched is not None else await asearch_university_website(state.query)
+
+    messages = _web_fallback_messages(state)
+    if messages is None:
+        return state
+
+    result = await get_llm().ainvoke(messages)
+    state.answer = result.content
+    state.low_confidence = False
+    return state
+
+
+def _web_fallback_messages(state: AgentState) -> Optional[List]:
+    """Messages for the web fallback answer, or None if the web had nothing."""
     if not state.web_results:
         if not state.answer:
             state.answer = "I couldn't find information about this. Please contact the university directly."
-        return state
-    
-    vector_context = "\n\n".join([d.page_content for d in state.docs])
-    web_context = format_web_results(state.web_results)
-    
+        return None
+
+    context = build_context(state.query, state.docs, state.web_results)
+
+    return _prompt_messages(
+        state, "web_fallback", get_web_fallback_prompt(context.vector_context, context.web_context)
+    )
+
+
+def _prompt_messages(state: AgentState, node: str, prompt: str) -> list:
+    """System + user messages, with their token estimate recorded on the state."""
     messages = [
-        SystemMessage(content=get_web_fallback_prompt(vector_context, web_context)),
+        SystemMessage(content=prompt),
         HumanMessage(content=state.query),
     ]
-
-    result = llm.invoke(messages)
-    state.answer = result.content
-    state.low_confidence = False
-    return state
+    state.prompt_tokens += record_prompt_tokens(node, messages)
+    return messages
 
 
 # =============================================================================
 # UTILITY NODES
 # =============================================================================
-def check_parallel_routing(state: AgentState) -> AgentState:
-    """Passthrough node for routing decision after vector retrieval."""
-    return state
-
-
 def escalate_if_needed(state: AgentState) -> AgentState:
     """Check if we need to escalate to human support."""
     from core.config import MIN_ANSWER_LENGTH
-    
+
     answer = (state.answer or "").lower()
-    
+
     if "i don't know" in answer or len(answer) < MIN_ANSWER_LENGTH or state.low_confidence:
         state.answer = "ESCALATE"
-    
+
     return state
+
+
+async def aescalate_if_needed(state: AgentState) -> AgentState:
+    """Async version of escalate_if_needed (no I/O, runs inline)."""
+    return escalate_if_needed(state)
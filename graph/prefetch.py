@@ -0,0 +1,152 @@
+# graph/prefetch.py
+"""
+Speculative web prefetch for the vector-only fallback path.
+
+When vector retrieval comes back weak (few docs or a low top score), the
+Tavily search is started in the background while the LLM is still
+answering from the vector context. If the answer turns out uncertain,
+web_search_fallback picks up the prefetched result instead of starting the
+search from scratch; otherwise the prefetch is discarded. A prefetch
+nobody claims within SPECULATIVE_PREFETCH_TTL (the request failed before
+take or discard) expires, so a later request never gets a stale result.
+
+Enabled with SPECULATIVE_WEB_PREFETCH=true.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import (
+    MIN_CONTEXT_LENGTH,
+    RETRIEVAL_BRANCH_TIMEOUT,
+    SPECULATIVE_MIN_DOCS,
+    SPECULATIVE_MIN_TOP_SCORE,
+    SPECULATIVE_PREFETCH_TTL,
+)
+
+
+SPECULATIVE_WEB_PREFETCH = os.getenv("SPECULATIVE_WEB_PREFETCH", "false").lower() in ("1", "true", "yes")
+
+
+def is_weak_context(docs: List) -> bool:
+    """True if retrieved docs are unlikely to answer the query on their own."""
+    if len(docs) < SPECULATIVE_MIN_DOCS:
+        return True
+    if sum(len(d.page_content) for d in docs) < MIN_CONTEXT_LENGTH:
+        return True
+    scores = [d.metadata["score"] for d in docs if "score" in d.metadata]
+    return bool(scores) and max(scores) < SPECULATIVE_MIN_TOP_SCORE
+
+
+class WebPrefetcher:
+    """Background web searches keyed by query, with pay-off counters."""
+
+    def __init__(self, search_fn: Callable[[str], list], max_workers: int = 8,
+                 ttl: float = SPECULATIVE_PREFETCH_TTL):
+        self.search_fn = search_fn
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._pending: Dict[str, Tuple[float, Future]] = {}   # query → (started at, search)
+        self._lock = threading.Lock()
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+
+    def _expire(self, now: float) -> None:
+        """Drop prefetches older than the TTL; their requests never claimed them."""
+        for query in [q for q, (started_at, _) in self._pending.items() if now - started_at > self.ttl]:
+            self._pending.pop(query)[1].cancel()
+            self.wasted += 1
+
+    def start(self, query: str) -> None:
+        """Start a background search for the query (no-op if a fresh one is pending)."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if query in self._pending:
+                return
+            self._pending[query] = (now, self._pool.submit(
+                contextvars.copy_context().run, self.search_fn, query
+            ))
+            self.started += 1
+
+    def _claim(self, query: str) -> Optional[Future]:
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._pending.pop(query, None)
+            if entry is None:
+                return None
+            self.used += 1
+            return entry[1]
+
+    def take(self, query: str) -> Optional[list]:
+        """
+        Claim the prefetched result for a query.
+
+        Returns:
+            The search results, or None if nothing was prefetched
+        """
+        future = self._claim(query)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=RETRIEVAL_BRANCH_TIMEOUT)
+        except FutureTimeoutError:
+            print(f"⚠ Prefetched web search exceeded {RETRIEVAL_BRANCH_TIMEOUT}s")
+        except Exception as e:
+            print(f"⚠ Prefetched web search failed: {e}")
+        return []
+
+    async def atake(self, query: str) -> Optional[list]:
+        """Async version of take(); waits without blocking the event loop."""
+        future = self._claim(query)
+        if future is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=RETRIEVAL_BRANCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"⚠ Prefetched web search exceeded {RETRIEVAL_BRANCH_TIMEOUT}s")
+        except Exception as e:
+            print(f"⚠ Prefetched web search failed: {e}")
+        return []
+
+    def discard(self, query: str) -> None:
+        """Drop a prefetch that turned out not to be needed."""
+        with self._lock:
+            entry = self._pending.pop(query, None)
+            if entry is None:
+                return
+            self.wasted += 1
+        entry[1].cancel()
+
+    def stats(self) -> dict:
+        """Started/used/wasted counters and the fraction that paid off."""
+        with self._lock:
+            return {
+                "started": self.started,
+                "used": self.used,
+                "wasted": self.wasted,
+                "pending": len(self._pending),
+                "hit_rate": self.used / self.started if self.started else 0.0,
+            }
+
+
+_prefetcher: Optional[WebPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> WebPrefetcher:
+    """Get or create the shared prefetcher."""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                from webSearch import search_university_website
+
+                _prefetcher = WebPrefetcher(search_university_website)
+    return _prefetcher
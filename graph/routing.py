@@ -2,32 +2,52 @@
 """Routing functions for conditional edges in the LangGraph workflow."""
 
 from typing import Literal
+from core.facts import FACT_LOOKUP
 from core.state import AgentState
 
 
-def route_after_classify(state: AgentState) -> Literal["casual", "parallel_retrieve", "vector_only"]:
+def route_after_classify(state: AgentState) -> Literal["casual", "parallel_retrieve", "facts", "vector_only"]:
     """
     Decide routing path after query classification.
     
     Returns:
         - "casual": Skip RAG, go directly to casual response
         - "parallel_retrieve": Query needs web search (time-sensitive)
+        - "facts": Try the structured fact index before standard RAG
         - "vector_only": Standard RAG with vector store only
     """
     if state.is_casual:
         return "casual"
-    return "parallel_retrieve" if state.needs_web_search else "vector_only"
+    if state.needs_web_search:
+        return "parallel_retrieve"
+    return "facts" if FACT_LOOKUP else "vector_only"
 
 
-def route_after_vector_retrieval(state: AgentState) -> Literal["do_web_search", "vector_only_resolve"]:
+def route_after_facts(state: AgentState) -> Literal["answered", "vector_only"]:
     """
-    Decide whether to also do web search after vector retrieval.
+    Decide whether the fact lookup answered the query.
     
     Returns:
-        - "do_web_search": Fetch fresh data from web
-        - "vector_only_resolve": Proceed with vector context only
+        - "answered": Templated answer from the fact index, done
+        - "vector_only": Not a clear fee/eligibility lookup, standard RAG
     """
-    return "do_web_search" if state.needs_web_search else "vector_only_resolve"
+    return "answered" if state.answer else "vector_only"
+
+
+def route_after_retrieval(state: AgentState) -> Literal["answer", "web_fallback", "escalate"]:
+    """
+    Act on the pre-generation confidence decision for the retrieved docs.
+    
+    Returns:
+        - "answer": Context looks sufficient, generate from it
+        - "web_fallback": Context won't answer it, skip straight to web search
+        - "escalate": Neither source is likely to help, skip generation
+    """
+    if state.context_decision == "web":
+        return "web_fallback"
+    if state.context_decision == "escalate":
+        return "escalate"
+    return "answer"
 
 
 def route_after_fallback_check(state: AgentState) -> Literal["web_fallback", "escalate"]:
@@ -0,0 +1,352 @@
+# ingest.py
+"""
+Incremental, content-hashed ingestion of ./dataset into the vector store.
+
+A manifest records the SHA-256 of every dataset file and the ids of the
+chunks it produced. Chunk ids are derived from the chunk content, so a
+re-ingest only embeds chunks that are new or changed, deletes ids that no
+longer exist, and leaves everything else untouched. The cost of a sync
+grows with the size of the change, not the size of the corpus.
+
+Every chunk is tagged with its source file, intent and facets
+(core/scope.py) so retrieval can be scoped to the query.
+
+Usage:
+    python ingest.py              # sync once
+    python ingest.py --rebuild    # drop everything and re-embed from scratch
+    python ingest.py --watch      # sync, then keep watching ./dataset
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from langchain_community.document_loaders import TextLoader
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from core.scope import chunk_metadata
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DATASET_DIR = "./dataset"
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+MANIFEST_VERSION = 2  # Bump when chunk metadata changes
+
+
+class UntrackedIndexError(RuntimeError):
+    """The vector store holds vectors that no manifest accounts for."""
+
+
+@dataclass
+class SyncReport:
+    """Summary of a single sync run."""
+    added: int = 0
+    deleted: int = 0
+    unchanged_files: int = 0
+    changed_files: List[str] = field(default_factory=list)
+    removed_files: List[str] = field(default_factory=list)
+
+    @property
+    def is_noop(self) -> bool:
+        return self.added == 0 and self.deleted == 0
+
+    def __str__(self) -> str:
+        return (
+            f"+{self.added} chunks, -{self.deleted} chunks, "
+            f"{len(self.changed_files)} changed file(s), "
+            f"{len(self.removed_files)} removed file(s), "
+            f"{self.unchanged_files} unchanged"
+        )
+
+
+# =============================================================================
+# LOADING & CHUNKING
+# =============================================================================
+
+def get_splitter() -> RecursiveCharacterTextSplitter:
+    """Text splitter shared by the ingestion pipeline and the retrievers."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+
+
+def list_dataset_files(folder: str = DATASET_DIR) -> List[str]:
+    """Return dataset file names in a stable order."""
+    return sorted(
+        name for name in os.listdir(folder)
+        if os.path.isfile(os.path.join(folder, name))
+    )
+
+
+def load_chunks(folder: str = DATASET_DIR) -> List[Document]:
+    """Load and split every dataset file, assigning content-derived ids."""
+    splitter = get_splitter()
+    chunks = []
+    for name in list_dataset_files(folder):
+        chunks.extend(_split_file(folder, name, splitter))
+    return chunks
+
+
+def _split_file(folder: str, name: str, splitter: RecursiveCharacterTextSplitter) -> List[Document]:
+    docs = TextLoader(os.path.join(folder, name)).load()
+    chunks = splitter.split_documents(docs)
+
+    tags = chunk_metadata(name)
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        base = chunk_id(name, chunk.page_content)
+        # Identical chunks inside one file still need distinct ids
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        chunk.id = base if n == 0 else f"{base}-{n}"
+        chunk.metadata.update(tags)
+    return chunks
+
+
+def chunk_id(source: str, content: str) -> str:
+    """Stable id for a chunk: hash of its source file name and its text."""
+    return hashlib.sha256(f"{source}\x00{content}".encode("utf-8")).hexdigest()[:32]
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+
+def _empty_manifest() -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "files": {},
+    }
+
+
+def load_manifest(path: str) -> Optional[dict]:
+    """Load the manifest, or None if this index was never synced."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def forget_manifest(path: str) -> None:
+    """Discard the manifest, e.g. when the index it describes was recreated."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# SYNC
+# =============================================================================
+
+_sync_lock = threading.Lock()
+
+
+def _vector_count(vector_store) -> Optional[int]:
+    """Vectors already in the store (its namespace, for Pinecone), or None if unknown."""
+    if hasattr(vector_store, "index"):
+        stats = vector_store.index.describe_index_stats()
+        namespace = getattr(vector_store, "_namespace", None)
+        if namespace:
+            summary = stats.namespaces.get(namespace)
+            return summary.vector_count if summary else 0
+        return stats.total_vector_count
+    try:
+        return len(vector_store)
+    except TypeError:
+        return None
+
+
+def sync(vector_store, manifest_path: str, folder: str = DATASET_DIR, rebuild: bool = False) -> SyncReport:
+    """
+    Bring the vector store in line with the dataset folder.
+
+    Args:
+        vector_store: Any LangChain vector store supporting add_documents(ids=...)
+            and delete(ids=...)
+        manifest_path: Where the per-file / per-chunk hash manifest is kept
+        folder: Dataset directory
+        rebuild: Delete every vector and re-ingest from scratch
+
+    Returns:
+        SyncReport describing what changed
+
+    Raises:
+        UntrackedIndexError: No manifest but the store is not empty; syncing
+            would add every chunk again next to the untracked vectors
+    """
+    with _sync_lock:
+        report = SyncReport()
+        manifest = None if rebuild else load_manifest(manifest_path)
+
+        if rebuild:
+            vector_store.delete(delete_all=True)
+        if manifest is None:
+            if not rebuild and _vector_count(vector_store):
+                raise UntrackedIndexError(
+                    "vector store is not empty but has no manifest; "
+                    "run python ingest.py --rebuild once to start clean"
+                )
+            manifest = _empty_manifest()
+
+        # Splitter settings or chunk metadata changed → every file must be
+        # re-split, and every chunk re-written even if its id is unchanged
+        settings_changed = (
+            manifest.get("chunk_size") != CHUNK_SIZE
+            or manifest.get("chunk_overlap") != CHUNK_OVERLAP
+            or manifest.get("version") != MANIFEST_VERSION
+        )
+
+        splitter = get_splitter()
+        previous: Dict[str, dict] = manifest.get("files", {})
+        files: Dict[str, dict] = {}
+        to_add: List[Document] = []
+        to_delete: List[str] = []
+
+        for name in list_dataset_files(folder):
+            digest = file_hash(os.path.join(folder, name))
+            prev = previous.get(name)
+
+            if prev and prev["sha256"] == digest and not settings_changed:
+                files[name] = prev
+                report.unchanged_files += 1
+                continue
+
+            chunks = _split_file(folder, name, splitter)
+            ids = [c.id for c in chunks]
+            prev_ids = set(prev["chunks"]) if prev else set()
+
+            to_add.extend(c for c in chunks if settings_changed or c.id not in prev_ids)
+            to_delete.extend(prev_ids - set(ids))
+            files[name] = {"sha256": digest, "chunks": ids}
+            report.changed_files.append(name)
+
+        for name, prev in previous.items():
+            if name not in files:
+                to_delete.extend(prev["chunks"])
+                report.removed_files.append(name)
+
+        if to_delete:
+            vector_store.delete(ids=to_delete)
+        if to_add:
+            vector_store.add_documents(to_add, ids=[c.id for c in to_add])
+
+        report.added = len(to_add)
+        report.deleted = len(to_delete)
+
+        manifest.update(_empty_manifest())
+        manifest["files"] = files
+        save_manifest(manifest_path, manifest)
+        return report
+
+
+# =============================================================================
+# WATCHER
+# =============================================================================
+
+def _folder_signature(folder: str) -> tuple:
+    """Cheap change detector: (name, size, mtime) for every dataset file."""
+    signature = []
+    for name in list_dataset_files(folder):
+        st = os.stat(os.path.join(folder, name))
+        signature.append((name, st.st_size, st.st_mtime_ns))
+    return tuple(signature)
+
+
+def start_watcher(vector_store, manifest_path: str, folder: str = DATASET_DIR,
+                  interval: float = 2.0, on_sync: Optional[Callable[[SyncReport], None]] = None) -> threading.Event:
+    """
+    Start a daemon thread that re-syncs whenever the dataset folder changes.
+
+    Args:
+        on_sync: Called after every sync that changed the index
+
+    Returns:
+        Event that stops the watcher when set
+    """
+    stop = threading.Event()
+
+    def _run():
+        last = _folder_signature(folder)
+        while not stop.wait(interval):
+            try:
+                current = _folder_signature(folder)
+                if current == last:
+                    continue
+                last = current
+                report = sync(vector_store, manifest_path, folder)
+                if not report.is_noop:
+                    print(f"✓ Dataset re-synced: {report}")
+                    if on_sync is not None:
+                        on_sync(report)
+            except Exception as e:
+                print(f"⚠ Dataset watcher error: {e}")
+
+    threading.Thread(target=_run, name="dataset-watcher", daemon=True).start()
+    return stop
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync ./dataset into the vector store.")
+    parser.add_argument("--rebuild", action="store_true", help="drop all vectors and re-embed everything")
+    parser.add_argument("--watch", action="store_true", help="keep running and re-sync on file changes")
+    parser.add_argument("--interval", type=float, default=2.0, help="watch polling interval in seconds")
+    args = parser.parse_args()
+
+    from langChainFun import get_vector_store, get_manifest_path
+
+    vector_store = get_vector_store()
+    manifest_path = get_manifest_path()
+
+    try:
+        report = sync(vector_store, manifest_path, rebuild=args.rebuild)
+    except UntrackedIndexError as e:
+        raise SystemExit(f"⚠ {e}")
+    print(f"✓ Sync complete: {report}")
+
+    if args.watch:
+        print(f"Watching {DATASET_DIR} for changes (Ctrl+C to stop)...")
+        start_watcher(vector_store, manifest_path, interval=args.interval)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
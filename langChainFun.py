@@ -1,5 +1,18 @@
 # langchain.py
+"""
+LLM, embeddings, vector store and retriever for the agent.
+
+Everything here is created lazily through the get_* factories, so importing
+this module has no side effects: no dataset reads, no network calls and no
+index creation. The first call to a factory (or an explicit warmup) pays
+the setup cost once; later calls reuse the same instance.
+
+The old module attributes (llm, embeddings, vector_store, retriever,
+manifest_path) still work and resolve through the factories.
+"""
+
 import os
+import threading
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -8,87 +21,320 @@ groq_api_key = os.getenv("GROQ_API_KEY")
 pinecone_api_key = os.getenv("PINECONE_API_KEY")
 huggingface_api_key = os.getenv("HUGGINGFACEHUB_API_TOKEN")
 
-# ============= LLM =============
-from langchain_groq import ChatGroq
+# ============= VECTOR STORE BACKEND =============
+# "pinecone" (default) or "local" (memory-mapped NumPy index on disk)
+vector_store_backend = os.getenv("VECTOR_STORE_BACKEND", "pinecone").lower()
+local_index_dir = os.getenv("LOCAL_INDEX_DIR", "./.index/university-support-system")
 
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-)
+# index_name = "school-support-system"
+index_name = "university-support-system"
 
-# ============= LOAD DOCUMENTS =============
-from langchain_community.document_loaders import TextLoader
+# ============= EMBEDDING BACKEND =============
+# "hf_endpoint" (default, HuggingFace Inference API) or "local" (sentence-transformers on CPU)
+embedding_backend = os.getenv("EMBEDDING_BACKEND", "hf_endpoint").lower()
+embedding_model = "sentence-transformers/all-mpnet-base-v2"
+embedding_model_path = os.getenv("EMBEDDING_MODEL_PATH") or embedding_model
+embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE") or 32)
+embedding_threads = int(os.getenv("EMBEDDING_THREADS") or 0) or None
+# Persistent cache of computed vectors; set to an empty string to disable
+embedding_cache_path = os.getenv("EMBEDDING_CACHE_PATH", "./.cache/embeddings.sqlite")
 
-# folder = "./school_knowledge_base"
-folder = "./dataset"
-docs = []
+# ============= LLM RESPONSE CACHE =============
+# Exact-match cache of temperature-0 responses; set LLM_CACHE_ENABLED=false to bypass
+llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+llm_cache_path = os.getenv("LLM_CACHE_PATH") or "./.cache/llm.sqlite"
 
-for file in os.listdir(folder):
-    docs.extend(TextLoader(os.path.join(folder, file)).load())
+# ============= RETRIEVAL MODE =============
+# "hybrid" (default, BM25 + vector with rank fusion) or "vector" (vector search only)
+retriever_mode = os.getenv("RETRIEVER_MODE", "hybrid").lower()
 
-# ============= CHUNKING =============
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+# Re-sync the vector store in the background whenever ./dataset changes
+ingest_watch = os.getenv("INGEST_WATCH", "false").lower() in ("1", "true", "yes")
 
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=500,
-    chunk_overlap=50
-)
+_llm = None
+_llm_cache = None
+_embeddings = None
+_vector_store = None
+_retriever = None
+_lexical_index = None
 
-chunks = splitter.split_documents(docs)
+_llm_lock = threading.Lock()
+_llm_cache_lock = threading.Lock()
+_embeddings_lock = threading.Lock()
+_vector_store_lock = threading.Lock()
+_retriever_lock = threading.Lock()
+_lexical_lock = threading.Lock()
 
-# ============= EMBEDDINGS =============
-from langchain_huggingface import HuggingFaceEndpointEmbeddings
 
+# ============= LLM =============
+def get_llm():
+    """Get or create the shared Groq chat model."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_groq import ChatGroq
+
+                # Only safe because temperature is 0 (the same prompt gives the same answer)
+                _llm = ChatGroq(
+                    model="llama-3.3-70b-versatile",
+                    temperature=0,
+                    max_tokens=None,
+                    timeout=None,
+                    max_retries=2,
+                    cache=get_llm_cache() or False,
+                )
+    return _llm
+
+
+def get_llm_cache():
+    """Get or create the LLM response cache (None if LLM_CACHE_ENABLED is off)."""
+    global _llm_cache
+    if not llm_cache_enabled:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                from core.config import LLM_CACHE_MAX_ENTRIES
+                from core.llm_cache import SQLiteLLMCache
+
+                _llm_cache = SQLiteLLMCache(llm_cache_path, max_entries=LLM_CACHE_MAX_ENTRIES)
+    return _llm_cache
+
+
+# ============= EMBEDDINGS =============
 def download_embedding():
+    from langchain_huggingface import HuggingFaceEndpointEmbeddings
+
     return HuggingFaceEndpointEmbeddings(
         huggingfacehub_api_token=huggingface_api_key,
-        model="sentence-transformers/all-mpnet-base-v2"
+        model=embedding_model
     )
 
-embeddings = download_embedding()
 
-# ============= PINECONE SETUP =============
-from pinecone import Pinecone, ServerlessSpec
-from langchain_pinecone import PineconeVectorStore
+def load_local_embedding():
+    from core.embeddings import LocalEmbeddings
+
+    return LocalEmbeddings(
+        embedding_model_path,
+        batch_size=embedding_batch_size,
+        num_threads=embedding_threads,
+    )
+
+
+def get_embeddings():
+    """Get or create the shared embedding backend (cached on disk if enabled)."""
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                if embedding_backend == "local":
+                    embeddings = load_local_embedding()
+                    model_id = f"local:{embedding_model_path}"
+                else:
+                    embeddings = download_embedding()
+                    model_id = f"hf_endpoint:{embedding_model}"
+
+                if embedding_cache_path:
+                    from core.embeddings import CachedEmbeddings
+
+                    embeddings = CachedEmbeddings(
+                        embeddings,
+                        model_id=model_id,
+                        cache_path=embedding_cache_path,
+                    )
+                _embeddings = embeddings
+    return _embeddings
+
+
+# ============= VECTOR STORE SETUP =============
+def get_manifest_path() -> str:
+    """Path of the ingestion manifest for the configured backend."""
+    if vector_store_backend == "local":
+        default = os.path.join(local_index_dir, "manifest.json")
+    else:
+        default = f"./.index/{index_name}.manifest.json"
+    return os.getenv("INGEST_MANIFEST_PATH") or default
 
-pc = Pinecone(api_key=pinecone_api_key)
-# index_name = "school-support-system"
-index_name = "university-support-system"
 
-# Check if index exists → create or load
-if index_name not in pc.list_indexes().names():
-    print("Creating new Pinecone index...")
-
-    pc.create_index(
-        name=index_name,
-        dimension=768,
-        metric="cosine",
-        spec=ServerlessSpec(
-            cloud="aws",
-            region="us-east-1"
+def _create_local_vector_store():
+    import ingest
+    from core.vector_store import LocalVectorStore
+
+    vector_store = LocalVectorStore(local_index_dir, get_embeddings())
+
+    if vector_store.is_empty():
+        print("Creating new local vector index...")
+        report = ingest.sync(vector_store, get_manifest_path())
+        print(f"Local index created and documents added ({report}).")
+    else:
+        print(f"Local vector index loaded ({len(vector_store)} chunks).")
+    return vector_store
+
+
+def _create_pinecone_vector_store():
+    import ingest
+    from pinecone import Pinecone, ServerlessSpec
+    from langchain_pinecone import PineconeVectorStore
+
+    pc = Pinecone(api_key=pinecone_api_key)
+
+    # Check if index exists → create or load
+    if index_name not in pc.list_indexes().names():
+        print("Creating new Pinecone index...")
+
+        pc.create_index(
+            name=index_name,
+            dimension=768,
+            metric="cosine",
+            spec=ServerlessSpec(
+                cloud="aws",
+                region="us-east-1"
+            )
         )
-    )
 
-    vector_store = PineconeVectorStore.from_documents(
-        chunks,
-        embedding=embeddings,
-        index_name=index_name
-    )
-    print("Pinecone index created and documents added.")
-else:
-    print("Loading existing Pinecone index...")
+        vector_store = PineconeVectorStore(
+            index_name=index_name,
+            embedding=get_embeddings()
+        )
+        ingest.forget_manifest(get_manifest_path())
+        report = ingest.sync(vector_store, get_manifest_path())
+        print(f"Pinecone index created and documents added ({report}).")
+    else:
+        print("Loading existing Pinecone index...")
+
+        vector_store = PineconeVectorStore.from_existing_index(
+            embedding=get_embeddings(),
+            index_name=index_name
+        )
+        print("Pinecone index loaded.")
+    return vector_store
+
+
+def get_vector_store():
+    """Get or open the configured vector store, creating the index if missing."""
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                if vector_store_backend == "local":
+                    vector_store = _create_local_vector_store()
+                else:
+                    vector_store = _create_pinecone_vector_store()
+
+                if ingest_watch:
+                    import ingest
+
+                    ingest.start_watcher(vector_store, get_manifest_path(), on_sync=_on_dataset_sync)
+                    print("✓ Watching ./dataset for changes")
+
+                _vector_store = vector_store
+    return _vector_store
 
-    vector_store = PineconeVectorStore.from_existing_index(
-        embedding=embeddings,
-        index_name=index_name
-    )
-    print("Pinecone index loaded.")
 
 # ============= RETRIEVER =============
-retriever = vector_store.as_retriever(
-    search_type="similarity_score_threshold",
-    search_kwargs={"k": 3, "score_threshold": 0.5},
-)
+def get_lexical_index():
+    """Get or build the BM25 index over the dataset chunks (same chunks as the vector store)."""
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_lock:
+            if _lexical_index is None:
+                _lexical_index = _build_lexical_index()
+    return _lexical_index
+
+
+def _build_lexical_index():
+    import ingest
+    from core.lexical import BM25Index
+
+    index = BM25Index(ingest.load_chunks())
+    print(f"✓ Lexical index built ({len(index)} chunks, {index.nbytes / 1024:.0f} KB postings)")
+    return index
+
+
+def _on_dataset_sync(report):
+    """Keep the lexical and fact indexes in step with the re-synced vector store."""
+    from core.facts import reset_fact_index
+
+    global _lexical_index
+    reset_fact_index()
+    if _lexical_index is None:
+        return
+    index = _build_lexical_index()
+    with _lexical_lock:
+        _lexical_index = index
+    if _retriever is not None and hasattr(_retriever, "lexical"):
+        _retriever.lexical = index
+
+
+def get_retriever():
+    """
+    Get or create the shared retriever (vector scores in doc.metadata["score"]).
+
+    With RETRIEVER_MODE=hybrid (the default) the similarity-threshold vector
+    retriever is fused with BM25 over the same chunks, so exact terms and
+    short codes still find context when the vector threshold returns nothing.
+    """
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                from core.config import HYBRID_CANDIDATES, RETRIEVER_K
+                from core.vector_store import ScoredRetriever
+
+                hybrid = retriever_mode == "hybrid"
+                retriever = ScoredRetriever(
+                    vectorstore=get_vector_store(),
+                    search_type="similarity_score_threshold",
+                    search_kwargs={"k": HYBRID_CANDIDATES if hybrid else RETRIEVER_K, "score_threshold": 0.5},
+                )
+                if hybrid:
+                    from core.lexical import HybridRetriever
+
+                    retriever = HybridRetriever(vector_retriever=retriever, lexical=get_lexical_index())
+                _retriever = retriever
+    return _retriever
+
+
+# ============= WARM-UP =============
+def _warm_llm():
+    # One-token completion that opens the keep-alive connection; the copy
+    # shares the client but skips the response cache, which would answer
+    # it locally after the first start
+    get_llm().model_copy(update={"cache": False}).invoke("ping", max_tokens=1)
+
+
+def _warm_embeddings():
+    get_embeddings().embed_query("warmup")
+
+
+def _warm_vector_store():
+    vector_store = get_vector_store()
+    if hasattr(vector_store, "index"):
+        vector_store.index.describe_index_stats()
+    get_retriever()
+
+
+# Name → callable; each opens one external connection
+WARMUP_TASKS = {
+    "groq": _warm_llm,
+    "huggingface": _warm_embeddings,
+    "vector_store": _warm_vector_store,
+}
+
+
+# ============= BACKWARDS COMPATIBILITY =============
+_LAZY_ATTRIBUTES = {
+    "llm": get_llm,
+    "embeddings": get_embeddings,
+    "vector_store": get_vector_store,
+    "retriever": get_retriever,
+    "manifest_path": get_manifest_path,
+}
+
+
+def __getattr__(name):
+    """Resolve the old eager module attributes through the lazy factories."""
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
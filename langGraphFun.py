@@ -15,18 +15,294 @@ is modularized across the following packages:
   - routing.py  : Conditional routing logic
   - builder.py  : Graph construction
 
+Importing this module is cheap: the graph is compiled on first use and the
+LLM, embeddings, vector store and web search clients are created lazily.
+Call warmup() at startup to open every connection in the background so the
+first query does not take the cold-start hit.
+
 Usage:
-    from langGraphFun import app, State
+    from langGraphFun import app, State, warmup
+    warmup()
     result = app.invoke({"query": "Tell me about admissions"})
+
+    # Async: one event loop can keep many queries in flight
+    result = await app.ainvoke({"query": "Tell me about admissions"})
 """
 
-from graph.builder import create_agent_graph
-from core.state import AgentState
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Create and compile the agent graph
-app = create_agent_graph()
+from core.state import AgentState
 
 # Export State for backwards compatibility with main.py
 State = AgentState
 
-__all__ = ["app", "State", "AgentState"]
+# Serve repeated / near-identical questions from the semantic answer cache
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+_app = None
+_cached_app = None
+_app_lock = threading.Lock()
+
+_ready = threading.Event()
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+_warmup_errors = {}
+
+
+def get_app():
+    """Get or compile the agent graph."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                from graph.builder import create_agent_graph
+
+                _app = create_agent_graph()
+    return _app
+
+
+def get_cached_app():
+    """
+    Get the agent wrapped in the semantic answer cache and request tracing.
+
+    Same invoke() shape as get_app(); the answer cache is skipped when
+    ANSWER_CACHE_ENABLED is off.
+    """
+    global _cached_app
+    if _cached_app is None:
+        app = get_app()
+        with _app_lock:
+            if _cached_app is None:
+                from core.tracing import TracedAgent
+
+                if ANSWER_CACHE_ENABLED:
+                    from core.answer_cache import AnswerCache, CachedAgent
+                    from langChainFun import get_embeddings
+
+                    app = CachedAgent(app, AnswerCache(embeddings=get_embeddings()))
+                _cached_app = TracedAgent(app)
+    return _cached_app
+
+
+# =============================================================================
+# RESPONSES & STREAMING
+# =============================================================================
+
+def to_response(result: dict) -> dict:
+    """Public, JSON-serializable view of a final agent result."""
+    answer = result.get("answer")
+    cache_hit = bool(result.get("cache_hit", False))
+    return {
+        "answer": answer,
+        "escalated": answer == "ESCALATE",
+        "intent": result.get("intent"),
+        "web_results": list(result.get("web_results") or []),
+        "cache_hit": cache_hit,
+        # A cached answer sent nothing to the LLM
+        "prompt_tokens": 0 if cache_hit else int(result.get("prompt_tokens") or 0),
+    }
+
+
+# Nodes whose LLM output is (or may become) the user-facing answer
+GENERATION_NODES = {"handle_casual", "resolve_hybrid", "resolve_with_fallback", "web_fallback"}
+
+STREAM_MODES = ["messages", "updates", "values"]
+
+
+class _StreamTranslator:
+    """
+    Turns raw LangGraph stream chunks into UI events.
+
+    Events:
+        {"type": "token", "node": ..., "text": ...}  answer text as generated
+        {"type": "node", "node": ...}                a node finished
+        {"type": "reset"}                            discard streamed text
+                                                     (answer was uncertain,
+                                                     web fallback follows)
+        {"type": "final", ...}                       the final answer
+    """
+
+    def __init__(self):
+        from core.metrics import histogram
+
+        self.final = {}
+        self._start = time.perf_counter()
+        self._first_token = False
+        self._ttft = histogram(
+            "agent_time_to_first_token_seconds",
+            "Time from request start to the first streamed answer token",
+        )
+
+    def translate(self, mode: str, chunk) -> list:
+        if mode == "messages":
+            message, metadata = chunk
+            node = metadata.get("langgraph_node")
+            if node not in GENERATION_NODES or not isinstance(message.content, str) or not message.content:
+                return []
+            if not self._first_token:
+                self._first_token = True
+                self._ttft.observe(time.perf_counter() - self._start, node=node)
+            return [{"type": "token", "node": node, "text": message.content}]
+
+        if mode == "updates":
+            events = []
+            for node, update in chunk.items():
+                events.append({"type": "node", "node": node})
+                if node == "resolve_with_fallback" and (update or {}).get("low_confidence"):
+                    events.append({"type": "reset"})
+            return events
+
+        self.final = chunk
+        return []
+
+
+def stream_answer(query: str):
+    """
+    Run the agent and yield UI events, streaming answer tokens as they arrive.
+
+    See _StreamTranslator for the event types; the last event is "final".
+    """
+    from core.tracing import close_trace, trace_request, with_callbacks
+
+    cached_app = get_cached_app()
+    cache = getattr(cached_app, "cache", None)
+
+    with trace_request(query) as trace:
+        if cache is not None:
+            cached, vector = cache.lookup_with_vector(query)
+            if cached is not None:
+                cached["cache_hit"] = True
+                close_trace(trace, cached)
+                yield {"type": "final", **to_response(cached)}
+                return
+
+        translator = _StreamTranslator()
+        config = with_callbacks(None, trace)
+        for mode, chunk in get_app().stream({"query": query}, config, stream_mode=STREAM_MODES):
+            yield from translator.translate(mode, chunk)
+
+        if cache is not None:
+            cache.store(query, translator.final, vector)
+        close_trace(trace, translator.final)
+    yield {"type": "final", **to_response(translator.final)}
+
+
+async def astream_answer(query: str):
+    """Async version of stream_answer."""
+    from core.tracing import close_trace, trace_request, with_callbacks
+
+    cached_app = get_cached_app()
+    cache = getattr(cached_app, "cache", None)
+
+    with trace_request(query) as trace:
+        if cache is not None:
+            cached, vector = await asyncio.to_thread(cache.lookup_with_vector, query)
+            if cached is not None:
+                cached["cache_hit"] = True
+                close_trace(trace, cached)
+                yield {"type": "final", **to_response(cached)}
+                return
+
+        translator = _StreamTranslator()
+        config = with_callbacks(None, trace)
+        async for mode, chunk in get_app().astream({"query": query}, config, stream_mode=STREAM_MODES):
+            for event in translator.translate(mode, chunk):
+                yield event
+
+        if cache is not None:
+            await asyncio.to_thread(cache.store, query, translator.final, vector)
+        close_trace(trace, translator.final)
+    yield {"type": "final", **to_response(translator.final)}
+
+
+# =============================================================================
+# WARM-UP
+# =============================================================================
+
+def _warmup_tasks() -> dict:
+    """Name → callable for every external dependency to warm up."""
+    import langChainFun
+    from core.classifier import get_classifier
+    from core.facts import get_fact_index
+    from webSearch import get_tavily_client
+
+    tasks = dict(langChainFun.WARMUP_TASKS)
+    tasks["classifier"] = get_classifier
+    tasks["facts"] = get_fact_index
+    tasks["tavily"] = get_tavily_client
+    tasks["graph"] = get_app
+    return tasks
+
+
+def _run_warmup() -> None:
+    start = time.perf_counter()
+    tasks = _warmup_tasks()
+
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="warmup") as pool:
+        futures = {name: pool.submit(fn) for name, fn in tasks.items()}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                _warmup_errors[name] = str(e)
+                print(f"⚠ Warm-up of {name} failed: {e}")
+
+    _ready.set()
+    print(f"✓ Agent warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+def warmup(wait: bool = False) -> threading.Thread:
+    """
+    Open the Groq, HuggingFace, vector store and Tavily connections concurrently.
+
+    Safe to call more than once; only the first call starts the work.
+
+    Args:
+        wait: Block until warm-up has finished
+
+    Returns:
+        The background warm-up thread
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_run_warmup, name="agent-warmup", daemon=True)
+            _warmup_thread.start()
+    if wait:
+        _warmup_thread.join()
+    return _warmup_thread
+
+
+def is_ready() -> bool:
+    """True once warm-up has finished (even if some connections failed)."""
+    return _ready.is_set()
+
+
+def warmup_errors() -> dict:
+    """Name → error message for warm-up tasks that failed."""
+    return dict(_warmup_errors)
+
+
+def __getattr__(name):
+    """Compile the graph on first access to ``app``."""
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "app",
+    "State",
+    "AgentState",
+    "get_app",
+    "get_cached_app",
+    "to_response",
+    "stream_answer",
+    "astream_answer",
+    "warmup",
+    "is_ready",
+]
@@ -15,11 +15,64 @@
 #     else:
 #         st.success(result["answer"])
 
+import json
+import os
+import requests
 import streamlit as st
-from langGraphFun import app, State
+from langGraphFun import stream_answer, warmup
+
+# When set, the UI is a thin client of the HTTP agent service (server.py)
+AGENT_SERVER_URL = os.getenv("AGENT_SERVER_URL", "").rstrip("/")
 
 st.set_page_config(page_title="University Support System", layout="wide")
 
+
+@st.cache_resource
+def start_warmup():
+    """Open all backend connections once per server process, in the background."""
+    return warmup()
+
+
+if not AGENT_SERVER_URL:
+    start_warmup()
+
+
+def ask_agent_stream(query):
+    """
+    Yield answer events (tokens, then the final answer) for a query,
+    in-process or through the agent service if configured.
+    """
+    if not AGENT_SERVER_URL:
+        yield from stream_answer(query)
+        return
+
+    with requests.post(
+        f"{AGENT_SERVER_URL}/query/stream", json={"query": query}, stream=True, timeout=120
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event.get("type") == "error":
+                raise RuntimeError(event.get("detail"))
+            yield event
+
+
+def render_streaming_answer(placeholder, text):
+    """Render the partial answer as it streams in."""
+    placeholder.markdown(
+        f"""
+        <div class="left">
+            <div style="display:flex; align-items:flex-start; gap:10px;">
+                <img src="https://cdn-icons-png.flaticon.com/512/4711/4711987.png" width="20" style="margin-top: 4px;">
+                <div class="assistant-bubble">{text}▌</div>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
 # ---------------- Header ----------------
 st.markdown(
     """
@@ -375,9 +428,21 @@ if st.session_state.messages and st.session_state.messages[-1]["role"] == "loadi
         st.rerun()
     
     elif loading_type == "retrieving":
-        # Run the graph and get the result
+        # Run the graph, rendering answer tokens as they are generated
         try:
-            result = app.invoke({"query": last_user_msg})
+            placeholder = st.empty()
+            streamed = ""
+            result = {}
+            for event in ask_agent_stream(last_user_msg):
+                if event["type"] == "token":
+                    streamed += event["text"]
+                    render_streaming_answer(placeholder, streamed)
+                elif event["type"] == "reset":
+                    # Uncertain answer, the web fallback will regenerate it
+                    streamed = ""
+                    placeholder.empty()
+                elif event["type"] == "final":
+                    result = event
             
             answer = (
                 "⚠️ Unable to find exact answer. Please contact the university administration."
@@ -0,0 +1,198 @@
+# server.py
+"""
+Standalone HTTP service for the University Support agent.
+
+Endpoints:
+    POST /query          {"query": "..."} → final answer as JSON
+    POST /query/stream   {"query": "..."} → newline-delimited JSON events
+                         (answer tokens as generated, then the final answer)
+    GET  /health         liveness (process is up)
+    GET  /ready          readiness (warm-up finished) — 503 until then
+    GET  /metrics        Prometheus text metrics (per-route/per-node latency, tokens, caches)
+
+Every request runs on the async graph (app.ainvoke), so one worker keeps
+many queries in flight while they wait on Groq, HF, Pinecone and Tavily.
+At most SERVER_CONCURRENCY queries run at once per worker; up to
+SERVER_MAX_QUEUE more may wait, and anything beyond that is shed with
+429 so a load balancer can retry elsewhere. Concurrent classifier calls
+are micro-batched into single HF requests.
+
+Usage:
+    python server.py
+    uvicorn server:api --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from core.classifier import get_classifier
+from core.metrics import render_prometheus
+from langGraphFun import astream_answer, get_cached_app, is_ready, to_response, warmup, warmup_errors
+from langChainFun import get_llm_cache
+from webSearch import get_search_cache
+
+load_dotenv()
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT") or 8000)
+SERVER_CONCURRENCY = int(os.getenv("SERVER_CONCURRENCY") or 32)   # Queries running at once
+SERVER_MAX_QUEUE = int(os.getenv("SERVER_MAX_QUEUE") or 128)      # Queries allowed to wait
+CLASSIFIER_BATCH_WINDOW_MS = float(os.getenv("CLASSIFIER_BATCH_WINDOW_MS") or 5)
+CLASSIFIER_MAX_BATCH = int(os.getenv("CLASSIFIER_MAX_BATCH") or 16)
+
+
+# =============================================================================
+# ADMISSION CONTROL
+# =============================================================================
+
+class Overloaded(Exception):
+    """Raised when the wait queue is full."""
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded wait queue (load shedding beyond it)."""
+
+    def __init__(self, concurrency: int, max_queue: int):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    def release(self) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+admission = AdmissionController(SERVER_CONCURRENCY, SERVER_MAX_QUEUE)
+
+
+# =============================================================================
+# APP
+# =============================================================================
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if CLASSIFIER_BATCH_WINDOW_MS > 0:
+        get_classifier().enable_batching(CLASSIFIER_BATCH_WINDOW_MS, CLASSIFIER_MAX_BATCH)
+    warmup()
+    yield
+
+
+api = FastAPI(title="University Support System", lifespan=lifespan)
+
+
+class QueryRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=2000)
+
+
+def _overloaded() -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server is at capacity, please retry."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@api.post("/query")
+async def query(request: QueryRequest):
+    """Answer a single query."""
+    try:
+        await admission.acquire()
+    except Overloaded:
+        return _overloaded()
+
+    try:
+        result = await get_cached_app().ainvoke({"query": request.query.strip()})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        admission.release()
+    return to_response(result)
+
+
+@api.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    """Answer a query, streaming tokens and progress events as NDJSON."""
+    try:
+        await admission.acquire()
+    except Overloaded:
+        return _overloaded()
+
+    async def events():
+        try:
+            async for event in astream_answer(request.query.strip()):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            admission.release()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@api.get("/health")
+async def health():
+    """Liveness: the process is serving requests."""
+    cache = get_search_cache()
+    llm_cache = get_llm_cache()
+    return {
+        "status": "ok",
+        "admission": admission.stats(),
+        "classifier": get_classifier().stats(),
+        "web_search_cache": cache.stats() if cache is not None else None,
+        "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+    }
+
+
+@api.get("/ready")
+async def ready():
+    """Readiness: warm-up has finished and the agent can answer quickly."""
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True, "warmup_errors": warmup_errors()}
+
+
+@api.get("/metrics")
+async def metrics():
+    """Every in-process metric in the Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(api, host=SERVER_HOST, port=SERVER_PORT)
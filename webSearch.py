@@ -1,16 +1,75 @@
 # webSearch.py
 import os
+import threading
 from dotenv import load_dotenv
-from tavily import TavilyClient
+
+from core.config import (
+    WEB_SEARCH_CACHE_MAX_ENTRIES,
+    WEB_SEARCH_CACHE_STALE_TTL,
+    WEB_SEARCH_CACHE_TTL,
+)
+from core.search_cache import WebSearchCache
 
 load_dotenv()
 
 # University domain - will be configured by user
 UNIVERSITY_DOMAIN = os.getenv("UNIVERSITY_DOMAIN", "example.edu.pk")
+SEARCH_DEPTH = "basic"  # Use "advanced" for deeper search (uses more credits)
+
+# Results are cached (with single-flight de-duplication) to save Tavily credits
+WEB_SEARCH_CACHE_ENABLED = os.getenv("WEB_SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+WEB_SEARCH_CACHE_PATH = os.getenv("WEB_SEARCH_CACHE_PATH") or "./.cache/web_search.sqlite"
 
-# Initialize Tavily client
+# Tavily client is created on first use
 tavily_api_key = os.getenv("TAVILY_API_KEY")
-tavily_client = TavilyClient(api_key=tavily_api_key) if tavily_api_key else None
+_tavily_client = None
+_async_tavily_client = None
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_tavily_client():
+    """Get or create the Tavily client (None if TAVILY_API_KEY is not set)."""
+    global _tavily_client
+    if _tavily_client is None and tavily_api_key:
+        from tavily import TavilyClient
+
+        _tavily_client = TavilyClient(api_key=tavily_api_key)
+    return _tavily_client
+
+
+def get_async_tavily_client():
+    """Get or create the async Tavily client (None if TAVILY_API_KEY is not set)."""
+    global _async_tavily_client
+    if _async_tavily_client is None and tavily_api_key:
+        from tavily import AsyncTavilyClient
+
+        _async_tavily_client = AsyncTavilyClient(api_key=tavily_api_key)
+    return _async_tavily_client
+
+
+def get_search_cache():
+    """Get or create the web search cache (None if WEB_SEARCH_CACHE_ENABLED is off)."""
+    global _search_cache
+    if not WEB_SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = WebSearchCache(
+                    WEB_SEARCH_CACHE_PATH,
+                    ttl=WEB_SEARCH_CACHE_TTL,
+                    stale_ttl=WEB_SEARCH_CACHE_STALE_TTL,
+                    max_entries=WEB_SEARCH_CACHE_MAX_ENTRIES,
+                )
+    return _search_cache
+
+
+def __getattr__(name):
+    """Keep ``webSearch.tavily_client`` working for existing callers."""
+    if name == "tavily_client":
+        return get_tavily_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def search_university_website(query: str, max_results: int = 3) -> list[dict]:
@@ -24,23 +83,59 @@ def search_university_website(query: str, max_results: int = 3) -> list[dict]:
     Returns:
         List of dicts with keys: title, url, content
     """
+    tavily_client = get_tavily_client()
     if not tavily_client:
         print("Warning: TAVILY_API_KEY not set, skipping web search")
         return []
     
+    def search():
+        response = tavily_client.search(**_search_params(query, max_results))
+        return response.get("results", [])
+    
     try:
-        response = tavily_client.search(
-            query=query,
-            include_domains=[UNIVERSITY_DOMAIN],
-            max_results=max_results,
-            search_depth="basic",  # Use "advanced" for deeper search (uses more credits)
-        )
+        cache = get_search_cache()
+        if cache is None:
+            return search()
+        return cache.fetch(_cache_key(query, max_results), search)
+    except Exception as e:
+        print(f"Web search error: {e}")
+        return []
+
+
+async def asearch_university_website(query: str, max_results: int = 3) -> list[dict]:
+    """Async version of search_university_website."""
+    tavily_client = get_async_tavily_client()
+    if not tavily_client:
+        print("Warning: TAVILY_API_KEY not set, skipping web search")
+        return []
+
+    async def search():
+        response = await tavily_client.search(**_search_params(query, max_results))
         return response.get("results", [])
+
+    try:
+        cache = get_search_cache()
+        if cache is None:
+            return await search()
+        return await cache.afetch(_cache_key(query, max_results), search)
     except Exception as e:
         print(f"Web search error: {e}")
         return []
 
 
+def _search_params(query: str, max_results: int) -> dict:
+    return dict(
+        query=query,
+        include_domains=[UNIVERSITY_DOMAIN],
+        max_results=max_results,
+        search_depth=SEARCH_DEPTH,
+    )
+
+
+def _cache_key(query: str, max_results: int) -> str:
+    return WebSearchCache.make_key(query, UNIVERSITY_DOMAIN, max_results, SEARCH_DEPTH)
+
+
 def format_web_results(results: list[dict]) -> str:
     """
     Format web search results into a context string for the LLM.